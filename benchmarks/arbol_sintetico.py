@@ -0,0 +1,71 @@
+# benchmarks/arbol_sintetico.py
+"""Generador determinista de árboles de directorios sintéticos para los benchmarks.
+
+Con los mismos parámetros y la misma semilla se obtiene siempre el mismo árbol (nombres,
+estructura y tamaños), de modo que los recuentos de llamadas al sistema son comparables
+entre ejecuciones y entre máquinas.
+"""
+
+import os
+import random
+from collections import namedtuple
+
+EstadisticasArbol = namedtuple('EstadisticasArbol', ['directorios', 'archivos', 'bytes'])
+
+DISTRIBUCIONES = ('fija', 'uniforme', 'pareto')
+
+# Exponente de la distribución de Pareto: muchos archivos pequeños y unos pocos muy grandes,
+# como en las carpetas temporales reales.
+_ALFA_PARETO = 1.5
+# Tope del tamaño de un archivo, en múltiplos del tamaño medio, para acotar el uso de disco
+_TOPE_TAMAÑO = 64
+
+def _generador_tamaños(distribucion, tamaño_medio, aleatorio):
+    if distribucion == 'fija':
+        return lambda: tamaño_medio
+    if distribucion == 'uniforme':
+        return lambda: aleatorio.randint(0, 2 * tamaño_medio)
+    if distribucion == 'pareto':
+        # Escala elegida para que la media (sin el tope) sea `tamaño_medio`
+        escala = tamaño_medio * (_ALFA_PARETO - 1) / _ALFA_PARETO
+        tope = _TOPE_TAMAÑO * tamaño_medio
+        return lambda: min(int(escala * aleatorio.paretovariate(_ALFA_PARETO)), tope)
+    raise ValueError(f"Distribución desconocida: {distribucion}. Opciones: {', '.join(DISTRIBUCIONES)}")
+
+def generar_arbol(raiz, profundidad=3, ramificacion=4, archivos_por_directorio=20,
+                  distribucion='pareto', tamaño_medio=4096, semilla=1234):
+    """Crea bajo `raiz` un árbol completo de directorios con archivos en todos los niveles.
+
+    Args:
+        raiz (str): directorio donde se crea el árbol (se crea si no existe).
+        profundidad (int): niveles de subdirectorios por debajo de la raíz.
+        ramificacion (int): subdirectorios de cada directorio.
+        archivos_por_directorio (int): archivos en cada directorio, incluida la raíz.
+        distribucion (str): 'fija', 'uniforme' o 'pareto' para los tamaños de archivo.
+        tamaño_medio (int): tamaño medio de archivo en bytes.
+        semilla (int): semilla del generador pseudoaleatorio.
+
+    Returns:
+        EstadisticasArbol: directorios (incluida la raíz), archivos y bytes creados.
+    """
+    aleatorio = random.Random(semilla)
+    siguiente_tamaño = _generador_tamaños(distribucion, tamaño_medio, aleatorio)
+    relleno = bytes(_TOPE_TAMAÑO * tamaño_medio if distribucion == 'pareto' else 2 * tamaño_medio)
+
+    directorios = 0
+    archivos = 0
+    total_bytes = 0
+    pendientes = [(raiz, 0)]
+    while pendientes:
+        directorio, nivel = pendientes.pop()
+        os.makedirs(directorio, exist_ok=True)
+        directorios += 1
+        for i in range(archivos_por_directorio):
+            tamaño = siguiente_tamaño()
+            with open(os.path.join(directorio, f"archivo{i:04d}.tmp"), 'wb') as f:
+                f.write(relleno[:tamaño])
+            archivos += 1
+            total_bytes += tamaño
+        if nivel < profundidad:
+            pendientes.extend((os.path.join(directorio, f"dir{j:03d}"), nivel + 1) for j in range(ramificacion))
+    return EstadisticasArbol(directorios, archivos, total_bytes)
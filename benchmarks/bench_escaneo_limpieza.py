@@ -0,0 +1,96 @@
+# benchmarks/bench_escaneo_limpieza.py
+"""Compara el recorrido antiguo de dos pasadas con el motor de una sola pasada basado en os.scandir.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_escaneo_limpieza [--directorios 200] [--archivos 50]
+
+Se cuentan las llamadas de listado (os.walk / os.scandir) y los stat explícitos
+(os.stat / os.path.getsize) que realiza cada implementación en modo informe.
+DirEntry.stat() no pasa por el módulo os: en Windows no hace ninguna llamada al
+sistema (los datos vienen del propio listado) y en otros sistemas hace un único lstat.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from unittest.mock import patch
+
+from src import cleanup_targets, system_cleaner
+
+
+def crear_arbol(base, directorios, archivos_por_directorio):
+    """Crea un árbol sintético de `directorios` carpetas con archivos pequeños."""
+    for d in range(directorios):
+        ruta_dir = os.path.join(base, f"nivel{d % 10}", f"dir{d}")
+        os.makedirs(ruta_dir, exist_ok=True)
+        for a in range(archivos_por_directorio):
+            with open(os.path.join(ruta_dir, f"archivo{a}.tmp"), 'wb') as f:
+                f.write(b'x' * (a % 7 + 1) * 128)
+
+
+def _informe_dos_pasadas(rutas):
+    """Reproduce el algoritmo anterior: un os.walk para contar y otro más getsize por archivo."""
+    total_archivos = 0
+    for ruta in rutas:
+        for _, _, filenames in os.walk(ruta):
+            total_archivos += len(filenames)
+    total_bytes = 0
+    archivos = 0
+    for ruta in rutas:
+        for dirpath, _, filenames in os.walk(ruta):
+            for archivo in filenames:
+                total_bytes += os.path.getsize(os.path.join(dirpath, archivo))
+                archivos += 1
+    return total_bytes, archivos
+
+
+def _medir(funcion):
+    """Ejecuta `funcion` contando las llamadas al sistema de archivos hechas desde Python."""
+    with patch('os.walk', wraps=os.walk) as walk, \
+         patch('os.scandir', wraps=os.scandir) as scandir, \
+         patch('os.stat', wraps=os.stat) as stat:
+        inicio = time.perf_counter()
+        resultado = funcion()
+        duracion = time.perf_counter() - inicio
+    return resultado, duracion, {
+        'os.walk': walk.call_count,
+        'os.scandir': scandir.call_count,
+        'os.stat/getsize': stat.call_count,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--directorios', type=int, default=200)
+    parser.add_argument('--archivos', type=int, default=50)
+    args = parser.parse_args()
+
+    base = tempfile.mkdtemp(prefix='optitech_bench_')
+    # Datos de la aplicación e informes fuera del árbol medido y del directorio real del usuario
+    datos = tempfile.mkdtemp(prefix='optitech_bench_datos_')
+    try:
+        crear_arbol(base, args.directorios, args.archivos)
+
+        legado, t_legado, llamadas_legado = _medir(lambda: _informe_dos_pasadas([base]))
+        with patch('src.cleanup_targets.resolver_nivel', return_value=(cleanup_targets.RaizLimpieza(base, {}),)), \
+             patch('src.config_manager.get_app_data_path', return_value=datos), \
+             patch('src.config_manager.get_report_path', return_value=datos), \
+             patch('builtins.print'):
+            nuevo, t_nuevo, llamadas_nuevo = _medir(
+                lambda: system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=True, reglas={}, desglose_top=0))
+
+        assert legado == nuevo, f"Los resultados difieren: {legado} != {nuevo}"
+        print(f"Árbol: {args.directorios} directorios, {nuevo[1]} archivos, {nuevo[0] / (1024*1024):.2f} MB")
+        print(f"{'Métrica':<20}{'Dos pasadas':>15}{'Una pasada':>15}")
+        for clave in llamadas_legado:
+            print(f"{clave:<20}{llamadas_legado[clave]:>15}{llamadas_nuevo[clave]:>15}")
+        print(f"{'tiempo (s)':<20}{t_legado:>15.3f}{t_nuevo:>15.3f}")
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+        shutil.rmtree(datos, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
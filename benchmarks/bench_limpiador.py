@@ -0,0 +1,234 @@
+# benchmarks/bench_limpiador.py
+"""Benchmark de limpiar_archivos_temporales con árboles sintéticos y control de regresiones.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_limpiador [--profundidad 3] [--ramificacion 6] [--archivos 40]
+                                         [--distribucion pareto] [--tamaño-medio 4096]
+                                         [--repeticiones 3] [--umbral 0.25]
+                                         [--baseline benchmarks/baseline_limpiador.json]
+                                         [--guardar-baseline]
+
+Genera un árbol determinista (benchmarks/arbol_sintetico.py) y ejecuta la limpieza en modo
+informe y en modo eliminación, con uno y varios hilos. En modo eliminación el árbol se
+regenera antes de cada repetición y la generación no se cronometra. Para cada escenario se
+registra la mejor repetición: archivos/s, MB/s, pico de RSS del proceso y el número de
+llamadas os.scandir / os.stat / os.remove / os.unlink / os.rmdir (os.unlink es la
+eliminación relativa a un descriptor de directorio de src/subtree_delete.py).
+
+Si existe el baseline y se generó con los mismos parámetros del árbol, cada escenario se
+compara con él y el script termina con código 1 si hay regresiones: rendimiento o memoria
+peores que el umbral relativo, o más llamadas al sistema (son deterministas para un mismo
+árbol). Un escenario o un contador de llamadas que no consta en el baseline también es una
+regresión: el baseline es anterior a la medida y no sirve de control. Los tiempos dependen de
+la máquina: el baseline debe regenerarse en la máquina de referencia con --guardar-baseline.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+import psutil
+
+from benchmarks import arbol_sintetico
+from src import cleanup_targets, system_cleaner
+
+BASELINE_POR_DEFECTO = os.path.join(os.path.dirname(__file__), 'baseline_limpiador.json')
+
+# (nombre, modo_informe, workers)
+ESCENARIOS = (
+    ('informe_1_hilo', True, 1),
+    ('informe_4_hilos', True, 4),
+    ('eliminacion_1_hilo', False, 1),
+    ('eliminacion_4_hilos', False, 4),
+)
+
+LLAMADAS_CONTADAS = ('scandir', 'stat', 'remove', 'unlink', 'rmdir')
+
+class _MuestreadorRSS:
+    """Muestrea el RSS del proceso en un hilo aparte y conserva el máximo observado."""
+
+    def __init__(self, intervalo=0.005):
+        self.intervalo = intervalo
+        self.pico = 0
+        self._proceso = psutil.Process()
+        self._parar = threading.Event()
+        self._hilo = threading.Thread(target=self._muestrear, daemon=True)
+
+    def _muestrear(self):
+        while True:
+            self.pico = max(self.pico, self._proceso.memory_info().rss)
+            if self._parar.wait(self.intervalo):
+                return
+
+    def __enter__(self):
+        self._hilo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._parar.set()
+        self._hilo.join()
+        self.pico = max(self.pico, self._proceso.memory_info().rss)
+
+@contextlib.contextmanager
+def _contar_llamadas():
+    """Cuenta las llamadas a las funciones de os que usa la limpieza (sin alterar su resultado)."""
+    contadores = dict.fromkeys(LLAMADAS_CONTADAS, 0)
+    originales = {nombre: getattr(os, nombre) for nombre in LLAMADAS_CONTADAS}
+
+    def envolver(nombre):
+        original = originales[nombre]
+        def envoltura(*args, **kwargs):
+            contadores[nombre] += 1
+            return original(*args, **kwargs)
+        return envoltura
+
+    with contextlib.ExitStack() as pila:
+        for nombre in LLAMADAS_CONTADAS:
+            pila.enter_context(patch(f'os.{nombre}', envolver(nombre)))
+        yield contadores
+
+def ejecutar_escenario(raiz, datos, modo_informe, workers):
+    """Ejecuta una limpieza sobre `raiz` y devuelve sus métricas."""
+    with patch('src.cleanup_targets.resolver_nivel', return_value=(cleanup_targets.RaizLimpieza(raiz, {}),)), \
+         patch('src.config_manager.get_app_data_path', return_value=datos), \
+         patch('src.config_manager.get_report_path', return_value=datos), \
+         contextlib.redirect_stdout(io.StringIO()), \
+         _contar_llamadas() as llamadas, \
+         _MuestreadorRSS() as rss:
+        inicio = time.perf_counter()
+        total_bytes, archivos = system_cleaner.limpiar_archivos_temporales(
+            nivel='basico', modo_informe=modo_informe, workers=workers, reglas={}, reanudar=False,
+            modo_recorrido='hilos' if workers > 1 else 'secuencial')
+        segundos = time.perf_counter() - inicio
+    return {
+        'archivos': archivos,
+        'mb': round(total_bytes / (1024 * 1024), 3),
+        'segundos': round(segundos, 4),
+        'archivos_s': round(archivos / segundos, 1) if segundos else 0.0,
+        'mb_s': round(total_bytes / (1024 * 1024) / segundos, 2) if segundos else 0.0,
+        'rss_pico_mb': round(rss.pico / (1024 * 1024), 1),
+        'llamadas': dict(llamadas),
+    }
+
+def medir(parametros, repeticiones):
+    """Ejecuta todos los escenarios y devuelve, para cada uno, la repetición más rápida."""
+    resultados = {}
+    with tempfile.TemporaryDirectory(prefix='optitech_bench_') as base:
+        raiz = os.path.join(base, 'temp')
+        datos = os.path.join(base, 'datos')
+        os.makedirs(datos)
+        arbol_sintetico.generar_arbol(raiz, **parametros)
+        for nombre, modo_informe, workers in ESCENARIOS:
+            mejor = None
+            for _ in range(repeticiones):
+                if not modo_informe:
+                    shutil.rmtree(raiz, ignore_errors=True)
+                    arbol_sintetico.generar_arbol(raiz, **parametros)
+                metricas = ejecutar_escenario(raiz, datos, modo_informe, workers)
+                if mejor is None or metricas['segundos'] < mejor['segundos']:
+                    mejor = metricas
+            resultados[nombre] = mejor
+    return resultados
+
+def comparar(resultados, baseline, umbral):
+    """Devuelve la lista de regresiones de `resultados` respecto a `baseline`."""
+    regresiones = []
+    for nombre, actual in resultados.items():
+        referencia = baseline.get(nombre)
+        if referencia is None:
+            regresiones.append(f"{nombre}: el escenario no consta en el baseline")
+            continue
+        for metrica in ('archivos_s', 'mb_s'):
+            if referencia[metrica] and actual[metrica] < referencia[metrica] * (1 - umbral):
+                regresiones.append(f"{nombre}: {metrica} {actual[metrica]} < {referencia[metrica]} (-{umbral:.0%})")
+        if referencia['rss_pico_mb'] and actual['rss_pico_mb'] > referencia['rss_pico_mb'] * (1 + umbral):
+            regresiones.append(f"{nombre}: rss_pico_mb {actual['rss_pico_mb']} > {referencia['rss_pico_mb']} (+{umbral:.0%})")
+        for llamada, cantidad in actual['llamadas'].items():
+            if llamada not in referencia['llamadas']:
+                regresiones.append(f"{nombre}: os.{llamada} no consta en el baseline")
+            elif cantidad > referencia['llamadas'][llamada]:
+                regresiones.append(f"{nombre}: os.{llamada} {cantidad} > {referencia['llamadas'][llamada]}")
+    return regresiones
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--profundidad', type=int, default=3)
+    parser.add_argument('--ramificacion', type=int, default=6)
+    parser.add_argument('--archivos', type=int, default=40, help='Archivos por directorio.')
+    parser.add_argument('--distribucion', choices=arbol_sintetico.DISTRIBUCIONES, default='pareto')
+    parser.add_argument('--tamaño-medio', dest='tamaño_medio', type=int, default=4096)
+    parser.add_argument('--semilla', type=int, default=1234)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--umbral', type=float, default=0.25, help='Empeoramiento relativo tolerado (0.25 = 25%%).')
+    parser.add_argument('--baseline', default=BASELINE_POR_DEFECTO)
+    parser.add_argument('--guardar-baseline', action='store_true', help='Guarda los resultados como nuevo baseline.')
+    args = parser.parse_args()
+
+    parametros = {
+        'profundidad': args.profundidad,
+        'ramificacion': args.ramificacion,
+        'archivos_por_directorio': args.archivos,
+        'distribucion': args.distribucion,
+        'tamaño_medio': args.tamaño_medio,
+        'semilla': args.semilla,
+    }
+    # Los avisos del limpiador no interesan aquí y distorsionarían los tiempos
+    logging.getLogger(system_cleaner.APP_LOGGER_NAME).setLevel(logging.ERROR)
+
+    print(f"Árbol: {json.dumps(parametros, ensure_ascii=False)}")
+    resultados = medir(parametros, args.repeticiones)
+
+    print(f"{'Escenario':<22}{'Archivos':>10}{'MB':>10}{'s':>9}{'archivos/s':>12}{'MB/s':>9}{'RSS (MB)':>10}  Llamadas")
+    for nombre, m in resultados.items():
+        llamadas = ' '.join(f"{clave}={valor}" for clave, valor in m['llamadas'].items())
+        print(f"{nombre:<22}{m['archivos']:>10}{m['mb']:>10.2f}{m['segundos']:>9.3f}{m['archivos_s']:>12.0f}"
+              f"{m['mb_s']:>9.1f}{m['rss_pico_mb']:>10.1f}  {llamadas}")
+
+    documento = {
+        'plataforma': f"{platform.system()} {platform.release()}",
+        'python': platform.python_version(),
+        'parametros': parametros,
+        'escenarios': resultados,
+    }
+    if args.guardar_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(documento, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"Baseline guardado en {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"No hay baseline en {args.baseline}; use --guardar-baseline para crearlo.")
+        return 0
+    if baseline.get('parametros') != parametros:
+        print("El baseline se generó con otros parámetros del árbol; no se compara.")
+        return 0
+    if baseline.get('plataforma') != documento['plataforma']:
+        print(f"Aviso: el baseline es de {baseline.get('plataforma')}; los tiempos pueden no ser comparables.")
+
+    regresiones = comparar(resultados, baseline['escenarios'], args.umbral)
+    if regresiones:
+        print("Regresiones respecto al baseline:")
+        for regresion in regresiones:
+            print(f" - {regresion}")
+        if any('no consta en el baseline' in regresion for regresion in regresiones):
+            print("El baseline no cubre todas las medidas actuales: regenérelo en la máquina de referencia con --guardar-baseline.")
+        return 1
+    print(f"Sin regresiones respecto al baseline (umbral {args.umbral:.0%}).")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
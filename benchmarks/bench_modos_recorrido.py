@@ -0,0 +1,76 @@
+# benchmarks/bench_modos_recorrido.py
+"""Benchmark de las estrategias de recorrido (secuencial, hilos, procesos) en modo informe.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_modos_recorrido [--workers 4] [--repeticiones 3]
+                                               [--tamaños pequeño,mediano,grande]
+
+Genera árboles sintéticos de varios tamaños (benchmarks/arbol_sintetico.py) y, para cada
+uno, mide la mejor de varias repeticiones de limpiar_archivos_temporales en modo informe
+con cada estrategia. Indica cuál gana y cuál habría elegido el modo 'auto'
+(scan_strategy.elegir_modo), para ajustar los umbrales de src/scan_strategy.py en la
+máquina de referencia. Con la caché de disco caliente el recorrido está limitado por la CPU,
+que es donde el pool de procesos puede ganar a los hilos.
+"""
+
+import argparse
+import contextlib
+import io
+import logging
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+from benchmarks import arbol_sintetico
+from src import cleanup_targets, scan_strategy, system_cleaner
+
+# Estrategias que se comparan; la asíncrona solo difiere del recorrido secuencial al eliminar
+MODOS_INFORME = ('secuencial', 'hilos', 'procesos')
+
+# Parámetros de los árboles; tamaño medio pequeño para que el uso de disco sea moderado
+ARBOLES = {
+    'pequeño': {'profundidad': 2, 'ramificacion': 4, 'archivos_por_directorio': 10},
+    'mediano': {'profundidad': 3, 'ramificacion': 6, 'archivos_por_directorio': 20},
+    'grande': {'profundidad': 3, 'ramificacion': 8, 'archivos_por_directorio': 120},
+}
+
+def ejecutar(raiz, datos, modo, workers):
+    """Ejecuta el informe con el modo indicado y devuelve (segundos, archivos)."""
+    with patch('src.cleanup_targets.resolver_nivel', return_value=(cleanup_targets.RaizLimpieza(raiz, {}),)), \
+         patch('src.config_manager.get_app_data_path', return_value=datos), \
+         patch('src.config_manager.get_report_path', return_value=datos), \
+         contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        _, archivos = system_cleaner.limpiar_archivos_temporales(
+            nivel='basico', modo_informe=True, workers=workers, reglas={}, desglose_top=0, modo_recorrido=modo)
+        return time.perf_counter() - inicio, archivos
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--tamaños', default=','.join(ARBOLES), help='Árboles a medir, separados por comas.')
+    args = parser.parse_args()
+    logging.getLogger(system_cleaner.APP_LOGGER_NAME).setLevel(logging.ERROR)
+
+    print(f"{'Árbol':<10}{'Archivos':>10}" + ''.join(f"{modo + ' (s)':>16}" for modo in MODOS_INFORME)
+          + f"{'Gana':>14}{'Auto':>14}")
+    for nombre in args.tamaños.split(','):
+        with tempfile.TemporaryDirectory(prefix='optitech_bench_') as base:
+            raiz = os.path.join(base, 'temp')
+            datos = os.path.join(base, 'datos')
+            os.makedirs(datos)
+            arbol_sintetico.generar_arbol(raiz, tamaño_medio=64, **ARBOLES[nombre])
+            tiempos = {}
+            for modo in MODOS_INFORME:
+                tiempos[modo] = min(ejecutar(raiz, datos, modo, args.workers)[0] for _ in range(args.repeticiones))
+            archivos = ejecutar(raiz, datos, 'secuencial', 1)[1]
+            muestra = scan_strategy.muestrear_arbol([raiz])
+            elegido = scan_strategy.elegir_modo(muestra, args.workers, modo_informe=True)
+        ganador = min(tiempos, key=tiempos.get)
+        print(f"{nombre:<10}{archivos:>10}" + ''.join(f"{tiempos[modo]:>16.3f}" for modo in MODOS_INFORME)
+              + f"{ganador:>14}{elegido:>14}")
+
+if __name__ == '__main__':
+    main()
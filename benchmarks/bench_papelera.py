@@ -0,0 +1,81 @@
+# benchmarks/bench_papelera.py
+"""Benchmark del informe de la papelera de reciclaje sobre una papelera simulada.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_papelera [--elementos 20000]
+
+Crea una papelera falsa en un directorio temporal y usa recycle_bin.BackendDirectorio para
+comparar el enfoque anterior (materializar la lista completa y sondear atributos de cada
+elemento) con la iteración perezosa: comprobación de papelera vacía y suma de tamaños.
+Mide el tiempo y el pico de memoria de Python (tracemalloc). Funciona en cualquier sistema.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from src import recycle_bin
+
+def crear_papelera(ruta, cantidad):
+    for i in range(cantidad):
+        with open(os.path.join(ruta, f"$R{i:07d}.tmp"), 'wb') as f:
+            f.write(b'x' * (i % 4096))
+
+def medir(funcion):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcion()
+    duracion = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, duracion, pico
+
+def vacia_lista(backend):
+    return not list(backend.elementos())
+
+def informe_lista(backend):
+    """Equivalente al informe anterior: lista completa y sondeo de atributos por elemento."""
+    items = list(backend.elementos())
+    total = 0
+    for entry in items:
+        size = 0
+        if hasattr(entry, 'size'):
+            size = getattr(entry, 'size') or 0
+        elif hasattr(entry, 'tamaño'):
+            size = getattr(entry, 'tamaño') or 0
+        total += size
+    return len(items), total
+
+def informe_perezoso(backend):
+    total = 0
+    count = 0
+    for entry in backend.elementos():
+        total += entry.tamaño
+        count += 1
+    return count, total
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--elementos', type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as ruta:
+        print(f"Creando una papelera simulada con {args.elementos} elementos...")
+        crear_papelera(ruta, args.elementos)
+        backend = recycle_bin.BackendDirectorio(ruta)
+
+        casos = (
+            ('vacía (lista)', lambda: vacia_lista(backend)),
+            ('vacía (perezosa)', backend.esta_vacia),
+            ('informe (lista)', lambda: informe_lista(backend)),
+            ('informe (perezoso)', lambda: informe_perezoso(backend)),
+        )
+        print(f"{'Operación':<20}{'Resultado':>22}{'Tiempo (ms)':>14}{'Pico (KB)':>12}")
+        for nombre, funcion in casos:
+            resultado, duracion, pico = medir(funcion)
+            print(f"{nombre:<20}{str(resultado):>22}{duracion * 1000:>14.2f}{pico / 1024:>12.1f}")
+
+if __name__ == '__main__':
+    main()
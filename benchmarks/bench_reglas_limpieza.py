@@ -0,0 +1,92 @@
+# benchmarks/bench_reglas_limpieza.py
+"""Micro-benchmark del predicado compilado de reglas de limpieza.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_reglas_limpieza [--entradas 1000000]
+
+Evalúa las reglas sobre entradas sintéticas (ruta, nombre, stat) sin tocar el disco y lo
+compara con una evaluación ingenua que recorre los globs uno a uno con fnmatch.
+"""
+
+import argparse
+import fnmatch
+import os
+import random
+import time
+
+from src import cleanup_rules
+
+REGLAS = {
+    'min_age_days': 3,
+    'min_size_mb': 0,
+    'max_size_mb': 2048,
+    'include': ['*.tmp', '*.log', '*.etl', '*.dmp', '~*', 'cache/*', 'Download/*'],
+    'exclude': ['*.lock', 'desktop.ini', 'thumbs.db', 'keep/*'],
+    'exclude_extensions': ['.sys'],
+}
+
+EXTENSIONES = ['.tmp', '.log', '.etl', '.dmp', '.dat', '.bin', '.lock', '.sys', '.txt', '']
+CARPETAS = ['cache', 'Download', 'keep', 'misc', 'logs']
+
+def generar_entradas(cantidad, ahora, semilla=1234):
+    """Genera `cantidad` tuplas (ruta, nombre, stat) deterministas."""
+    aleatorio = random.Random(semilla)
+    entradas = []
+    for i in range(cantidad):
+        nombre = f"archivo{i}{aleatorio.choice(EXTENSIONES)}"
+        ruta = os.path.join('C:\\Temp', aleatorio.choice(CARPETAS), nombre)
+        mtime = ahora - aleatorio.uniform(0, 10) * 86400
+        tamaño = int(aleatorio.paretovariate(1.2) * 4096)
+        entradas.append((ruta, nombre, os.stat_result((0o100644, 0, 0, 1, 0, 0, tamaño, mtime, mtime, mtime))))
+    return entradas
+
+def predicado_ingenuo(reglas, ahora):
+    """Evaluación directa sin precompilar: fnmatch por patrón y por archivo."""
+    umbral = ahora - reglas['min_age_days'] * 86400
+    max_bytes = reglas['max_size_mb'] * 1024 * 1024
+
+    def coincide(ruta, nombre, patrones):
+        ruta = ruta.replace('\\', '/')
+        return any(fnmatch.fnmatch(ruta, '*/' + p) if '/' in p else fnmatch.fnmatch(nombre, p) for p in patrones)
+
+    def predicado(ruta, nombre, info):
+        if info.st_mtime > umbral or info.st_size > max_bytes:
+            return False
+        if os.path.splitext(nombre)[1].lower() in reglas['exclude_extensions']:
+            return False
+        if coincide(ruta, nombre, reglas['exclude']):
+            return False
+        return coincide(ruta, nombre, reglas['include'])
+
+    return predicado
+
+def medir(predicado, entradas):
+    inicio = time.perf_counter()
+    aceptadas = sum(1 for ruta, nombre, info in entradas if predicado(ruta, nombre, info))
+    return aceptadas, time.perf_counter() - inicio
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entradas', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    ahora = time.time()
+    print(f"Generando {args.entradas} entradas sintéticas...")
+    entradas = generar_entradas(args.entradas, ahora)
+
+    inicio = time.perf_counter()
+    compilado = cleanup_rules.compilar_reglas(REGLAS, ahora=ahora)
+    t_compilacion = time.perf_counter() - inicio
+
+    aceptadas_c, t_compilado = medir(compilado, entradas)
+    aceptadas_i, t_ingenuo = medir(predicado_ingenuo(REGLAS, ahora), entradas)
+    if aceptadas_c != aceptadas_i:
+        print(f"Aviso: el predicado ingenuo acepta {aceptadas_i} entradas y el compilado {aceptadas_c}.")
+
+    print(f"Compilación de reglas: {t_compilacion * 1000:.2f} ms")
+    print(f"{'Implementación':<15}{'Aceptadas':>12}{'Total (s)':>12}{'ns/entrada':>12}")
+    for nombre, aceptadas, duracion in (('compilado', aceptadas_c, t_compilado), ('ingenuo', aceptadas_i, t_ingenuo)):
+        print(f"{nombre:<15}{aceptadas:>12}{duracion:>12.3f}{duracion / len(entradas) * 1e9:>12.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+# src/cleanup_journal.py
+
+import os
+import json
+import time
+import logging
+import threading
+from src import config_manager
+
+APP_LOGGER_NAME = 'OptiTechOptimizer'
+logger = logging.getLogger(APP_LOGGER_NAME)
+
+_CABECERA = "OPTITECH-DIARIO-2"
+# Antigüedad máxima de un diario para reanudarlo: pasado este tiempo los directorios que
+# constan como completados pueden volver a tener archivos temporales
+ANTIGUEDAD_MAXIMA_SEGUNDOS = 24 * 3600
+
+def ruta_diario(nivel):
+    """Ruta del diario de control de la limpieza del nivel indicado."""
+    return os.path.join(config_manager.get_app_data_path(), f"diario_limpieza_{nivel}.journal")
+
+class DiarioLimpieza:
+    """Diario de control append-only de una limpieza, para poder reanudarla si se interrumpe.
+
+    Formato (una entrada por línea, texto UTF-8):
+        OPTITECH-DIARIO-2<TAB><creación (epoch)><TAB><JSON con el nivel, las rutas raíz y las reglas>
+        T<TAB><bytes><TAB><archivos><TAB><bytes asignados>   totales acumulados al escribir
+        D<TAB><ruta>                   directorio cuyo subárbol completo ya se procesó
+
+    Un diario previo solo se reanuda si es de la misma configuración (nivel, rutas raíz y
+    reglas de selección) y no tiene más de `antiguedad_maxima` segundos; si no, se descarta.
+
+    Las entradas se acumulan en memoria y se escriben por lotes (cada `lote` directorios o
+    cada `intervalo` segundos) con un único fsync por lote. En cada lote se escribe primero
+    la línea de totales y después los directorios: si la escritura se corta, los directorios
+    no registrados se vuelven a recorrer, y como sus archivos ya no existen no se cuentan dos
+    veces. Una última línea incompleta (sin salto de línea) se ignora al leer.
+    """
+
+    def __init__(self, ruta, rutas_raiz, nivel='', reglas=None, lote=256, intervalo=2.0,
+                 antiguedad_maxima=ANTIGUEDAD_MAXIMA_SEGUNDOS, reloj=time.time):
+        self.ruta = ruta
+        self.lote = lote
+        self.intervalo = intervalo
+        self.antiguedad_maxima = antiguedad_maxima
+        self.directorios_completados = set()
+        self.total_bytes = 0
+        self.total_archivos = 0
+        self.total_asignado = 0
+        self._reloj = reloj
+        self._firma = json.dumps({'nivel': nivel, 'raices': sorted(rutas_raiz), 'reglas': reglas},
+                                 ensure_ascii=False, sort_keys=True, default=str)
+        self._pendientes = []
+        self._ultimo_volcado = time.monotonic()
+        self._lock = threading.Lock()
+
+        encoding = config_manager.get_default_encoding()
+        if self._cargar():
+            self._archivo = open(self.ruta, 'a', encoding=encoding)
+        else:
+            self._archivo = open(self.ruta, 'w', encoding=encoding)
+            self._archivo.write(f"{_CABECERA}\t{int(self._reloj())}\t{self._firma}\n")
+            self._archivo.flush()
+
+    @property
+    def reanudado(self):
+        """True si se cargó el estado de una ejecución anterior interrumpida."""
+        return bool(self.directorios_completados or self.total_archivos)
+
+    def _cargar(self):
+        """Carga un diario previo compatible. Devuelve False si no existe, es de otra configuración o es antiguo."""
+        try:
+            with open(self.ruta, 'r', encoding=config_manager.get_default_encoding()) as f:
+                lineas = f.read().split('\n')
+        except FileNotFoundError:
+            return False
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning(f"No se pudo leer el diario de limpieza {self.ruta}, se descarta: {e}")
+            return False
+
+        # El último elemento es lo que sigue al último salto de línea: vacío o una línea a medio escribir
+        lineas = lineas[:-1]
+        cabecera, _, resto = lineas[0].partition('\t') if lineas else ('', '', '')
+        creado, _, firma = resto.partition('\t')
+        if cabecera != _CABECERA or firma != self._firma:
+            logger.info(f"El diario de limpieza {self.ruta} no corresponde a la configuración actual; se descarta.")
+            return False
+        try:
+            antiguedad = self._reloj() - float(creado)
+        except ValueError:
+            antiguedad = None
+        if antiguedad is None or not 0 <= antiguedad <= self.antiguedad_maxima:
+            logger.info(f"El diario de limpieza {self.ruta} es demasiado antiguo para reanudarlo; se descarta.")
+            return False
+
+        for linea in lineas[1:]:
+            tipo, _, valor = linea.partition('\t')
+            if tipo == 'D':
+                self.directorios_completados.add(valor)
+            elif tipo == 'T':
+                try:
+                    total_bytes, total_archivos, total_asignado = (int(campo) for campo in valor.split('\t'))
+                except ValueError:
+                    continue
+                self.total_bytes, self.total_archivos, self.total_asignado = total_bytes, total_archivos, total_asignado
+        return True
+
+    def sumar(self, tamaño, asignado=0):
+        """Registra un archivo eliminado de `tamaño` bytes (`asignado` en disco) en los totales acumulados."""
+        with self._lock:
+            self.total_bytes += tamaño
+            self.total_archivos += 1
+            self.total_asignado += asignado
+
+    def marcar_directorio(self, directorio):
+        """Registra que el subárbol de `directorio` se ha procesado por completo."""
+        if '\n' in directorio:
+            return
+        with self._lock:
+            self._pendientes.append(f"D\t{directorio}\n")
+            if len(self._pendientes) >= self.lote or time.monotonic() - self._ultimo_volcado >= self.intervalo:
+                self._volcar()
+
+    def _volcar(self):
+        lineas = [f"T\t{self.total_bytes}\t{self.total_archivos}\t{self.total_asignado}\n"] + self._pendientes
+        self._archivo.write(''.join(lineas))
+        self._archivo.flush()
+        os.fsync(self._archivo.fileno())
+        self._pendientes = []
+        self._ultimo_volcado = time.monotonic()
+
+    def cerrar(self, completado):
+        """Cierra el diario. Si la limpieza terminó, lo elimina; si no, vuelca lo pendiente."""
+        with self._lock:
+            if self._archivo.closed:
+                return
+            if completado:
+                self._archivo.close()
+                try:
+                    os.remove(self.ruta)
+                except OSError as e:
+                    logger.warning(f"No se pudo eliminar el diario de limpieza {self.ruta}: {e}")
+            else:
+                self._volcar()
+                self._archivo.close()
@@ -0,0 +1,135 @@
+# src/cleanup_manifest.py
+
+import os
+import mmap
+import time
+import struct
+import logging
+from collections import namedtuple
+
+APP_LOGGER_NAME = 'OptiTechOptimizer'
+logger = logging.getLogger(APP_LOGGER_NAME)
+
+# Formato del manifiesto (little-endian):
+#   cabecera: firma de 8 bytes, fecha de creación (epoch, double), número de registros y
+#             bytes totales (uint64), longitud del nivel (uint16) y el nivel en UTF-8
+#   registro: tamaño, bytes asignados (uint64), mtime (double), inodo (uint64),
+#             longitud de la ruta (uint32) y la ruta en UTF-8
+FIRMA = b'OPTIMAN1'
+_CABECERA = struct.Struct('<8sdQQH')
+_REGISTRO = struct.Struct('<QQdQI')
+_MASCARA_INODO = (1 << 64) - 1
+# Las rutas de Windows pueden contener sustitutos sueltos que UTF-8 estricto no admite
+_ERRORES_TEXTO = 'surrogatepass'
+
+# Archivo planificado para eliminación tal como se vio en el análisis
+RegistroManifiesto = namedtuple('RegistroManifiesto', ['ruta', 'tamaño', 'asignado', 'mtime', 'inodo'])
+
+# Datos de la cabecera de un manifiesto
+CabeceraManifiesto = namedtuple('CabeceraManifiesto', ['creado', 'registros', 'bytes', 'nivel'])
+
+class ManifiestoInvalido(ValueError):
+    """El archivo no es un manifiesto de limpieza o está truncado."""
+
+def normalizar_inodo(inodo):
+    """Reduce el identificador de archivo a 64 bits (en ReFS puede tener hasta 128)."""
+    return inodo & _MASCARA_INODO
+
+class EscritorManifiesto:
+    """Escribe un manifiesto de limpieza registro a registro, sin acumularlos en memoria.
+
+    Se escribe en un archivo temporal junto al destino y se renombra al cerrar, de modo que
+    un análisis interrumpido nunca deja un manifiesto a medias que luego se pudiera aplicar.
+    Se usa como gestor de contexto; si el bloque termina con una excepción, se descarta.
+    """
+
+    def __init__(self, destino, nivel=''):
+        self.destino = destino
+        self.registros = 0
+        self.bytes = 0
+        self._nivel = nivel.encode('utf-8')
+        self._temporal = f"{destino}.tmp"
+        self._archivo = open(self._temporal, 'wb')
+        self._abierto = True
+        self._archivo.write(_CABECERA.pack(FIRMA, time.time(), 0, 0, len(self._nivel)) + self._nivel)
+
+    def agregar(self, ruta, tamaño, asignado, mtime, inodo):
+        codificada = ruta.encode('utf-8', _ERRORES_TEXTO)
+        self._archivo.write(_REGISTRO.pack(tamaño, asignado, mtime, normalizar_inodo(inodo), len(codificada)) + codificada)
+        self.registros += 1
+        self.bytes += tamaño
+
+    def cerrar(self):
+        """Completa la cabecera con los totales y publica el manifiesto en su destino."""
+        if not self._abierto:
+            return
+        self._abierto = False
+        self._archivo.seek(0)
+        self._archivo.write(_CABECERA.pack(FIRMA, time.time(), self.registros, self.bytes, len(self._nivel)))
+        self._archivo.close()
+        os.replace(self._temporal, self.destino)
+
+    def descartar(self):
+        """Elimina el manifiesto a medias (por ejemplo, si el análisis se canceló)."""
+        if not self._abierto:
+            return
+        self._abierto = False
+        self._archivo.close()
+        try:
+            os.remove(self._temporal)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if tipo is None:
+            self.cerrar()
+        else:
+            self.descartar()
+
+def _leer_cabecera(datos):
+    if len(datos) < _CABECERA.size:
+        raise ManifiestoInvalido("El archivo es demasiado corto para ser un manifiesto de limpieza.")
+    firma, creado, registros, num_bytes, longitud_nivel = _CABECERA.unpack_from(datos, 0)
+    if firma != FIRMA:
+        raise ManifiestoInvalido("El archivo no es un manifiesto de limpieza de OptiTech.")
+    inicio = _CABECERA.size + longitud_nivel
+    nivel = bytes(datos[_CABECERA.size:inicio]).decode('utf-8')
+    return CabeceraManifiesto(creado, registros, num_bytes, nivel), inicio
+
+def leer_cabecera(ruta):
+    """Devuelve la CabeceraManifiesto de `ruta` sin recorrer los registros."""
+    with open(ruta, 'rb') as archivo:
+        return _leer_cabecera(archivo.read(_CABECERA.size + 0xFFFF))[0]
+
+def _iterar_registros(datos, ruta):
+    cabecera, posicion = _leer_cabecera(datos)
+    final = len(datos)
+    for _ in range(cabecera.registros):
+        if posicion + _REGISTRO.size > final:
+            raise ManifiestoInvalido(f"Manifiesto truncado: {ruta}")
+        tamaño, asignado, mtime, inodo, longitud = _REGISTRO.unpack_from(datos, posicion)
+        posicion += _REGISTRO.size
+        if posicion + longitud > final:
+            raise ManifiestoInvalido(f"Manifiesto truncado: {ruta}")
+        ruta_archivo = datos[posicion:posicion + longitud].decode('utf-8', _ERRORES_TEXTO)
+        posicion += longitud
+        yield RegistroManifiesto(ruta_archivo, tamaño, asignado, mtime, inodo)
+
+def leer_registros(ruta):
+    """Itera los RegistroManifiesto de `ruta` leyendo el archivo a través de mmap.
+
+    Solo se decodifica el registro en curso: las páginas del archivo las gestiona el sistema
+    operativo, de modo que la memoria del proceso no crece con el número de registros.
+
+    Raises:
+        ManifiestoInvalido: si el archivo no es un manifiesto o está truncado.
+    """
+    with open(ruta, 'rb') as archivo:
+        # mmap no admite archivos vacíos
+        if os.fstat(archivo.fileno()).st_size < _CABECERA.size:
+            raise ManifiestoInvalido("El archivo es demasiado corto para ser un manifiesto de limpieza.")
+        with mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as datos:
+            yield from _iterar_registros(datos, ruta)
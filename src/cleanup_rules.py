@@ -0,0 +1,117 @@
+# src/cleanup_rules.py
+
+import os
+import re
+import time
+import fnmatch
+import logging
+from src import config_manager
+
+APP_LOGGER_NAME = 'OptiTechOptimizer'
+logger = logging.getLogger(APP_LOGGER_NAME)
+
+RULES_FILENAME = "cleanup_rules.json"
+
+# En Windows el sistema de archivos no distingue mayúsculas de minúsculas
+_FLAGS_GLOB = re.IGNORECASE if os.name == 'nt' else 0
+
+def cargar_reglas(config_filename=RULES_FILENAME):
+    """Carga las reglas de selección de archivos desde el directorio 'config'.
+
+    Returns:
+        dict: las reglas declaradas, o un diccionario vacío si el archivo no existe o no es válido.
+    """
+    reglas = config_manager.load_config(config_filename)
+    if not isinstance(reglas, dict):
+        return {}
+    return reglas
+
+def _compilar_globs(patrones):
+    """Fusiona una lista de globs en una única expresión regular precompilada.
+
+    Los patrones sin separador se comparan con el nombre del archivo; los que contienen
+    '/' se comparan con el final de la ruta completa, alineados a un componente.
+    Devuelve (regex_nombre, regex_ruta); cualquiera de los dos puede ser None.
+    """
+    de_nombre = []
+    de_ruta = []
+    for patron in patrones or []:
+        patron = patron.replace('\\', '/')
+        if '/' in patron:
+            de_ruta.append(f"(?:^|.*/){fnmatch.translate(patron.lstrip('/'))}")
+        else:
+            de_nombre.append(fnmatch.translate(patron))
+    regex_nombre = re.compile('|'.join(de_nombre), _FLAGS_GLOB) if de_nombre else None
+    regex_ruta = re.compile('|'.join(de_ruta), _FLAGS_GLOB) if de_ruta else None
+    return regex_nombre, regex_ruta
+
+def _normalizar_extensiones(extensiones):
+    return frozenset(('.' + ext.lstrip('.')).lower() for ext in extensiones or [])
+
+def compilar_reglas(reglas, ahora=None):
+    """Compila un conjunto de reglas en un predicado rápido.
+
+    Reglas admitidas (todas opcionales; las que faltan no filtran):
+        min_age_days (float): antigüedad mínima según la fecha de modificación.
+        min_size_mb / max_size_mb (float): tamaño mínimo / máximo.
+        include / exclude (list[str]): globs que debe / no debe cumplir el archivo.
+        extensions / exclude_extensions (list[str]): extensiones permitidas / excluidas.
+
+    Los globs se fusionan en una sola expresión regular por tipo, y la edad y el tamaño
+    se comparan con el stat que ya obtiene el recorrido, sin llamadas adicionales.
+
+    Args:
+        reglas (dict): reglas tal como se declaran en el archivo JSON.
+        ahora (float, optional): instante de referencia (epoch) para la antigüedad.
+
+    Returns:
+        callable | None: predicado(ruta, nombre, stat) -> bool, o None si las reglas aceptan
+        cualquier archivo (así el llamante puede omitir la evaluación por completo).
+    """
+    reglas = reglas or {}
+    if ahora is None:
+        ahora = time.time()
+
+    min_age_days = reglas.get('min_age_days') or 0
+    umbral_mtime = ahora - min_age_days * 86400 if min_age_days > 0 else None
+    min_bytes = int((reglas.get('min_size_mb') or 0) * 1024 * 1024) or None
+    max_size_mb = reglas.get('max_size_mb')
+    max_bytes = int(max_size_mb * 1024 * 1024) if max_size_mb is not None else None
+    incluir_nombre, incluir_ruta = _compilar_globs(reglas.get('include'))
+    excluir_nombre, excluir_ruta = _compilar_globs(reglas.get('exclude'))
+    extensiones = _normalizar_extensiones(reglas.get('extensions'))
+    extensiones_excluidas = _normalizar_extensiones(reglas.get('exclude_extensions'))
+
+    hay_include = incluir_nombre is not None or incluir_ruta is not None
+    necesita_ruta = incluir_ruta is not None or excluir_ruta is not None
+    necesita_extension = bool(extensiones or extensiones_excluidas)
+
+    if not (umbral_mtime is not None or min_bytes or max_bytes is not None or hay_include
+            or excluir_nombre is not None or excluir_ruta is not None or necesita_extension):
+        return None
+
+    def predicado(ruta, nombre, info):
+        # Primero las comparaciones numéricas, que son las más baratas
+        if umbral_mtime is not None and info.st_mtime > umbral_mtime:
+            return False
+        if min_bytes is not None and info.st_size < min_bytes:
+            return False
+        if max_bytes is not None and info.st_size > max_bytes:
+            return False
+        if necesita_extension:
+            extension = os.path.splitext(nombre)[1].lower()
+            if extensiones and extension not in extensiones:
+                return False
+            if extension in extensiones_excluidas:
+                return False
+        ruta_normalizada = ruta.replace('\\', '/') if necesita_ruta else None
+        if excluir_nombre is not None and excluir_nombre.match(nombre):
+            return False
+        if excluir_ruta is not None and excluir_ruta.match(ruta_normalizada):
+            return False
+        if hay_include:
+            return bool((incluir_nombre is not None and incluir_nombre.match(nombre)) or
+                        (incluir_ruta is not None and incluir_ruta.match(ruta_normalizada)))
+        return True
+
+    return predicado
@@ -0,0 +1,230 @@
+# src/cleanup_staging.py
+
+import os
+import time
+import queue
+import logging
+import threading
+from src import subtree_delete
+
+APP_LOGGER_NAME = 'OptiTechOptimizer'
+logger = logging.getLogger(APP_LOGGER_NAME)
+
+# Área de purga de cada raíz de limpieza: un subdirectorio de la propia raíz, de modo que
+# está en el mismo volumen y mover algo a él es un simple renombrado
+DIRECTORIO_PURGA = '.optitech_purga'
+
+def area_purga(raiz):
+    """Devuelve la ruta del área de purga de `raiz`."""
+    return os.path.join(raiz, DIRECTORIO_PURGA)
+
+def preparar(raiz, cancelacion=None, conservar=None):
+    """Mueve las entradas de primer nivel de `raiz` a un lote nuevo de su área de purga.
+
+    Cada entrada se mueve con un único renombrado, sea un archivo o un subárbol completo. Las
+    que no se pueden mover (en Windows, por ejemplo, un directorio con algún archivo abierto)
+    se quedan en su sitio para que las trate el recorrido normal, igual que aquellas para las
+    que `conservar(ruta)` devuelve True (por ejemplo, las que contienen archivos en uso).
+
+    Returns:
+        tuple[str | None, int]: ruta del lote (None si no se movió nada) y entradas movidas.
+    """
+    lote = os.path.join(area_purga(raiz), f"{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}_{time.monotonic_ns()}")
+    try:
+        with os.scandir(raiz) as entradas:
+            nombres = [entrada.name for entrada in entradas if entrada.name != DIRECTORIO_PURGA]
+        if not nombres:
+            return None, 0
+        os.makedirs(lote)
+    except OSError as e:
+        logger.warning(f"No se pudo preparar el área de purga de {raiz}: {e}")
+        return None, 0
+
+    movidas = 0
+    for nombre in nombres:
+        if cancelacion is not None and cancelacion.is_set():
+            break
+        if conservar is not None and conservar(os.path.join(raiz, nombre)):
+            continue
+        try:
+            os.rename(os.path.join(raiz, nombre), os.path.join(lote, nombre))
+            movidas += 1
+        except OSError as e:
+            logger.debug(f"No se pudo mover {os.path.join(raiz, nombre)} al área de purga: {e}")
+    if not movidas:
+        _eliminar_vacio(lote)
+        _eliminar_vacio(area_purga(raiz))
+        return None, 0
+    logger.info(f"{movidas} elementos de {raiz} movidos al área de purga.")
+    return lote, movidas
+
+def lotes_pendientes(raiz):
+    """Lotes que quedan en el área de purga de `raiz` (por ejemplo, de una purga interrumpida)."""
+    try:
+        with os.scandir(area_purga(raiz)) as entradas:
+            return sorted(entrada.path for entrada in entradas if entrada.is_dir(follow_symlinks=False))
+    except OSError:
+        return []
+
+def _medir(lote):
+    """Suma el tamaño de los archivos de `lote` en una sola pasada, sin seguir enlaces."""
+    total = 0
+    pendientes = [lote]
+    while pendientes:
+        try:
+            with os.scandir(pendientes.pop()) as entradas:
+                for entrada in entradas:
+                    try:
+                        if entrada.is_dir(follow_symlinks=False):
+                            pendientes.append(entrada.path)
+                        else:
+                            total += entrada.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        pass
+        except OSError as e:
+            logger.debug(f"No se pudo medir el contenido de un lote de purga: {e}")
+    return total
+
+def _eliminar_vacio(directorio):
+    try:
+        os.rmdir(directorio)
+    except OSError:
+        pass
+
+class PurgaSegundoPlano:
+    """Vacía en un hilo en segundo plano los lotes movidos al área de purga.
+
+    Los lotes se procesan en orden de llegada; el hilo termina cuando no quedan y se vuelve a
+    arrancar con el siguiente lote. Es un hilo daemon: si el programa termina antes, los
+    lotes siguen en el área de purga y la próxima limpieza los retoma (ver reanudar).
+
+    Antes de purgar un lote se mide su contenido, de modo que bytes_preparados incluye el lote
+    completo desde que empieza su purga y no solo lo ya eliminado. Los totales son los de la
+    ejecución de limpieza actual (ver reiniciar_contadores).
+    """
+
+    def __init__(self):
+        self.bytes_preparados = 0
+        self.bytes_purgados = 0
+        self.archivos_purgados = 0
+        self.avisos = 0
+        # Tamaño del lote que se está purgando y bytes ya eliminados de él
+        self._tamaño_lote = 0
+        self._purgado_lote = 0
+        self._lotes = queue.Queue()
+        self._encolados = set()
+        self._hilo = None
+        self._lock = threading.Lock()
+
+    def agregar(self, lote, limitador=None):
+        """Encola `lote` para purgarlo con el limitador de E/S indicado (o sin límite)."""
+        with self._lock:
+            if lote in self._encolados:
+                return
+            self._encolados.add(lote)
+            self._lotes.put((lote, limitador))
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._ejecutar, name='PurgaLimpieza', daemon=True)
+                self._hilo.start()
+
+    def reanudar(self, raices, limitador=None):
+        """Encola los lotes que una ejecución anterior dejó sin purgar en las raíces indicadas."""
+        reanudados = 0
+        for raiz in raices:
+            for lote in lotes_pendientes(raiz):
+                with self._lock:
+                    pendiente = lote in self._encolados
+                if not pendiente:
+                    self.agregar(lote, limitador)
+                    reanudados += 1
+        if reanudados:
+            logger.info(f"Se retoma la purga de {reanudados} lotes pendientes de una limpieza anterior.")
+        return reanudados
+
+    def reiniciar_contadores(self):
+        """Pone a cero los totales al empezar una ejecución de limpieza.
+
+        Lo que falta por purgar del lote en curso (de una ejecución anterior) sigue contando
+        como preparado, para que los bytes purgados nunca superen a los preparados.
+        """
+        with self._lock:
+            self.bytes_preparados = self._tamaño_lote - self._purgado_lote
+            self.bytes_purgados = 0
+            self.archivos_purgados = 0
+            self.avisos = 0
+
+    def activa(self):
+        with self._lock:
+            return self._hilo is not None
+
+    def lotes_pendientes(self):
+        with self._lock:
+            return len(self._encolados)
+
+    def esperar(self, timeout=None):
+        """Espera a que se purguen todos los lotes encolados. Devuelve si se completó la purga."""
+        limite = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                hilo = self._hilo
+            if hilo is None:
+                return True
+            restante = None if limite is None else limite - time.monotonic()
+            if restante is not None and restante <= 0:
+                return False
+            hilo.join(restante)
+
+    def _ejecutar(self):
+        while True:
+            with self._lock:
+                try:
+                    lote, limitador = self._lotes.get_nowait()
+                except queue.Empty:
+                    self._hilo = None
+                    return
+            try:
+                self._purgar_lote(lote, limitador)
+            except Exception as e:
+                self.avisos += 1
+                logger.error(f"Error inesperado al purgar {lote}: {e}", exc_info=True)
+            finally:
+                with self._lock:
+                    self._encolados.discard(lote)
+                    self._tamaño_lote = self._purgado_lote = 0
+
+    def _purgar_lote(self, lote, limitador):
+        tamaño_lote = _medir(lote)
+        with self._lock:
+            self.bytes_preparados += tamaño_lote
+            self._tamaño_lote, self._purgado_lote = tamaño_lote, 0
+
+        def al_eliminar(tamaño, asignado):
+            with self._lock:
+                self.bytes_purgados += tamaño
+                self._purgado_lote += tamaño
+                self.archivos_purgados += 1
+
+        # Todo el lote es eliminable: se elimina como un subárbol, sin examinar cada archivo
+        resultado = subtree_delete.eliminar_subarbol(lote, limitador=limitador, al_eliminar=al_eliminar)
+        with self._lock:
+            self.avisos += resultado.avisos + len(resultado.fallidos)
+        for ruta, info in resultado.fallidos:
+            logger.warning(f"No se pudo eliminar {ruta} durante la purga.")
+        if not resultado.completo:
+            logger.warning(f"La purga de {lote} no se pudo completar; se retomará en la próxima limpieza.")
+            return
+        # El área se elimina cuando queda vacía (no hay más lotes en ella)
+        _eliminar_vacio(os.path.dirname(lote))
+        logger.info(f"Purga completada: {lote}")
+
+# Purga compartida por todas las limpiezas del proceso (ver purga)
+_purga = None
+_lock_purga = threading.Lock()
+
+def purga():
+    """Devuelve la PurgaSegundoPlano del proceso, creándola la primera vez."""
+    global _purga
+    with _lock_purga:
+        if _purga is None:
+            _purga = PurgaSegundoPlano()
+        return _purga
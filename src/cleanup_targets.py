@@ -0,0 +1,116 @@
+# src/cleanup_targets.py
+
+import os
+import glob
+import logging
+import functools
+from collections import namedtuple
+from src import config_manager
+
+APP_LOGGER_NAME = 'OptiTechOptimizer'
+logger = logging.getLogger(APP_LOGGER_NAME)
+
+TARGETS_FILENAME = "cleanup_targets.json"
+
+# Raíz de limpieza ya resuelta (variables expandidas y globs aplicados) y reglas propias de
+# su objetivo, que se aplican sobre las de config/cleanup_rules.json
+RaizLimpieza = namedtuple('RaizLimpieza', ['ruta', 'reglas'])
+
+# Nivel de limpieza tal como se declara: nombre, texto del menú, objetivos propios, nivel
+# del que hereda los suyos (o None) y si aparece en el menú (si no, solo se usa por su nombre)
+NivelLimpieza = namedtuple('NivelLimpieza', ['nombre', 'etiqueta', 'objetivos', 'hereda', 'menu'], defaults=(True,))
+
+# Se usa si config/cleanup_targets.json no existe o no es válido
+_CONFIGURACION_POR_DEFECTO = {
+    'levels': {
+        'basico': {'label': 'Limpieza Básica (Archivos Temporales)',
+                   'targets': ['temp_usuario', 'temp_sistema', 'descargas_windows_update']},
+        'extendido': {'label': 'Limpieza Extendida (Archivos Temporales y Prefetch)', 'extends': 'basico',
+                      'targets': ['prefetch', 'logs_cbs']},
+        'avanzado': {'label': 'Limpieza Avanzada (Archivos Temporales y Prefetch)', 'extends': 'extendido',
+                     'targets': [], 'menu': False},
+    },
+    'targets': {
+        'temp_usuario': {'paths': [r'%TEMP%']},
+        'temp_sistema': {'paths': [r'%SystemRoot%\Temp']},
+        'descargas_windows_update': {'paths': [r'%SystemRoot%\SoftwareDistribution\Download']},
+        'prefetch': {'paths': [r'%SystemRoot%\Prefetch']},
+        'logs_cbs': {'paths': [r'%SystemRoot%\Logs\CBS']},
+    },
+}
+
+_COMODINES = ('*', '?', '[')
+
+@functools.lru_cache(maxsize=None)
+def cargar_configuracion(config_filename=TARGETS_FILENAME):
+    """Carga los niveles y objetivos de limpieza desde el directorio 'config'.
+
+    Se lee una sola vez por proceso, la primera vez que se necesita (ver recargar).
+
+    Returns:
+        tuple[dict, dict]: niveles por nombre (NivelLimpieza, en el orden declarado) y
+        objetivos por nombre tal como se declaran ('paths', 'rules').
+    """
+    configuracion = config_manager.load_config(config_filename)
+    if not isinstance(configuracion, dict) or not isinstance(configuracion.get('levels'), dict):
+        logger.warning(f"No se pudo cargar {config_filename}; se usan los objetivos de limpieza por defecto.")
+        configuracion = _CONFIGURACION_POR_DEFECTO
+    niveles = {nombre: NivelLimpieza(nombre, nivel.get('label', nombre), tuple(nivel.get('targets', [])), nivel.get('extends'),
+                                     bool(nivel.get('menu', True)))
+               for nombre, nivel in configuracion['levels'].items()}
+    return niveles, configuracion.get('targets') or {}
+
+def niveles():
+    """Devuelve los niveles de limpieza (NivelLimpieza) en el orden en que se declaran."""
+    return list(cargar_configuracion()[0].values())
+
+def _expandir(patron):
+    """Expande las variables de entorno de `patron` y, si tiene comodines, lo resuelve como glob."""
+    ruta = os.path.expandvars(patron)
+    if not any(comodin in ruta for comodin in _COMODINES):
+        return [ruta]
+    directorios = sorted(coincidencia for coincidencia in glob.glob(ruta) if os.path.isdir(coincidencia))
+    if not directorios:
+        logger.debug(f"El patrón de limpieza no coincide con ningún directorio: {ruta}")
+    return directorios
+
+@functools.lru_cache(maxsize=None)
+def resolver_nivel(nivel):
+    """Resuelve las raíces de limpieza de un nivel, incluidas las de los niveles de los que hereda.
+
+    El resultado se cachea: las variables de entorno y los globs se evalúan una vez por nivel
+    y proceso. No se comprueba si las rutas existen; de eso se encarga el llamante.
+
+    Returns:
+        tuple[RaizLimpieza]: raíces sin duplicados, primero las de los niveles heredados.
+    """
+    declarados, objetivos = cargar_configuracion()
+    cadena = []
+    actual = nivel
+    while actual is not None:
+        if actual not in declarados:
+            logger.warning(f"Nivel de limpieza desconocido: {actual}")
+            break
+        if actual in cadena:
+            logger.warning(f"Herencia circular entre niveles de limpieza: {' -> '.join(cadena + [actual])}")
+            break
+        cadena.append(actual)
+        actual = declarados[actual].hereda
+
+    raices = {}
+    for nombre_nivel in reversed(cadena):
+        for nombre_objetivo in declarados[nombre_nivel].objetivos:
+            objetivo = objetivos.get(nombre_objetivo)
+            if not isinstance(objetivo, dict):
+                logger.warning(f"Objetivo de limpieza no declarado en {TARGETS_FILENAME}: {nombre_objetivo}")
+                continue
+            reglas = objetivo.get('rules') or {}
+            for patron in objetivo.get('paths', []):
+                for ruta in _expandir(patron):
+                    raices.setdefault(ruta, RaizLimpieza(ruta, reglas))
+    return tuple(raices.values())
+
+def recargar():
+    """Descarta la configuración y las rutas cacheadas para que se vuelvan a leer en el próximo uso."""
+    cargar_configuracion.cache_clear()
+    resolver_nivel.cache_clear()
@@ -0,0 +1,135 @@
+# src/collector_registry.py
+
+import time
+import logging
+import threading
+from collections import namedtuple
+from src import parallel_collectors
+
+APP_LOGGER_NAME = 'OptiTechOptimizer'
+logger = logging.getLogger(APP_LOGGER_NAME)
+
+# Clases de coste, de menor a mayor: se lanzan en este orden y fijan el plazo por defecto
+BARATO = 'barato'
+COSTOSO = 'costoso'
+BLOQUEANTE = 'bloqueante'
+COSTES = (BARATO, COSTOSO, BLOQUEANTE)
+PLAZOS_POR_COSTE = {BARATO: 5.0, COSTOSO: 10.0, BLOQUEANTE: 30.0}
+
+# Perfiles: clases de coste que ejecuta cada uno. El rápido es el de las sondas de salud
+RAPIDO = 'rapido'
+COMPLETO = 'completo'
+PERFILES = {RAPIDO: (BARATO,), COMPLETO: COSTES}
+
+# Estado del resultado de un recolector reutilizado de la caché (ver RegistroRecolectores.ejecutar)
+EN_CACHE = 'en_cache'
+
+# Recolector registrado: nombre, función, clase de coste, nombres de los recolectores de los
+# que depende (la función recibe sus datos como argumentos con nombre), segundos durante los
+# que se reutiliza su último resultado (0: no se guarda) y plazo de ejecución en segundos
+DefinicionRecolector = namedtuple('DefinicionRecolector', ['nombre', 'funcion', 'coste', 'dependencias', 'ttl', 'plazo'])
+
+class RegistroRecolectores:
+    """Registro de las fuentes de datos del análisis y planificador de su ejecución.
+
+    Cada recolector declara su clase de coste, sus dependencias y durante cuánto tiempo se
+    puede reutilizar su resultado. Añadir una fuente de datos es registrar su función (con
+    registrar() o el decorador recolector()); ejecutar() elige los recolectores del perfil,
+    los ordena por coste y los ejecuta en paralelo con parallel_collectors.
+    """
+
+    def __init__(self, reloj=time.monotonic):
+        self._reloj = reloj
+        self._definiciones = {}
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, nombre, funcion, coste=BARATO, dependencias=(), ttl=0, plazo=None):
+        """Registra (o sustituye) un recolector y devuelve su DefinicionRecolector."""
+        if coste not in COSTES:
+            raise ValueError(f"Clase de coste desconocida para el recolector '{nombre}': {coste}")
+        definicion = DefinicionRecolector(nombre, funcion, coste, tuple(dependencias), ttl,
+                                          PLAZOS_POR_COSTE[coste] if plazo is None else plazo)
+        with self._lock:
+            self._definiciones[nombre] = definicion
+            self._cache.pop(nombre, None)
+        return definicion
+
+    def recolector(self, nombre, **opciones):
+        """Decorador equivalente a registrar(nombre, funcion, **opciones)."""
+        def decorador(funcion):
+            self.registrar(nombre, funcion, **opciones)
+            return funcion
+        return decorador
+
+    def definiciones(self):
+        with self._lock:
+            return list(self._definiciones.values())
+
+    def vaciar_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    def planificar(self, perfil=COMPLETO):
+        """Devuelve las definiciones que ejecuta `perfil`, ordenadas por coste.
+
+        Un recolector cuyo coste entra en el perfil pero que depende de otro que no entra
+        también se excluye.
+        """
+        if perfil not in PERFILES:
+            raise ValueError(f"Perfil de análisis desconocido: {perfil}")
+        costes = PERFILES[perfil]
+        definiciones = {d.nombre: d for d in self.definiciones() if d.coste in costes}
+        excluido = True
+        while excluido:
+            excluido = False
+            for nombre, definicion in list(definiciones.items()):
+                faltan = [dependencia for dependencia in definicion.dependencias if dependencia not in definiciones]
+                if faltan:
+                    logger.debug(f"El recolector '{nombre}' no entra en el perfil '{perfil}': depende de {', '.join(faltan)}.")
+                    del definiciones[nombre]
+                    excluido = True
+        # sorted es estable: a igual coste se respeta el orden de registro
+        return sorted(definiciones.values(), key=lambda d: COSTES.index(d.coste))
+
+    def ejecutar(self, perfil=COMPLETO, al_terminar=None):
+        """Ejecuta los recolectores del perfil y devuelve sus resultados.
+
+        Los recolectores con un resultado correcto de hace menos de `ttl` segundos no se
+        vuelven a ejecutar: su resultado tiene el estado EN_CACHE (con los segundos que tardó
+        cuando se obtuvo) y sus datos se pasan igualmente a los que dependen de ellos.
+
+        Returns:
+            dict: nombre -> parallel_collectors.ResultadoRecolector, en el orden de ejecución.
+        """
+        plan = self.planificar(perfil)
+        ahora = self._reloj()
+        with self._lock:
+            en_cache = {d.nombre: self._cache[d.nombre][1] for d in plan
+                        if d.nombre in self._cache and ahora - self._cache[d.nombre][0] < d.ttl}
+
+        recolectores = []
+        for definicion in plan:
+            funcion = definicion.funcion
+            if definicion.nombre in en_cache:
+                funcion = lambda valor=en_cache[definicion.nombre].valor, **_: valor
+            recolectores.append(parallel_collectors.Recolector(definicion.nombre, funcion, definicion.plazo, definicion.dependencias))
+
+        def terminado(nombre, resultado):
+            if nombre in en_cache and resultado.estado == parallel_collectors.OK:
+                resultado = en_cache[nombre]._replace(estado=EN_CACHE)
+            if al_terminar is not None:
+                al_terminar(nombre, resultado)
+
+        logger.info(f"Ejecutando {len(recolectores)} recolectores del perfil '{perfil}' ({len(en_cache)} desde la caché).")
+        resultados = parallel_collectors.ejecutar(recolectores, al_terminar=terminado)
+
+        finalizado = self._reloj()
+        with self._lock:
+            for definicion in plan:
+                resultado = resultados[definicion.nombre]
+                if definicion.nombre in en_cache:
+                    resultados[definicion.nombre] = en_cache[definicion.nombre]._replace(estado=EN_CACHE)
+                elif definicion.ttl > 0 and resultado.estado == parallel_collectors.OK:
+                    self._cache[definicion.nombre] = (finalizado, resultado)
+        return resultados
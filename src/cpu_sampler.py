@@ -0,0 +1,137 @@
+# src/cpu_sampler.py
+
+import time
+import psutil
+import logging
+import threading
+from collections import deque, namedtuple
+
+APP_LOGGER_NAME = 'OptiTechOptimizer'
+logger = logging.getLogger(APP_LOGGER_NAME)
+
+# Ventana mínima entre las dos instantáneas: con menos, los contadores del sistema (que
+# avanzan en ticks de 10-15 ms) dan porcentajes sin sentido
+VENTANA_MINIMA_SEGUNDOS = 0.1
+# Antigüedad máxima de la instantánea de referencia: con más, la medida sería la media desde
+# hace minutos (el arranque o el análisis anterior) y no la carga actual. Con el hilo de
+# calentar() en marcha no se llega a alcanzar
+VENTANA_MAXIMA_SEGUNDOS = 5.0
+# Ventana que se espera cuando no hay una instantánea previa (sin calentar) o es demasiado antigua
+VENTANA_SIN_CALENTAR_SEGUNDOS = 1.0
+# Cada cuánto renueva el hilo de calentar() la instantánea de referencia
+INTERVALO_RENOVACION_SEGUNDOS = 1.0
+# Instantáneas recientes que se conservan para elegir la referencia de cada medida
+_INSTANTANEAS_CONSERVADAS = 4
+
+# Uso de CPU entre dos instantáneas: porcentaje total, porcentaje por núcleo lógico y
+# duración de la ventana medida en segundos
+UsoCPU = namedtuple('UsoCPU', ['total', 'por_nucleo', 'segundos'])
+
+def _tiempos(tiempos):
+    """Devuelve (tiempo total, tiempo ocupado) de un cpu_times, con el mismo criterio que psutil.cpu_percent."""
+    total = sum(tiempos)
+    # En Linux 'guest' y 'guest_nice' ya están incluidos en 'user' y 'nice'
+    total -= getattr(tiempos, 'guest', 0) + getattr(tiempos, 'guest_nice', 0)
+    ocupado = total - tiempos.idle - getattr(tiempos, 'iowait', 0)
+    return total, ocupado
+
+def _porcentaje(total, ocupado):
+    if total <= 0:
+        return 0.0
+    return round(min(100.0, max(0.0, ocupado / total * 100)), 1)
+
+class MuestreadorCPU:
+    """Calcula el uso de CPU total y por núcleo a partir de un par de instantáneas de cpu_times.
+
+    Cada medida compara los tiempos por núcleo actuales con la instantánea reciente más nueva
+    que tenga al menos VENTANA_MINIMA_SEGUNDOS, y deja los actuales entre las recientes. calentar()
+    toma la primera instantánea de antemano (por ejemplo, al arrancar) y lanza un hilo daemon
+    que la renueva cada INTERVALO_RENOVACION_SEGUNDOS, de modo que una medida en cualquier
+    momento posterior no espera y mide la carga del último segundo, no la media desde el arranque.
+    Solo se espera si todas las instantáneas son más recientes que VENTANA_MINIMA_SEGUNDOS (lo
+    que falte hasta ella), o si no las hay o la última tiene más de VENTANA_MAXIMA_SEGUNDOS (sin
+    calentar): entonces se toma una nueva y se mide durante VENTANA_SIN_CALENTAR_SEGUNDOS. El
+    total se deriva de los mismos tiempos por núcleo.
+    """
+
+    def __init__(self, reloj=time.monotonic, dormir=time.sleep, intervalo=INTERVALO_RENOVACION_SEGUNDOS):
+        self._reloj = reloj
+        self._dormir = dormir
+        self._intervalo = intervalo
+        # (instante, cpu_times por núcleo), de la más antigua a la más reciente
+        self._instantaneas = deque(maxlen=_INSTANTANEAS_CONSERVADAS)
+        self._lock = threading.Lock()
+        self._hilo = None
+        self._parar = threading.Event()
+
+    def calentar(self):
+        """Toma la instantánea de referencia sin esperar y lanza el hilo que la renueva."""
+        self.renovar()
+        with self._lock:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._parar.clear()
+                self._hilo = threading.Thread(target=self._renovar_periodicamente, name='OptiTechMuestreadorCPU', daemon=True)
+                self._hilo.start()
+
+    def detener(self):
+        """Detiene el hilo de renovación, si está en marcha."""
+        self._parar.set()
+        with self._lock:
+            hilo, self._hilo = self._hilo, None
+        if hilo is not None:
+            hilo.join()
+
+    def renovar(self):
+        """Añade una instantánea de los tiempos actuales a las recientes."""
+        tiempos = psutil.cpu_times(percpu=True)
+        with self._lock:
+            self._instantaneas.append((self._reloj(), tiempos))
+
+    def _renovar_periodicamente(self):
+        while not self._parar.wait(self._intervalo):
+            try:
+                self.renovar()
+            except Exception as e:
+                logger.debug(f"No se pudo renovar la instantánea de CPU: {e}")
+
+    def medir(self):
+        """Devuelve el UsoCPU desde una instantánea reciente, esperando solo lo imprescindible."""
+        with self._lock:
+            ahora = self._reloj()
+            if not self._instantaneas or ahora - self._instantaneas[-1][0] > VENTANA_MAXIMA_SEGUNDOS:
+                self._instantaneas.append((ahora, psutil.cpu_times(percpu=True)))
+                referencia = self._instantaneas[-1]
+                espera = VENTANA_SIN_CALENTAR_SEGUNDOS
+            else:
+                validas = [instantanea for instantanea in self._instantaneas if ahora - instantanea[0] >= VENTANA_MINIMA_SEGUNDOS]
+                referencia = validas[-1] if validas else self._instantaneas[0]
+                espera = VENTANA_MINIMA_SEGUNDOS - (ahora - referencia[0])
+            if espera > 0:
+                self._dormir(espera)
+            actual = psutil.cpu_times(percpu=True)
+            ahora = self._reloj()
+            self._instantaneas.append((ahora, actual))
+        instante, anterior = referencia
+        segundos = ahora - instante
+
+        total = ocupado = 0.0
+        por_nucleo = []
+        for antes, despues in zip(anterior, actual):
+            total_antes, ocupado_antes = _tiempos(antes)
+            total_despues, ocupado_despues = _tiempos(despues)
+            por_nucleo.append(_porcentaje(total_despues - total_antes, ocupado_despues - ocupado_antes))
+            total += total_despues - total_antes
+            ocupado += ocupado_despues - ocupado_antes
+        return UsoCPU(_porcentaje(total, ocupado), por_nucleo, segundos)
+
+# Muestreador compartido por todos los análisis del proceso (ver muestreador)
+_muestreador = None
+_lock_muestreador = threading.Lock()
+
+def muestreador():
+    """Devuelve el MuestreadorCPU del proceso, creándolo la primera vez."""
+    global _muestreador
+    with _lock_muestreador:
+        if _muestreador is None:
+            _muestreador = MuestreadorCPU()
+        return _muestreador
@@ -0,0 +1,138 @@
+# src/duplicate_finder.py
+
+import os
+import hashlib
+import logging
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+APP_LOGGER_NAME = 'OptiTechOptimizer'
+logger = logging.getLogger(APP_LOGGER_NAME)
+
+# Bytes leídos del principio y del final de cada archivo en el hash parcial
+BLOQUE_PARCIAL = 64 * 1024
+_BLOQUE_LECTURA = 1024 * 1024
+
+GrupoDuplicados = namedtuple('GrupoDuplicados', ['tamaño', 'rutas', 'recuperable'])
+
+def _nuevo_hash():
+    return hashlib.blake2b(digest_size=20)
+
+def _hash_parcial(ruta, tamaño, bloque):
+    """Hash del primer y el último bloque de `ruta`. Si el archivo cabe en ellos, es el hash completo."""
+    h = _nuevo_hash()
+    with open(ruta, 'rb') as f:
+        if tamaño <= 2 * bloque:
+            h.update(f.read())
+        else:
+            h.update(f.read(bloque))
+            f.seek(-bloque, os.SEEK_END)
+            h.update(f.read(bloque))
+    return h.digest()
+
+def _hash_completo(ruta):
+    h = _nuevo_hash()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(_BLOQUE_LECTURA), b''):
+            h.update(bloque)
+    return h.digest()
+
+def _colapsar_enlaces(rutas):
+    """Deja una sola ruta por archivo físico: los enlaces duros comparten (st_dev, st_ino).
+
+    Eliminar un enlace duro no libera espacio mientras quede otro, así que no son duplicados.
+    Se conservan las rutas que no se pueden consultar (el hash avisará) y las de sistemas de
+    archivos sin número de inodo (st_ino 0).
+    """
+    unicas = []
+    vistos = set()
+    for ruta in rutas:
+        try:
+            info = os.stat(ruta, follow_symlinks=False)
+        except OSError:
+            unicas.append(ruta)
+            continue
+        if info.st_ino:
+            identidad = (info.st_dev, info.st_ino)
+            if identidad in vistos:
+                logger.debug(f"Enlace duro de un archivo ya considerado, no es un duplicado: {ruta}")
+                continue
+            vistos.add(identidad)
+        unicas.append(ruta)
+    return unicas
+
+def _agrupar_por_hash(grupos, funcion_hash, workers):
+    """Calcula `funcion_hash(ruta, tamaño)` en paralelo y subdivide cada grupo por el resultado.
+
+    Los archivos que no se pueden leer se descartan con un aviso. Solo se devuelven los
+    subgrupos con al menos dos archivos.
+    """
+    trabajos = [(clave, ruta, tamaño) for clave, (tamaño, rutas) in grupos.items() for ruta in rutas]
+
+    def calcular(trabajo):
+        clave, ruta, tamaño = trabajo
+        try:
+            return clave, ruta, tamaño, funcion_hash(ruta, tamaño)
+        except OSError as e:
+            logger.warning(f"No se pudo leer {ruta} para buscar duplicados: {e}")
+            return clave, ruta, tamaño, None
+
+    subgrupos = defaultdict(list)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for clave, ruta, tamaño, digest in executor.map(calcular, trabajos):
+            if digest is not None:
+                subgrupos[(clave, digest)].append(ruta)
+    return {clave: (grupos[clave[0]][0], rutas) for clave, rutas in subgrupos.items() if len(rutas) > 1}
+
+def buscar_duplicados(candidatos, workers=4, tamaño_minimo=1, bloque=BLOQUE_PARCIAL):
+    """Agrupa los archivos de contenido idéntico de un iterable de CandidatoLimpieza.
+
+    Se procede en tres etapas, cada una solo sobre los archivos que siguen coincidiendo:
+    agrupación por tamaño (sin leer nada), hash del primer y el último bloque, y hash
+    completo. Los archivos que caben en el hash parcial no se vuelven a leer. La lectura
+    se reparte entre `workers` hilos. Los enlaces duros de un mismo archivo cuentan como uno
+    solo (ver _colapsar_enlaces); solo se consultan los de tamaños repetidos.
+
+    Args:
+        candidatos (iterable): CandidatoLimpieza (o cualquier objeto con `ruta` y `tamaño`).
+        workers (int): hilos usados para calcular los hashes.
+        tamaño_minimo (int): los archivos más pequeños (en bytes) se ignoran.
+        bloque (int): bytes leídos al principio y al final de cada archivo en el hash parcial.
+
+    Returns:
+        list[GrupoDuplicados]: grupos ordenados de mayor a menor espacio recuperable, donde
+        `recuperable` son los bytes que se liberarían conservando una sola copia.
+    """
+    por_tamaño = defaultdict(list)
+    vistos = set()
+    for candidato in candidatos:
+        if candidato.tamaño < max(1, tamaño_minimo):
+            continue
+        clave_ruta = os.path.normcase(os.path.abspath(candidato.ruta))
+        if clave_ruta in vistos: # La misma ruta alcanzada desde raíces solapadas
+            continue
+        vistos.add(clave_ruta)
+        por_tamaño[candidato.tamaño].append(candidato.ruta)
+
+    grupos = {}
+    for tamaño, rutas in por_tamaño.items():
+        if len(rutas) > 1:
+            rutas = _colapsar_enlaces(rutas)
+            if len(rutas) > 1:
+                grupos[tamaño] = (tamaño, rutas)
+    en_grupos = sum(len(rutas) for _, rutas in grupos.values())
+    logger.debug(f"Duplicados: {len(vistos)} archivos, {en_grupos} comparten tamaño con otro archivo.")
+
+    parciales = _agrupar_por_hash(grupos, lambda ruta, tamaño: _hash_parcial(ruta, tamaño, bloque), workers)
+
+    # Los grupos de archivos pequeños ya están resueltos con el hash parcial
+    definitivos = [(tamaño, rutas) for tamaño, rutas in parciales.values() if tamaño <= 2 * bloque]
+    pendientes = {clave: valor for clave, valor in parciales.items() if valor[0] > 2 * bloque}
+    completos = _agrupar_por_hash(pendientes, lambda ruta, tamaño: _hash_completo(ruta), workers)
+    logger.debug(f"Duplicados: {sum(len(r) for _, r in parciales.values())} archivos tras el hash parcial, "
+                 f"{sum(len(r) for _, r in pendientes.values())} con hash completo.")
+    definitivos.extend(completos.values())
+
+    resultado = [GrupoDuplicados(tamaño, sorted(rutas), tamaño * (len(rutas) - 1)) for tamaño, rutas in definitivos]
+    resultado.sort(key=lambda grupo: (-grupo.recuperable, grupo.rutas[0]))
+    return resultado
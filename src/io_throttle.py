@@ -0,0 +1,128 @@
+# src/io_throttle.py
+
+import time
+import logging
+import threading
+from src import config_manager
+
+APP_LOGGER_NAME = 'OptiTechOptimizer'
+logger = logging.getLogger(APP_LOGGER_NAME)
+
+THROTTLE_FILENAME = "cleanup_throttle.json"
+
+# Claves admitidas en config/cleanup_throttle.json y en las opciones de línea de comandos
+OPCIONES = ('max_ops_per_second', 'max_mb_per_second', 'latency_threshold_ms')
+
+# Ráfaga permitida: fracción de segundo de operaciones que pueden acumularse sin esperar
+_RAFAGA_SEGUNDOS = 0.1
+# Ajuste adaptativo (AIMD): se divide el ritmo al superar el umbral y se recupera poco a poco
+_FACTOR_MINIMO = 0.05
+_REDUCCION = 0.5
+_RECUPERACION = 0.05
+# Peso de cada nueva muestra en la media móvil exponencial de la latencia
+_PESO_LATENCIA = 0.2
+
+class LimitadorES:
+    """Limitador de E/S de tipo token bucket para las eliminaciones de la limpieza.
+
+    Mantiene dos cubetas, una de operaciones por segundo y otra de bytes por segundo (las
+    que no se configuran no limitan). Cada operación reserva sus fichas antes de ejecutarse
+    y, si la cubeta queda en negativo, espera lo necesario para saldar la deuda. Es seguro
+    entre hilos: la reserva se hace con el cerrojo tomado y la espera fuera de él.
+
+    Si se indica `latencia_umbral_ms`, el ritmo se adapta a la latencia medida de cada
+    operación: cuando la media móvil supera el umbral se reduce a la mitad (hasta un 5% del
+    configurado) y, mientras está por debajo de la mitad del umbral, se recupera un 5% por
+    operación.
+    """
+
+    def __init__(self, max_ops_por_segundo=None, max_bytes_por_segundo=None, latencia_umbral_ms=None,
+                 reloj=time.monotonic, dormir=time.sleep):
+        self.max_ops = max_ops_por_segundo or None
+        self.max_bytes = max_bytes_por_segundo or None
+        self.latencia_umbral = latencia_umbral_ms / 1000 if latencia_umbral_ms else None
+        self.factor = 1.0
+        self.latencia_media = None
+        self.segundos_esperando = 0.0
+        self.esperas = 0
+        self._reloj = reloj
+        self._dormir = dormir
+        self._fichas_ops = self._capacidad(self.max_ops, 1)
+        self._fichas_bytes = self._capacidad(self.max_bytes, 0)
+        self._ultimo = reloj()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _capacidad(ritmo, minimo):
+        return max(minimo, ritmo * _RAFAGA_SEGUNDOS) if ritmo else 0
+
+    def adquirir(self, nbytes=0):
+        """Reserva una operación de `nbytes` bytes, esperando si se ha superado el ritmo."""
+        with self._lock:
+            ahora = self._reloj()
+            transcurrido = ahora - self._ultimo
+            self._ultimo = ahora
+            espera = 0.0
+            if self.max_ops:
+                ritmo = self.max_ops * self.factor
+                self._fichas_ops = min(self._capacidad(self.max_ops, 1), self._fichas_ops + transcurrido * ritmo) - 1
+                if self._fichas_ops < 0:
+                    espera = -self._fichas_ops / ritmo
+            if self.max_bytes and nbytes:
+                ritmo = self.max_bytes * self.factor
+                self._fichas_bytes = min(self._capacidad(self.max_bytes, 0), self._fichas_bytes + transcurrido * ritmo) - nbytes
+                if self._fichas_bytes < 0:
+                    espera = max(espera, -self._fichas_bytes / ritmo)
+            if espera > 0:
+                self.segundos_esperando += espera
+                self.esperas += 1
+        if espera > 0:
+            self._dormir(espera)
+
+    def registrar_latencia(self, segundos):
+        """Registra la duración de una operación y ajusta el ritmo si la latencia es alta."""
+        if self.latencia_umbral is None:
+            return
+        with self._lock:
+            if self.latencia_media is None:
+                self.latencia_media = segundos
+            else:
+                self.latencia_media += _PESO_LATENCIA * (segundos - self.latencia_media)
+            if self.latencia_media > self.latencia_umbral:
+                factor = max(_FACTOR_MINIMO, self.factor * _REDUCCION)
+                if factor < self.factor:
+                    logger.debug(f"Latencia media de E/S {self.latencia_media * 1000:.1f} ms; ritmo reducido al {factor:.0%}.")
+                self.factor = factor
+                # La media parte de cero tras cada reducción para no encadenarlas por la misma ráfaga
+                self.latencia_media = None
+            elif self.latencia_media < self.latencia_umbral / 2:
+                self.factor = min(1.0, self.factor + _RECUPERACION)
+
+def cargar_configuracion(config_filename=THROTTLE_FILENAME):
+    """Carga los límites de E/S desde el directorio 'config'. Devuelve un diccionario (vacío si no hay)."""
+    configuracion = config_manager.load_config(config_filename)
+    if not isinstance(configuracion, dict):
+        return {}
+    return {clave: configuracion.get(clave) for clave in OPCIONES}
+
+def crear_limitador(opciones=None):
+    """Crea un LimitadorES combinando config/cleanup_throttle.json con `opciones`.
+
+    Args:
+        opciones (dict, optional): valores con las claves de OPCIONES; los que no son None
+            sustituyen a los del archivo de configuración (por ejemplo, los de la línea de comandos).
+
+    Returns:
+        LimitadorES | None: el limitador, o None si no se ha configurado ningún límite de ritmo.
+    """
+    configuracion = cargar_configuracion()
+    for clave, valor in (opciones or {}).items():
+        if valor is not None:
+            configuracion[clave] = valor
+    max_ops = configuracion.get('max_ops_per_second')
+    max_mb = configuracion.get('max_mb_per_second')
+    if not max_ops and not max_mb:
+        return None
+    return LimitadorES(max_ops_por_segundo=max_ops,
+                       max_bytes_por_segundo=int(max_mb * 1024 * 1024) if max_mb else None,
+                       latencia_umbral_ms=configuracion.get('latency_threshold_ms'))
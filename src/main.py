@@ -3,6 +3,7 @@
 import sys
 import logging
 import argparse
+import multiprocessing
 import colorama # Importar colorama
 from src import privileges
 from src import logger
@@ -13,6 +14,7 @@ from src import system_optimizer
 from src import system_maintenance
 from src import utils
 from src import log_manager
+from src import cpu_sampler
 
 APP_LOGGER_NAME = 'OptiTechOptimizer'
 
@@ -20,6 +22,16 @@ def main():
     # Parse minimal CLI args
     parser = argparse.ArgumentParser(add_help=False)
     parser.add_argument('--no-elevate', action='store_true', help='No intentar elevar privilegios (útil para pruebas).')
+    parser.add_argument('--workers', type=int, default=1, help='Hilos usados por la limpieza de archivos temporales.')
+    parser.add_argument('--max-ops', type=float, default=None, help='Máximo de eliminaciones por segundo (sustituye a config/cleanup_throttle.json).')
+    parser.add_argument('--max-mb-s', type=float, default=None, help='Máximo de MB eliminados por segundo.')
+    parser.add_argument('--latencia-ms', type=float, default=None, help='Latencia por operación a partir de la cual se reduce el ritmo.')
+    parser.add_argument('--purga-diferida', action='store_true', help='Mueve los temporales a un área de purga y los elimina en segundo plano.')
+    parser.add_argument('--omitir-abiertos', action='store_true', help='No intenta eliminar los archivos abiertos por otros procesos (consulta previa con psutil).')
+    parser.add_argument('--planificar-limpieza', metavar='MANIFIESTO', help='Analiza el nivel indicado con --nivel y guarda el plan de limpieza, sin eliminar nada.')
+    parser.add_argument('--aplicar-manifiesto', metavar='MANIFIESTO', help='Elimina los archivos de un plan de limpieza que no hayan cambiado desde el análisis.')
+    parser.add_argument('--sonda-salud', action='store_true', help='Muestra una línea de estado con el perfil de análisis rápido (CPU, memoria, sistema) y termina.')
+    parser.add_argument('--nivel', default='basico', help='Nivel de limpieza para --planificar-limpieza (ver config/cleanup_targets.json).')
     args, _ = parser.parse_known_args()
 
 
@@ -56,6 +68,24 @@ def main():
     logger.setup_logging()
     app_logger = logging.getLogger(APP_LOGGER_NAME)
     app_logger.info("Aplicación iniciada.")
+    # Instantánea de CPU de referencia, renovada cada segundo en segundo plano: los análisis
+    # miden la carga reciente sin esperar
+    cpu_sampler.muestreador().calentar()
+
+    limite_es = {'max_ops_per_second': args.max_ops, 'max_mb_per_second': args.max_mb_s,
+                 'latency_threshold_ms': args.latencia_ms}
+
+    # Modo no interactivo para tareas programadas: el análisis fuera de horario y la
+    # eliminación en la ventana de mantenimiento
+    if args.planificar_limpieza:
+        system_cleaner.limpiar_archivos_temporales(nivel=args.nivel, modo_informe=True, manifiesto=args.planificar_limpieza)
+        return
+    if args.aplicar_manifiesto:
+        system_cleaner.aplicar_manifiesto(args.aplicar_manifiesto, limite_es=limite_es)
+        return
+    if args.sonda_salud:
+        system_analysis.run_health_probe()
+        return
 
     # 3. Mostrar menú principal
     while True:
@@ -73,7 +103,8 @@ def main():
         if opcion == '1':
             system_analysis.run_system_analysis()
         elif opcion == '2':
-            system_cleaner.ejecutar_limpiador()
+            system_cleaner.ejecutar_limpiador(workers=args.workers, limite_es=limite_es, purga_diferida=args.purga_diferida,
+                                              omitir_abiertos=args.omitir_abiertos)
         elif opcion == '3':
             system_optimizer.run_optimizer()
         elif opcion == '4':
@@ -89,4 +120,6 @@ def main():
             app_logger.warning(f"Opción de menú principal no válida seleccionada: {opcion}")
 
 if __name__ == "__main__":
+    # Necesario para el recorrido con procesos del limpiador en el ejecutable de PyInstaller
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,82 @@
+# src/open_files.py
+
+import os
+import time
+import psutil
+import logging
+from collections import namedtuple
+
+APP_LOGGER_NAME = 'OptiTechOptimizer'
+logger = logging.getLogger(APP_LOGGER_NAME)
+
+# Archivos abiertos dentro de las raíces de limpieza: rutas normalizadas (normalizar) tal como
+# las construye el recorrido desde cada raíz, y directorios que contienen alguno de ellos
+# (desde su directorio hasta la raíz), para descartar subárboles completos con una consulta.
+ArchivosAbiertos = namedtuple('ArchivosAbiertos', ['rutas', 'directorios'])
+
+def normalizar(ruta):
+    """Normaliza una ruta para compararla con las del conjunto (en Windows, sin distinguir mayúsculas)."""
+    return os.path.normcase(ruta)
+
+def disponible():
+    """Indica si se pueden consultar los archivos abiertos en esta plataforma."""
+    return hasattr(psutil.Process, 'open_files')
+
+def _prefijos(raices):
+    """Devuelve (prefijo real normalizado, raíz tal como se recorre) por raíz.
+
+    Las rutas que devuelve el sistema son las reales: se comparan con la ruta real de cada
+    raíz (enlaces resueltos y, en Windows, sin nombres cortos 8.3 como en %TEMP%) y se
+    reescriben sobre la raíz tal como la recorre el limpiador.
+    """
+    prefijos = []
+    for raiz in raices:
+        for prefijo in {os.path.realpath(raiz), os.path.abspath(raiz)}:
+            prefijos.append((os.path.join(normalizar(prefijo), ''), os.path.join(raiz, '')))
+    return prefijos
+
+def consultar(raices):
+    """Recopila, en una sola pasada por los procesos, los archivos abiertos dentro de `raices`.
+
+    Los procesos a los que no se tiene acceso se omiten (sus archivos se detectarán, como
+    hasta ahora, al fallar la eliminación).
+
+    Returns:
+        ArchivosAbiertos | None: los archivos abiertos, o None si la plataforma no permite
+        consultarlos.
+    """
+    if not disponible():
+        logger.info("No se pueden consultar los archivos abiertos en esta plataforma; se detectarán al eliminarlos.")
+        return None
+    inicio = time.perf_counter()
+    prefijos = _prefijos(raices)
+    rutas = set()
+    directorios = set()
+    sin_acceso = 0
+    try:
+        for proceso in psutil.process_iter(['open_files'], ad_value=None):
+            archivos = proceso.info.get('open_files')
+            if archivos is None:
+                sin_acceso += 1
+                continue
+            for archivo in archivos:
+                ruta_real = normalizar(archivo.path)
+                for prefijo, raiz in prefijos:
+                    if ruta_real.startswith(prefijo):
+                        ruta = normalizar(raiz + archivo.path[len(prefijo):])
+                        rutas.add(ruta)
+                        _agregar_directorios(ruta, normalizar(raiz), directorios)
+                        break
+    except (NotImplementedError, psutil.Error, OSError) as e:
+        logger.warning(f"No se pudieron consultar los archivos abiertos: {e}")
+        return None
+    logger.debug(f"Archivos abiertos en las rutas de limpieza: {len(rutas)} (consulta en {time.perf_counter() - inicio:.2f} s; "
+                 f"{sin_acceso} procesos sin acceso).")
+    return ArchivosAbiertos(frozenset(rutas), frozenset(directorios))
+
+def _agregar_directorios(ruta, raiz, directorios):
+    # `raiz` termina en separador: se añaden los directorios hasta la raíz, sin incluirla
+    directorio = os.path.dirname(ruta)
+    while directorio not in directorios and os.path.join(directorio, '').startswith(raiz) and len(directorio) >= len(raiz):
+        directorios.add(directorio)
+        directorio = os.path.dirname(directorio)
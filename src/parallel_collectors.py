@@ -0,0 +1,128 @@
+# src/parallel_collectors.py
+
+import time
+import queue
+import logging
+import threading
+from collections import namedtuple
+
+APP_LOGGER_NAME = 'OptiTechOptimizer'
+logger = logging.getLogger(APP_LOGGER_NAME)
+
+# Estados de un recolector
+OK = 'ok'
+ERROR = 'error'
+TIEMPO_AGOTADO = 'tiempo_agotado'
+
+# Recolector: nombre con el que aparece en los resultados, función que devuelve sus datos,
+# plazo en segundos desde que empieza y nombres de los recolectores de los que depende (la
+# función los recibe como argumentos con nombre)
+Recolector = namedtuple('Recolector', ['nombre', 'funcion', 'plazo', 'dependencias'], defaults=((),))
+
+# Resultado de un recolector: estado (OK, ERROR o TIEMPO_AGOTADO), valor devuelto (None si
+# no terminó bien) y segundos que tardó (el plazo, si se agotó)
+ResultadoRecolector = namedtuple('ResultadoRecolector', ['estado', 'valor', 'segundos'])
+
+def ejecutar(recolectores, al_terminar=None, reloj=time.monotonic):
+    """Ejecuta los recolectores a la vez, cada uno con su plazo, y devuelve sus resultados.
+
+    Cada recolector corre en su propio hilo daemon: el tiempo total es el del más lento (o
+    el de su plazo). Un recolector que no termina a tiempo se da por agotado y su hilo se
+    abandona; al ser daemon, una llamada colgada (una unidad de red que no responde) no
+    impide cerrar el programa, como sí ocurriría con los hilos de un ThreadPoolExecutor,
+    que se esperan al salir. Si la función lanza una excepción, el resultado es ERROR.
+
+    Los recolectores se lanzan en el orden de la lista en cuanto han terminado aquellos de
+    los que dependen, sin esperar al resto; si alguna dependencia no terminó bien, el
+    recolector no se ejecuta y su resultado es ERROR.
+
+    Args:
+        recolectores (list[Recolector]): recolectores que se ejecutan.
+        al_terminar (callable, optional): se llama en el hilo que espera con (nombre,
+            ResultadoRecolector) según termina o se agota cada recolector.
+        reloj (callable): reloj monotónico para los plazos.
+
+    Returns:
+        dict: nombre -> ResultadoRecolector, en el orden de `recolectores`.
+
+    Raises:
+        ValueError: si un recolector depende de otro que no está en la lista o hay un ciclo.
+    """
+    _comprobar_dependencias(recolectores)
+    terminados = queue.Queue()
+    sin_lanzar = list(recolectores)
+    limites = {}
+    resultados = {}
+
+    def terminar(nombre, resultado):
+        resultados[nombre] = resultado
+        if al_terminar is not None:
+            al_terminar(nombre, resultado)
+
+    def lanzar_preparados():
+        # Un recolector que no se ejecuta por una dependencia fallida puede desbloquear otros
+        lanzado = True
+        while lanzado:
+            lanzado = False
+            for recolector in list(sin_lanzar):
+                if not all(dependencia in resultados for dependencia in recolector.dependencias):
+                    continue
+                sin_lanzar.remove(recolector)
+                lanzado = True
+                fallidas = [dependencia for dependencia in recolector.dependencias if resultados[dependencia].estado != OK]
+                if fallidas:
+                    logger.warning(f"El recolector '{recolector.nombre}' no se ejecuta: fallaron sus dependencias {', '.join(fallidas)}.")
+                    terminar(recolector.nombre, ResultadoRecolector(ERROR, None, 0.0))
+                    continue
+                argumentos = {dependencia: resultados[dependencia].valor for dependencia in recolector.dependencias}
+                limites[recolector.nombre] = reloj() + recolector.plazo
+                threading.Thread(target=_ejecutar_recolector, args=(recolector, argumentos, terminados),
+                                 name=f"OptiTechRecolector-{recolector.nombre}", daemon=True).start()
+
+    plazos = {recolector.nombre: recolector.plazo for recolector in recolectores}
+    lanzar_preparados()
+    while len(resultados) < len(recolectores):
+        pendientes = [nombre for nombre in limites if nombre not in resultados]
+        espera = min(limites[nombre] for nombre in pendientes) - reloj()
+        try:
+            nombre, resultado = terminados.get(timeout=max(0.0, espera))
+        except queue.Empty:
+            ahora = reloj()
+            for nombre in pendientes:
+                if limites[nombre] <= ahora:
+                    logger.warning(f"El recolector '{nombre}' no terminó en su plazo ({plazos[nombre]:.1f} s).")
+                    terminar(nombre, ResultadoRecolector(TIEMPO_AGOTADO, None, plazos[nombre]))
+            lanzar_preparados()
+            continue
+        if nombre in resultados:
+            # Terminó justo después de agotarse su plazo
+            continue
+        terminar(nombre, resultado)
+        lanzar_preparados()
+    return {recolector.nombre: resultados[recolector.nombre] for recolector in recolectores}
+
+def _comprobar_dependencias(recolectores):
+    nombres = {recolector.nombre for recolector in recolectores}
+    for recolector in recolectores:
+        for dependencia in recolector.dependencias:
+            if dependencia not in nombres:
+                raise ValueError(f"El recolector '{recolector.nombre}' depende de '{dependencia}', que no se ejecuta.")
+    # Orden topológico: si quedan recolectores sin poder resolverse, hay un ciclo
+    resueltos = set()
+    restantes = list(recolectores)
+    while restantes:
+        preparados = [recolector for recolector in restantes if set(recolector.dependencias) <= resueltos]
+        if not preparados:
+            raise ValueError(f"Dependencias circulares entre los recolectores: {', '.join(recolector.nombre for recolector in restantes)}.")
+        resueltos.update(recolector.nombre for recolector in preparados)
+        restantes = [recolector for recolector in restantes if recolector.nombre not in resueltos]
+
+def _ejecutar_recolector(recolector, argumentos, terminados):
+    inicio = time.perf_counter()
+    try:
+        valor = recolector.funcion(**argumentos)
+        resultado = ResultadoRecolector(OK, valor, time.perf_counter() - inicio)
+    except Exception as e:
+        logger.error(f"El recolector '{recolector.nombre}' falló: {e}", exc_info=True)
+        resultado = ResultadoRecolector(ERROR, None, time.perf_counter() - inicio)
+    terminados.put((recolector.nombre, resultado))
@@ -0,0 +1,148 @@
+# src/recycle_bin.py
+
+import os
+import abc
+import stat
+import struct
+import shutil
+import logging
+from collections import namedtuple
+
+APP_LOGGER_NAME = 'OptiTechOptimizer'
+logger = logging.getLogger(APP_LOGGER_NAME)
+
+# Elemento de la papelera: nombre visible (ruta original si se conoce) y tamaño en bytes
+ElementoPapelera = namedtuple('ElementoPapelera', ['nombre', 'tamaño'])
+
+# Cabecera de los archivos $I de $Recycle.Bin (Windows Vista y posteriores): versión y tamaño
+# original en bytes del elemento $R correspondiente, que en una carpeta es el de todo su contenido
+_CABECERA_METADATOS = struct.Struct('<qq')
+
+def _tamaño_ruta(ruta):
+    """Tamaño en bytes de un archivo o, si es un directorio, de todos los archivos que contiene."""
+    try:
+        info = os.stat(ruta, follow_symlinks=False)
+    except OSError:
+        return 0
+    if not stat.S_ISDIR(info.st_mode):
+        return info.st_size
+    total = 0
+    pendientes = [ruta]
+    while pendientes:
+        try:
+            with os.scandir(pendientes.pop()) as entradas:
+                for entrada in entradas:
+                    try:
+                        if entrada.is_dir(follow_symlinks=False):
+                            pendientes.append(entrada.path)
+                        else:
+                            total += entrada.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return total
+
+def _tamaño_segun_metadatos(ruta_real):
+    """Tamaño que Windows registró al enviar `ruta_real` ($R...) a la papelera, leído de su $I.
+
+    Devuelve None si no hay archivo de metadatos o no se puede leer.
+    """
+    directorio, nombre = os.path.split(ruta_real)
+    if not nombre.startswith('$R'):
+        return None
+    try:
+        with open(os.path.join(directorio, '$I' + nombre[2:]), 'rb') as f:
+            datos = f.read(_CABECERA_METADATOS.size)
+    except OSError:
+        return None
+    if len(datos) < _CABECERA_METADATOS.size:
+        return None
+    version, tamaño = _CABECERA_METADATOS.unpack(datos)
+    if version not in (1, 2) or tamaño < 0:
+        return None
+    return tamaño
+
+class BackendPapelera(abc.ABC):
+    """Interfaz de acceso a una papelera de reciclaje.
+
+    Las subclases implementan `elementos` como un iterador perezoso, de modo que ni la
+    comprobación de papelera vacía ni el informe necesitan cargar toda la papelera en memoria.
+    """
+
+    @abc.abstractmethod
+    def elementos(self):
+        """Itera los elementos de la papelera como ElementoPapelera."""
+
+    def esta_vacia(self):
+        """True si la papelera no tiene elementos. Se detiene en el primero que encuentra."""
+        return next(iter(self.elementos()), None) is None
+
+    @abc.abstractmethod
+    def vaciar(self, confirmar=False, mostrar_progreso=True, sonido=False):
+        """Elimina definitivamente todos los elementos de la papelera."""
+
+class BackendWinshell(BackendPapelera):
+    """Papelera de reciclaje de Windows a través de winshell (todas las unidades).
+
+    El tamaño de cada elemento es el que Windows guardó en su archivo $I al eliminarlo, así
+    que una carpeta no se recorre para medirla. Solo si falta ese archivo se mide el elemento.
+    """
+
+    def __init__(self):
+        # Importación diferida: el resto de backends deben poder usarse fuera de Windows
+        import winshell
+        self._papelera = winshell.recycle_bin()
+
+    def esta_vacia(self):
+        # Basta con saber si hay un primer elemento; no se resuelven nombres ni tamaños
+        return next(iter(self._papelera), None) is None
+
+    def elementos(self):
+        for elemento in self._papelera:
+            try:
+                nombre = elemento.original_filename()
+                ruta_real = elemento.real_filename()
+                tamaño = _tamaño_segun_metadatos(ruta_real)
+                if tamaño is None:
+                    tamaño = _tamaño_ruta(ruta_real)
+            except Exception as e:
+                logger.debug(f"No se pudo obtener información de un elemento de la papelera: {e}")
+                nombre, tamaño = repr(elemento), 0
+            yield ElementoPapelera(nombre, tamaño)
+
+    def vaciar(self, confirmar=False, mostrar_progreso=True, sonido=False):
+        self._papelera.empty(confirm=confirmar, show_progress=mostrar_progreso, sound=sonido)
+
+class BackendDirectorio(BackendPapelera):
+    """Papelera simulada sobre un directorio: cada entrada de primer nivel es un elemento.
+
+    Permite probar y medir el informe de la papelera en cualquier sistema operativo.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+
+    def esta_vacia(self):
+        with os.scandir(self.ruta) as entradas:
+            return next(entradas, None) is None
+
+    def elementos(self):
+        with os.scandir(self.ruta) as entradas:
+            for entrada in entradas:
+                try:
+                    if entrada.is_dir(follow_symlinks=False):
+                        tamaño = _tamaño_ruta(entrada.path)
+                    else:
+                        tamaño = entrada.stat(follow_symlinks=False).st_size
+                except OSError:
+                    tamaño = 0
+                yield ElementoPapelera(entrada.name, tamaño)
+
+    def vaciar(self, confirmar=False, mostrar_progreso=True, sonido=False):
+        with os.scandir(self.ruta) as entradas:
+            for entrada in entradas:
+                if entrada.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entrada.path)
+                else:
+                    os.remove(entrada.path)
@@ -0,0 +1,152 @@
+# src/scan_index.py
+
+import os
+import time
+import sqlite3
+import logging
+from contextlib import closing
+from src import utils
+from src import cleanup_staging
+
+APP_LOGGER_NAME = 'OptiTechOptimizer'
+logger = logging.getLogger(APP_LOGGER_NAME)
+
+INDEX_FILENAME = "indice_limpieza.sqlite3"
+
+# Un directorio modificado hace menos de este margen no se da por estable: su mtime
+# podría volver a cambiar dentro de la misma marca de tiempo sin que lo detectemos.
+_MARGEN_MTIME_NS = 2 * 10**9
+
+# Versión del esquema (PRAGMA user_version). El índice es una caché: si la versión guardada
+# no coincide, la tabla se descarta y se reconstruye en el siguiente recorrido.
+_VERSION_ESQUEMA = 2
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS directorios (
+    ruta TEXT PRIMARY KEY,
+    raiz TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    archivos INTEGER NOT NULL,
+    bytes INTEGER NOT NULL,
+    asignados INTEGER NOT NULL,
+    subdirectorios TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_directorios_raiz ON directorios (raiz);
+"""
+
+class IndiceEscaneo:
+    """Índice persistente (SQLite) de los totales por directorio de las rutas de limpieza.
+
+    Para cada directorio guarda su mtime, el número, el tamaño lógico y el espacio asignado en
+    disco de sus archivos directos y los nombres de sus subdirectorios. En los recorridos siguientes solo se vuelve a listar un
+    directorio cuando su mtime ha cambiado; para el resto basta un stat por subdirectorio.
+
+    El área de purga de la raíz (cleanup_staging.DIRECTORIO_PURGA) no se totaliza: su
+    contenido ya se está eliminando en segundo plano, igual que en el recorrido de limpieza.
+
+    Limitación: modificar un archivo existente sin crear, borrar ni renombrar entradas no
+    cambia el mtime de su directorio, por lo que su nuevo tamaño no se refleja hasta que el
+    directorio vuelva a cambiar o se llame a `totalizar` con `reconstruir=True`.
+    """
+
+    def __init__(self, ruta_bd):
+        self.ruta_bd = ruta_bd
+        with closing(sqlite3.connect(self.ruta_bd)) as conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] != _VERSION_ESQUEMA:
+                conn.execute("DROP TABLE IF EXISTS directorios")
+                conn.execute(f"PRAGMA user_version = {_VERSION_ESQUEMA}")
+            conn.executescript(_ESQUEMA)
+
+    def totalizar(self, raiz, reconstruir=False):
+        """Devuelve (archivos, bytes, bytes_asignados, directorios_listados, directorios_reutilizados) de `raiz`.
+
+        Args:
+            raiz (str): directorio raíz a totalizar.
+            reconstruir (bool): si True, ignora el índice y vuelve a listar todos los directorios.
+        """
+        inicio_ns = time.time_ns()
+        tamaño_cluster = utils.get_cluster_size(raiz)
+        with closing(sqlite3.connect(self.ruta_bd)) as conn:
+            cache = {}
+            if not reconstruir:
+                for ruta, mtime_ns, archivos, num_bytes, asignados, subdirectorios in conn.execute(
+                        "SELECT ruta, mtime_ns, archivos, bytes, asignados, subdirectorios FROM directorios WHERE raiz = ?", (raiz,)):
+                    cache[ruta] = (mtime_ns, archivos, num_bytes, asignados, subdirectorios)
+
+            total_archivos = 0
+            total_bytes = 0
+            total_asignados = 0
+            listados = 0
+            reutilizados = 0
+            visitados = set()
+            actualizaciones = []
+
+            try:
+                pendientes = [(raiz, os.stat(raiz).st_mtime_ns)]
+            except OSError as e:
+                logger.warning(f"No se pudo acceder a la raíz del índice {raiz}: {e}")
+                return 0, 0, 0, 0, 0
+
+            while pendientes:
+                directorio, mtime_ns = pendientes.pop()
+                visitados.add(directorio)
+                fila = cache.get(directorio)
+
+                if fila is not None and fila[0] == mtime_ns:
+                    reutilizados += 1
+                    _, archivos, num_bytes, asignados, subdirectorios = fila
+                    for nombre in subdirectorios.split('\0') if subdirectorios else ():
+                        if directorio == raiz and nombre == cleanup_staging.DIRECTORIO_PURGA:
+                            continue
+                        ruta_sub = os.path.join(directorio, nombre)
+                        try:
+                            pendientes.append((ruta_sub, os.stat(ruta_sub, follow_symlinks=False).st_mtime_ns))
+                        except OSError:
+                            # El subdirectorio desapareció sin cambiar el mtime del padre
+                            # (no debería ocurrir); se ignora y se purgará del índice.
+                            continue
+                else:
+                    listados += 1
+                    archivos = 0
+                    num_bytes = 0
+                    asignados = 0
+                    nombres_subdirectorios = []
+                    try:
+                        with os.scandir(directorio) as entradas:
+                            for entrada in entradas:
+                                if directorio == raiz and entrada.name == cleanup_staging.DIRECTORIO_PURGA:
+                                    continue
+                                try:
+                                    info = entrada.stat(follow_symlinks=False)
+                                    if entrada.is_dir(follow_symlinks=False):
+                                        nombres_subdirectorios.append(entrada.name)
+                                        pendientes.append((entrada.path, info.st_mtime_ns))
+                                    else:
+                                        archivos += 1
+                                        num_bytes += info.st_size
+                                        asignados += utils.allocated_size(info, tamaño_cluster)
+                                except OSError as e:
+                                    logger.warning(f"No se pudo inspeccionar {entrada.path}: {e}")
+                    except OSError as e:
+                        logger.warning(f"No se pudo listar el directorio {directorio}: {e}")
+                        visitados.discard(directorio)
+                        continue
+
+                    # Un mtime demasiado reciente no es fiable: se guarda como inválido para
+                    # forzar un nuevo listado en el siguiente recorrido.
+                    mtime_guardado = mtime_ns if mtime_ns < inicio_ns - _MARGEN_MTIME_NS else -1
+                    actualizaciones.append((directorio, raiz, mtime_guardado, archivos, num_bytes, asignados, '\0'.join(nombres_subdirectorios)))
+
+                total_archivos += archivos
+                total_bytes += num_bytes
+                total_asignados += asignados
+
+            obsoletos = [(ruta,) for ruta in cache if ruta not in visitados]
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO directorios (ruta, raiz, mtime_ns, archivos, bytes, asignados, subdirectorios) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    actualizaciones)
+                conn.executemany("DELETE FROM directorios WHERE ruta = ?", obsoletos)
+
+        logger.debug(f"Índice de {raiz}: {listados} directorios listados, {reutilizados} reutilizados, {len(obsoletos)} purgados.")
+        return total_archivos, total_bytes, total_asignados, listados, reutilizados
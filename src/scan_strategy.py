@@ -0,0 +1,96 @@
+# src/scan_strategy.py
+
+import os
+import time
+import logging
+from collections import namedtuple
+
+APP_LOGGER_NAME = 'OptiTechOptimizer'
+logger = logging.getLogger(APP_LOGGER_NAME)
+
+# Estrategias de recorrido de la limpieza de archivos temporales
+MODOS = ('secuencial', 'hilos', 'procesos', 'asincrono')
+
+# Directorios que se listan como máximo para tomar la muestra
+MAX_DIRECTORIOS_MUESTRA = 64
+# Por debajo de estos archivos estimados, repartir el trabajo cuesta más de lo que ahorra
+UMBRAL_PARALELO = 2000
+# A partir de estos archivos estimados compensa arrancar procesos (solo en modo informe)
+UMBRAL_PROCESOS = 50000
+# Latencia media por directorio listado a partir de la cual el recorrido se considera
+# limitado por la E/S (disco frío, red): los hilos solapan las esperas y los procesos no aportan
+LATENCIA_E_S_SEGUNDOS = 0.002
+
+# Resultado de muestrear_arbol: directorios listados, archivos encontrados, directorios vistos
+# pero no listados, subdirectorios de primer nivel de todas las raíces (las unidades en que se
+# reparte el trabajo) y duración de la muestra en segundos.
+MuestraArbol = namedtuple('MuestraArbol', ['directorios', 'archivos', 'pendientes', 'fragmentos', 'segundos'])
+
+def archivos_estimados(muestra):
+    """Extrapola el número de archivos del árbol a partir de la media por directorio listado."""
+    if not muestra.directorios:
+        return 0
+    return int(muestra.archivos + muestra.archivos / muestra.directorios * muestra.pendientes)
+
+def muestrear_arbol(rutas, max_directorios=MAX_DIRECTORIOS_MUESTRA):
+    """Lista en anchura los primeros `max_directorios` directorios de las rutas.
+
+    Se usa para decidir la estrategia de recorrido antes de empezar. Los errores de
+    listado se ignoran (el recorrido real los contabilizará).
+
+    Returns:
+        MuestraArbol: recuentos de la muestra.
+    """
+    inicio = time.perf_counter()
+    directorios = 0
+    archivos = 0
+    fragmentos = 0
+    pendientes = [(ruta, True) for ruta in rutas]
+    indice = 0
+    while indice < len(pendientes) and directorios < max_directorios:
+        directorio, es_raiz = pendientes[indice]
+        indice += 1
+        try:
+            with os.scandir(directorio) as entradas:
+                for entrada in entradas:
+                    try:
+                        es_directorio = entrada.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if es_directorio:
+                        pendientes.append((entrada.path, False))
+                        if es_raiz:
+                            fragmentos += 1
+                    else:
+                        archivos += 1
+        except OSError:
+            continue
+        directorios += 1
+    return MuestraArbol(directorios, archivos, len(pendientes) - indice, fragmentos, time.perf_counter() - inicio)
+
+def elegir_modo(muestra, workers, modo_informe, cpus=None):
+    """Elige la estrategia de recorrido (una de MODOS) para una muestra.
+
+    - Un solo worker, menos de dos fragmentos o un árbol pequeño: secuencial.
+    - Eliminación con E/S lenta y menos fragmentos que workers: asíncrona, porque repartir
+      por subdirectorios dejaría workers ociosos y la tubería solapa el listado de los
+      directorios con la eliminación de los archivos ya descubiertos.
+    - Eliminación o E/S lenta: hilos, porque el tiempo se va en esperas de disco que los
+      hilos solapan aunque exista el GIL, y el borrado debe quedar en el proceso principal
+      (diario de reanudación y limitador de E/S).
+    - Informe sobre un árbol grande con la caché de disco caliente: procesos, porque el coste
+      es CPU de Python (rutas, contadores) y los hilos se serializan en el GIL.
+    """
+    if cpus is None:
+        cpus = os.cpu_count() or 1
+    estimados = archivos_estimados(muestra)
+    if workers <= 1 or muestra.fragmentos < 2 or estimados < UMBRAL_PARALELO:
+        return 'secuencial'
+    latencia = muestra.segundos / muestra.directorios if muestra.directorios else 0.0
+    if not modo_informe and latencia > LATENCIA_E_S_SEGUNDOS and muestra.fragmentos < workers:
+        return 'asincrono'
+    if not modo_informe or latencia > LATENCIA_E_S_SEGUNDOS:
+        return 'hilos'
+    if estimados >= UMBRAL_PROCESOS and cpus > 1:
+        return 'procesos'
+    return 'hilos'
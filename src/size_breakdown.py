@@ -0,0 +1,113 @@
+# src/size_breakdown.py
+
+import os
+import heapq
+import threading
+from collections import namedtuple
+
+EntradaDesglose = namedtuple('EntradaDesglose', ['ruta', 'bytes', 'archivos'])
+
+def _contiene(directorio, ruta):
+    """True si `ruta` es `directorio` o está dentro de él."""
+    return ruta == directorio or ruta.startswith(directorio.rstrip(os.sep) + os.sep)
+
+class DesgloseDirectorios:
+    """Desglose del tamaño por directorio construido en una sola pasada sobre los candidatos.
+
+    Los archivos deben llegar agrupados por subárbol, que es el orden en profundidad en que
+    los produce el recorrido de limpieza. Solo se mantienen abiertos los directorios de la
+    rama actual: cuando llega un archivo de fuera de uno de ellos, ese directorio está
+    completo, sus totales se suman a su padre y compite por un hueco en un montículo de
+    tamaño `top`. La memoria es proporcional a la profundidad del árbol más `top`, no al
+    número de directorios.
+
+    Los totales de cada raíz de limpieza se guardan aparte en `raices` y no entran en el
+    ranking. Varias instancias (por ejemplo, una por unidad de la limpieza en paralelo) se
+    combinan con `fusionar`.
+    """
+
+    def __init__(self, top=20):
+        self.top = top
+        self.raices = {}
+        self._monticulo = []
+        self._abiertos = [] # Rama actual: [ruta, bytes, archivos] desde la raíz hacia abajo
+        self._raiz = None
+        self._ultimo_directorio = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # El cerrojo no se puede serializar: el desglose de un fragmento recorrido en otro
+        # proceso viaja sin él y recibe uno nuevo al llegar
+        estado = self.__dict__.copy()
+        del estado['_lock']
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._lock = threading.Lock()
+
+    def agregar(self, ruta, tamaño, raiz):
+        """Añade un archivo de `tamaño` bytes situado en `ruta`, bajo la raíz de limpieza `raiz`."""
+        directorio = os.path.dirname(ruta)
+        if directorio != self._ultimo_directorio:
+            self._abrir(directorio, raiz)
+        totales_raiz = self.raices[raiz]
+        totales_raiz[0] += tamaño
+        totales_raiz[1] += 1
+        if self._abiertos:
+            actual = self._abiertos[-1]
+            actual[1] += tamaño
+            actual[2] += 1
+
+    def _abrir(self, directorio, raiz):
+        if raiz != self._raiz:
+            self._cerrar_hasta(0)
+            self._raiz = raiz
+            self.raices.setdefault(raiz, [0, 0])
+        while self._abiertos and not _contiene(self._abiertos[-1][0], directorio):
+            self._cerrar_hasta(len(self._abiertos) - 1)
+        base = self._abiertos[-1][0] if self._abiertos else raiz
+        if directorio != base and _contiene(base, directorio):
+            for parte in os.path.relpath(directorio, base).split(os.sep):
+                base = os.path.join(base, parte)
+                self._abiertos.append([base, 0, 0])
+        self._ultimo_directorio = directorio
+
+    def _cerrar_hasta(self, profundidad):
+        """Cierra los directorios abiertos por encima de `profundidad`, acumulándolos en su padre."""
+        while len(self._abiertos) > profundidad:
+            ruta, num_bytes, archivos = self._abiertos.pop()
+            if self._abiertos:
+                padre = self._abiertos[-1]
+                padre[1] += num_bytes
+                padre[2] += archivos
+            self._registrar((num_bytes, ruta, archivos))
+        self._ultimo_directorio = None
+
+    def _registrar(self, entrada):
+        if self.top <= 0:
+            return
+        if len(self._monticulo) < self.top:
+            heapq.heappush(self._monticulo, entrada)
+        elif entrada > self._monticulo[0]:
+            heapq.heapreplace(self._monticulo, entrada)
+
+    def finalizar(self):
+        """Cierra la rama abierta. Debe llamarse cuando ya no quedan archivos por añadir."""
+        self._cerrar_hasta(0)
+        self._raiz = None
+
+    def fusionar(self, otro):
+        """Incorpora el desglose (ya finalizado) de otra instancia. Es seguro entre hilos."""
+        with self._lock:
+            for raiz, (num_bytes, archivos) in otro.raices.items():
+                totales = self.raices.setdefault(raiz, [0, 0])
+                totales[0] += num_bytes
+                totales[1] += archivos
+            for entrada in otro._monticulo:
+                self._registrar(entrada)
+
+    def directorios_mayores(self):
+        """Devuelve los `top` directorios más pesados como EntradaDesglose, de mayor a menor."""
+        return [EntradaDesglose(ruta, num_bytes, archivos)
+                for num_bytes, ruta, archivos in sorted(self._monticulo, key=lambda e: (-e[0], e[1]))]
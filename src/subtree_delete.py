@@ -0,0 +1,193 @@
+# src/subtree_delete.py
+
+import os
+import time
+import logging
+from collections import namedtuple
+from src import utils
+
+APP_LOGGER_NAME = 'OptiTechOptimizer'
+logger = logging.getLogger(APP_LOGGER_NAME)
+
+# Operaciones relativas a un descriptor de directorio (openat, unlinkat, fstatat...). Es la
+# misma comprobación que hace shutil.rmtree; en Windows no están disponibles y se usan rutas.
+ADMITE_DIR_FD = ({os.open, os.stat, os.unlink, os.rmdir} <= os.supports_dir_fd
+                 and os.scandir in os.supports_fd
+                 and os.stat in os.supports_follow_symlinks)
+
+_FLAGS_DIRECTORIO = os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0) | getattr(os, 'O_NOFOLLOW', 0)
+
+# Resultado de eliminar_subarbol: bytes lógicos y asignados, archivos y directorios
+# eliminados, avisos (directorios que no se pudieron listar), archivos que no se pudieron
+# eliminar como tuplas (ruta, stat_result) y si el subárbol desapareció por completo.
+ResultadoSubarbol = namedtuple('ResultadoSubarbol', ['bytes', 'asignado', 'archivos', 'directorios', 'avisos', 'fallidos', 'completo'])
+
+class _Acumulador:
+    """Totales de una eliminación de subárbol y eliminación de cada archivo con el limitador."""
+
+    def __init__(self, tamaño_cluster, limitador, al_eliminar):
+        self.tamaño_cluster = tamaño_cluster
+        self.limitador = limitador
+        self.al_eliminar = al_eliminar
+        self.bytes = 0
+        self.asignado = 0
+        self.archivos = 0
+        self.directorios = 0
+        self.avisos = 0
+        self.fallidos = []
+
+    def limitar(self, eliminar, nbytes=0):
+        """Ejecuta eliminar() respetando el limitador de E/S, si lo hay."""
+        if self.limitador is None:
+            eliminar()
+            return
+        self.limitador.adquirir(nbytes)
+        inicio = time.perf_counter()
+        try:
+            eliminar()
+        finally:
+            self.limitador.registrar_latencia(time.perf_counter() - inicio)
+
+    def eliminar_archivo(self, eliminar, info):
+        """Ejecuta eliminar() (que borra un archivo ya examinado) y contabiliza el archivo."""
+        self.limitar(eliminar, info.st_size)
+        asignado = utils.allocated_size(info, self.tamaño_cluster)
+        self.bytes += info.st_size
+        self.asignado += asignado
+        self.archivos += 1
+        if self.al_eliminar is not None:
+            self.al_eliminar(info.st_size, asignado)
+
+    def resultado(self, completo):
+        return ResultadoSubarbol(self.bytes, self.asignado, self.archivos, self.directorios, self.avisos, self.fallidos, completo)
+
+def eliminar_subarbol(ruta, tamaño_cluster=utils.DEFAULT_CLUSTER_SIZE, limitador=None, cancelacion=None, al_eliminar=None):
+    """Elimina `ruta` con todo su contenido, sin evaluar archivo por archivo si es eliminable.
+
+    Pensado para subárboles en los que ya se sabe que todo se puede eliminar. Donde el sistema
+    lo admite (ADMITE_DIR_FD), cada directorio se abre una vez y sus entradas se examinan y
+    eliminan relativas a su descriptor, como hace shutil.rmtree: no se construye ni se resuelve
+    la ruta completa de cada archivo. En los demás sistemas se usan las rutas que ya devuelve
+    os.scandir. Los enlaces simbólicos se eliminan sin seguirlos.
+
+    Los archivos que no se pueden eliminar (en uso, sin permiso) no se dan por error: se
+    devuelven en `fallidos` para que el llamante los trate uno a uno. Los directorios que
+    quedan con contenido se conservan.
+
+    Args:
+        ruta (str): directorio que se elimina.
+        tamaño_cluster (int): tamaño de clúster del volumen, para el espacio asignado.
+        limitador (io_throttle.LimitadorES, optional): limitador de E/S de las eliminaciones.
+        cancelacion (threading.Event, optional): si se activa, se deja de listar directorios.
+        al_eliminar (callable, optional): se llama con (bytes, asignado) por cada archivo eliminado.
+
+    Returns:
+        ResultadoSubarbol: totales de lo eliminado.
+    """
+    acumulador = _Acumulador(tamaño_cluster, limitador, al_eliminar)
+    if ADMITE_DIR_FD:
+        completo = _eliminar_con_descriptores(ruta, acumulador, cancelacion)
+    else:
+        completo = _eliminar_con_rutas(ruta, acumulador, cancelacion)
+    return acumulador.resultado(completo)
+
+def _eliminar_con_descriptores(ruta, acumulador, cancelacion):
+    # Cada elemento es (descriptor del padre, nombre, ruta, descriptor propio o None). Con
+    # descriptor propio es la marca de post-orden: sus hijos ya se han tratado. Solo quedan
+    # abiertos los descriptores de la rama actual.
+    pendientes = [(None, ruta, ruta, None)]
+    completo = True
+    try:
+        while pendientes:
+            fd_padre, nombre, ruta_directorio, fd = pendientes.pop()
+            if fd is not None:
+                os.close(fd)
+                try:
+                    if fd_padre is None:
+                        acumulador.limitar(lambda: os.rmdir(ruta_directorio))
+                    else:
+                        acumulador.limitar(lambda: os.rmdir(nombre, dir_fd=fd_padre))
+                    acumulador.directorios += 1
+                except OSError:
+                    completo = False
+                continue
+            if cancelacion is not None and cancelacion.is_set():
+                completo = False
+                break
+            try:
+                fd = os.open(nombre, _FLAGS_DIRECTORIO, dir_fd=fd_padre)
+                with os.scandir(fd) as entradas:
+                    entradas = list(entradas)
+            except OSError as e:
+                if fd is not None:
+                    os.close(fd)
+                completo = False
+                acumulador.avisos += 1
+                logger.warning(f"No se pudo listar el directorio: {ruta_directorio} ({e})")
+                continue
+            pendientes.append((fd_padre, nombre, ruta_directorio, fd))
+            for entrada in entradas:
+                try:
+                    if entrada.is_dir(follow_symlinks=False):
+                        pendientes.append((fd, entrada.name, os.path.join(ruta_directorio, entrada.name), None))
+                        continue
+                    info = entrada.stat(follow_symlinks=False)
+                except OSError as e:
+                    completo = False
+                    acumulador.avisos += 1
+                    logger.warning(f"No se pudo obtener información de {os.path.join(ruta_directorio, entrada.name)}: {e}")
+                    continue
+                try:
+                    acumulador.eliminar_archivo(lambda: os.unlink(entrada.name, dir_fd=fd), info)
+                except OSError:
+                    # La ruta completa solo se construye para lo que no se pudo eliminar
+                    completo = False
+                    acumulador.fallidos.append((os.path.join(ruta_directorio, entrada.name), info))
+    finally:
+        for _, _, _, fd in pendientes:
+            if fd is not None:
+                os.close(fd)
+    return completo
+
+def _eliminar_con_rutas(ruta, acumulador, cancelacion):
+    # Mismo recorrido en post-orden que _eliminar_con_descriptores, con las rutas de os.scandir
+    pendientes = [(ruta, False)]
+    completo = True
+    while pendientes:
+        directorio, es_marca = pendientes.pop()
+        if es_marca:
+            try:
+                acumulador.limitar(lambda: os.rmdir(directorio))
+                acumulador.directorios += 1
+            except OSError:
+                completo = False
+            continue
+        if cancelacion is not None and cancelacion.is_set():
+            completo = False
+            break
+        try:
+            with os.scandir(directorio) as entradas:
+                entradas = list(entradas)
+        except OSError as e:
+            completo = False
+            acumulador.avisos += 1
+            logger.warning(f"No se pudo listar el directorio: {directorio} ({e})")
+            continue
+        pendientes.append((directorio, True))
+        for entrada in entradas:
+            try:
+                if entrada.is_dir(follow_symlinks=False):
+                    pendientes.append((entrada.path, False))
+                    continue
+                info = entrada.stat(follow_symlinks=False)
+            except OSError as e:
+                completo = False
+                acumulador.avisos += 1
+                logger.warning(f"No se pudo obtener información de {entrada.path}: {e}")
+                continue
+            try:
+                acumulador.eliminar_archivo(lambda: os.remove(entrada.path), info)
+            except OSError:
+                completo = False
+                acumulador.fallidos.append((entrada.path, info))
+    return completo
@@ -4,64 +4,102 @@ import platform
 import psutil
 import logging
 import datetime
+import time
 import os
 from src import config_manager
 from src import utils
+from src import cpu_sampler
+from src import parallel_collectors
+from src import collector_registry
+from src.collector_registry import BARATO, COSTOSO, BLOQUEANTE
+from src import system_snapshot
+from src.system_snapshot import InfoSO, InfoCPU, InfoMemoria, InfoDisco, EstadoServicios
 
 APP_LOGGER_NAME = 'OptiTechOptimizer'
 logger = logging.getLogger(APP_LOGGER_NAME)
 
-def get_system_specs():
-    """Recopila especificaciones detalladas de hardware y sistema operativo."""
-    logger.info("Recopilando especificaciones del sistema...")
+# Plazo de la consulta de uso de cada partición (ver _info_discos)
+PLAZO_PARTICION_SEGUNDOS = 10.0
+
+# Texto que sustituye a los datos de un recolector que no terminó bien o no se ejecutó
+_TEXTO_ESTADO = {
+    parallel_collectors.TIEMPO_AGOTADO: "tiempo de espera agotado",
+    parallel_collectors.ERROR: "no disponible",
+}
+_TEXTO_NO_INCLUIDO = "no incluido en el perfil"
+
+# Fuentes de datos del análisis. Para añadir una, se registra su función con
+# @registro.recolector y se usa su resultado en el informe
+registro = collector_registry.RegistroRecolectores()
+
+class _SinDatos(dict):
+    """Datos de un recolector que no terminó bien: los campos que faltan muestran el motivo."""
+
+    def __init__(self, motivo, **conocidos):
+        super().__init__(**conocidos)
+        self.motivo = motivo
+
+    def __missing__(self, clave):
+        return self.motivo
+
+@registro.recolector('sistema_operativo', coste=BARATO, ttl=3600)
+def _info_sistema_operativo():
+    return InfoSO(platform.system(), platform.release(), platform.version(), platform.machine(), platform.node())
+
+@registro.recolector('cpu', coste=BARATO)
+def _info_cpu():
+    # Una sola consulta de frecuencias y un solo par de instantáneas de cpu_times para el
+    # uso total y por núcleo (sin espera si el muestreador ya tiene una instantánea previa)
+    cpu_freq = psutil.cpu_freq()
+    cpu_usage = cpu_sampler.muestreador().medir()
+    return InfoCPU(psutil.cpu_count(logical=False), psutil.cpu_count(logical=True), cpu_freq.max, cpu_freq.min,
+                   cpu_freq.current, cpu_usage.por_nucleo, cpu_usage.total)
+
+@registro.recolector('memoria', coste=BARATO)
+def _info_memoria():
+    svmem = psutil.virtual_memory()
+    return InfoMemoria(svmem.total, svmem.available, svmem.used, svmem.percent)
+
+def _info_particion(partition):
+    """Devuelve el uso de una partición, o None si no se tiene acceso a ella."""
     try:
-        # --- Información del Sistema Operativo ---
-        os_info = {
-            "system": platform.system(),
-            "release": platform.release(),
-            "version": platform.version(),
-            "architecture": platform.machine(),
-            "hostname": platform.node(),
-        }
+        partition_usage = psutil.disk_usage(partition.mountpoint)
+    except PermissionError:
+        logger.warning(f"No se pudo acceder a la partición de disco {partition.mountpoint} debido a un PermissionError.")
+        return None
+    return InfoDisco(partition.device, partition.mountpoint, partition.fstype, partition_usage.total,
+                     partition_usage.used, partition_usage.free, partition_usage.percent)
 
-        # --- Información de la CPU ---
-        cpu_info = {
-            "physical_cores": psutil.cpu_count(logical=False),
-            "total_cores": psutil.cpu_count(logical=True),
-            "max_frequency": f"{psutil.cpu_freq().max:.2f} Mhz",
-            "min_frequency": f"{psutil.cpu_freq().min:.2f} Mhz",
-            "current_frequency": f"{psutil.cpu_freq().current:.2f} Mhz",
-            "usage_per_core": [f"{usage}%" for usage in psutil.cpu_percent(percpu=True, interval=1)],
-            "total_usage": f"{psutil.cpu_percent(interval=1)}%",
-        }
+@registro.recolector('particiones', coste=COSTOSO, ttl=60)
+def _listar_particiones():
+    return psutil.disk_partitions()
 
-        # --- Información de la Memoria ---
-        svmem = psutil.virtual_memory()
-        memory_info = {
-            "total": f"{svmem.total / (1024**3):.2f} GB",
-            "available": f"{svmem.available / (1024**3):.2f} GB",
-            "used": f"{svmem.used / (1024**3):.2f} GB",
-            "percentage": f"{svmem.percent}%",
-        }
+@registro.recolector('discos', coste=COSTOSO, dependencias=('particiones',), plazo=PLAZO_PARTICION_SEGUNDOS + 1)
+def _info_discos(particiones):
+    """Consulta el uso de cada partición a la vez, cada una con su plazo.
+
+    Un disco de red que no responde solo agota el suyo.
+
+    Returns:
+        list: tuplas (partición, ResultadoRecolector) en el orden de `particiones`.
+    """
+    resultados = parallel_collectors.ejecutar([
+        parallel_collectors.Recolector(f"disco {partition.mountpoint}", lambda partition=partition: _info_particion(partition), PLAZO_PARTICION_SEGUNDOS)
+        for partition in particiones])
+    return [(partition, resultados[f"disco {partition.mountpoint}"]) for partition in particiones]
 
-        # --- Información de Discos ---
+def get_system_specs():
+    """Recopila especificaciones detalladas de hardware y sistema operativo."""
+    logger.info("Recopilando especificaciones del sistema...")
+    try:
+        os_info = system_snapshot.formatear_so(_info_sistema_operativo())
+        cpu_info = system_snapshot.formatear_cpu(_info_cpu())
+        memory_info = system_snapshot.formatear_memoria(_info_memoria())
         disk_info = []
-        partitions = psutil.disk_partitions()
-        for partition in partitions:
-            try:
-                partition_usage = psutil.disk_usage(partition.mountpoint)
-                disk_info.append({
-                    "device": partition.device,
-                    "mountpoint": partition.mountpoint,
-                    "fstype": partition.fstype,
-                    "total_size": f"{partition_usage.total / (1024**3):.2f} GB",
-                    "used": f"{partition_usage.used / (1024**3):.2f} GB",
-                    "free": f"{partition_usage.free / (1024**3):.2f} GB",
-                    "percentage": f"{partition_usage.percent}%",
-                })
-            except PermissionError:
-                logger.warning(f"No se pudo acceder a la partición de disco {partition.mountpoint} debido a un PermissionError.")
-                continue
+        for partition in psutil.disk_partitions():
+            partition_info = _info_particion(partition)
+            if partition_info is not None:
+                disk_info.append(system_snapshot.formatear_disco(partition_info))
 
         specs = {
             "os_info": os_info,
@@ -101,42 +139,139 @@ def get_service_status():
         logger.error(f"Ocurrió un error al recopilar el estado de los servicios: {e}", exc_info=True)
         return None
 
-def run_system_analysis():
-    """Ejecuta un análisis completo del sistema y guarda el informe en un archivo."""
+@registro.recolector('servicios', coste=BLOQUEANTE)
+def _info_servicios():
+    services = get_service_status()
+    if services is None:
+        raise RuntimeError("No se pudo recopilar el estado de los servicios.")
+    return EstadoServicios(services['total'], services['running'], services['stopped'], services['paused'], services['other'])
+
+def _correcto(resultado):
+    return resultado.estado in (parallel_collectors.OK, collector_registry.EN_CACHE)
+
+def _motivo(tiempo):
+    """Texto que sustituye a los datos de un recolector que no terminó bien (o no se ejecutó, si tiempo es None)."""
+    if tiempo is None:
+        return _TEXTO_NO_INCLUIDO
+    return _TEXTO_ESTADO.get(tiempo.estado, _TEXTO_ESTADO[parallel_collectors.ERROR])
+
+def _describir_tiempo(tiempo):
+    if tiempo.estado == parallel_collectors.OK:
+        return f"{tiempo.nombre}: {tiempo.segundos:.2f} s"
+    if tiempo.estado == collector_registry.EN_CACHE:
+        return f"{tiempo.nombre}: en caché ({tiempo.segundos:.2f} s)"
+    return f"{tiempo.nombre}: {_motivo(tiempo)} ({tiempo.segundos:.2f} s)"
+
+def _componer(resultados):
+    """Reúne los resultados de los recolectores en una system_snapshot.Instantanea.
+
+    Las secciones de los recolectores que no terminaron bien quedan a None, y los discos que
+    no respondieron, sin sus valores de espacio; los tiempos incluyen la consulta de cada
+    partición.
+    """
+    def valor(nombre):
+        resultado = resultados.get(nombre)
+        return resultado.valor if resultado is not None and _correcto(resultado) else None
+
+    tiempos = []
+    discos = []
+    for nombre, resultado in resultados.items():
+        tiempos.append(system_snapshot.Tiempo(nombre, resultado.estado, resultado.segundos))
+        if nombre != 'discos' or not _correcto(resultado):
+            continue
+        for partition, resultado_particion in resultado.valor:
+            tiempos.append(system_snapshot.Tiempo(f"disco {partition.mountpoint}", resultado_particion.estado, resultado_particion.segundos))
+            if resultado_particion.estado != parallel_collectors.OK:
+                discos.append(InfoDisco(partition.device, partition.mountpoint, partition.fstype, None, None, None, None))
+            elif resultado_particion.valor is not None: # Sin acceso: se omite como hasta ahora
+                discos.append(resultado_particion.valor)
+
+    return system_snapshot.Instantanea(time.time(), valor('sistema_operativo'), valor('cpu'), valor('memoria'),
+                                       discos, valor('servicios'), tiempos)
+
+def _formatear(instantanea):
+    """Devuelve (specs, services) con el texto del informe, en el formato de get_system_specs y get_service_status.
+
+    Las secciones y discos sin datos se sustituyen por un _SinDatos con el motivo.
+    """
+    tiempos = {tiempo.nombre: tiempo for tiempo in instantanea.tiempos}
+
+    def seccion(info, nombre, formatear):
+        return _SinDatos(_motivo(tiempos.get(nombre))) if info is None else formatear(info)
+
+    disk_info = []
+    for disco in instantanea.discos:
+        if disco.total is None:
+            disk_info.append(_SinDatos(_motivo(tiempos.get(f"disco {disco.montaje}")), device=disco.dispositivo,
+                                       mountpoint=disco.montaje, fstype=disco.sistema_archivos))
+        else:
+            disk_info.append(system_snapshot.formatear_disco(disco))
+
+    specs = {
+        "os_info": seccion(instantanea.sistema, 'sistema_operativo', system_snapshot.formatear_so),
+        "cpu_info": seccion(instantanea.cpu, 'cpu', system_snapshot.formatear_cpu),
+        "memory_info": seccion(instantanea.memoria, 'memoria', system_snapshot.formatear_memoria),
+        "disk_info": disk_info,
+    }
+    return specs, seccion(instantanea.servicios, 'servicios', system_snapshot.formatear_servicios)
+
+def _avisar_fallidos(instantanea):
+    for tiempo in instantanea.tiempos:
+        if tiempo.estado not in (parallel_collectors.OK, collector_registry.EN_CACHE):
+            logger.error(f"El recolector de análisis '{tiempo.nombre}' no terminó bien: {_motivo(tiempo)}.")
+            print(utils.colored_text(f"Aviso: {_describir_tiempo(tiempo)}.", utils.Colors.YELLOW))
+
+def run_health_probe():
+    """Recopila solo los datos baratos (perfil rápido) y muestra una línea de estado.
+
+    Pensada para sondas de salud periódicas: no escribe informe ni espera a los servicios
+    ni a los discos.
+
+    Returns:
+        system_snapshot.Instantanea: los datos del perfil rápido, sin formatear (las demás
+        secciones quedan a None).
+    """
+    inicio = time.perf_counter()
+    instantanea = _componer(registro.ejecutar(collector_registry.RAPIDO))
+    segundos = time.perf_counter() - inicio
+    logger.info(f"Sonda de salud completada en {segundos:.2f} s.")
+    specs, _ = _formatear(instantanea)
+    print(f"{specs['os_info']['hostname']} | CPU: {specs['cpu_info']['total_usage']} | "
+          f"RAM: {specs['memory_info']['used']} / {specs['memory_info']['total']} ({specs['memory_info']['percentage']}) | {segundos:.2f} s")
+    for tiempo in instantanea.tiempos:
+        if tiempo.estado not in (parallel_collectors.OK, collector_registry.EN_CACHE):
+            print(utils.colored_text(f"Aviso: {_describir_tiempo(tiempo)}.", utils.Colors.YELLOW))
+    return instantanea
+
+def run_system_analysis(perfil=collector_registry.COMPLETO):
+    """Ejecuta un análisis del sistema y guarda el informe en un archivo.
+
+    Args:
+        perfil (str): perfil de collector_registry.PERFILES; las secciones de los
+            recolectores que no incluye lo indican en el informe.
+
+    Returns:
+        system_snapshot.Instantanea: los datos del análisis sin formatear, o None si no se
+        pudo guardar el informe.
+    """
     utils.show_header("Módulo de Análisis del Sistema")
     logger.info("Iniciando análisis completo del sistema...")
 
-    analysis_steps = [
-        ("Recopilando especificaciones del sistema", get_system_specs),
-        ("Contando servicios del sistema", get_service_status),
-    ]
-    total_steps = len(analysis_steps)
-    current_step = 0
-
-    specs = None
-    services = None
-
-    for description, func in analysis_steps:
-        current_step += 1
-        print(f"{description}...")
-        utils.show_progress_bar(current_step, total_steps, prefix='Progreso del Análisis:', suffix='Completado', length=30)
-        
-        if func == get_system_specs:
-            specs = func()
-        elif func == get_service_status:
-            services = func()
-
-        if (func == get_system_specs and specs is None) or \
-           (func == get_service_status and services is None):
-            logger.error(f"El paso de análisis '{description}' falló.")
-            print(utils.colored_text(f"Error: El análisis de '{description}' falló.", utils.Colors.RED))
-            return
-
+    print("Recopilando información del sistema, los servicios y los discos...")
+    inicio = time.perf_counter()
+    progress = utils.ProgressReporter(total=len(registro.planificar(perfil)), prefix='Progreso del Análisis:', suffix='Completado', length=30, unit='pasos')
+    instantanea = _componer(registro.ejecutar(perfil, al_terminar=lambda nombre, resultado: progress.update()))
+    progress.finish()
+    logger.info(f"Recopilación del análisis completada en {time.perf_counter() - inicio:.2f} s.")
+    _avisar_fallidos(instantanea)
 
     print(utils.colored_text("\nAnálisis del sistema completado con éxito.", utils.Colors.GREEN))
 
+    # El texto se genera aquí, a partir de los valores sin formatear de la instantánea
+    specs, services = _formatear(instantanea)
+
     # --- Construir Informe en Markdown (más legible) ---
-    report_date = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    report_date = datetime.datetime.fromtimestamp(instantanea.fecha).strftime("%Y-%m-%d %H:%M:%S")
 
     md_sections = []
     md_sections.append(f"# Informe de Análisis de OptiTech System Optimizer\n")
@@ -175,6 +310,10 @@ def run_system_analysis():
         disk_lines.append(f"- **Dispositivo:** {d['device']} | Montaje: {d['mountpoint']} | Tipo: {d['fstype']}\n  - Tamaño: {d['total_size']} | Usado: {d['used']} ({d['percentage']})")
     md_sections.append("\n".join(disk_lines) + "\n")
 
+    # Tiempos de cada recolector
+    md_sections.append("## 6. Tiempos de Recopilación\n")
+    md_sections.append("\n".join(f"- {_describir_tiempo(tiempo)}" for tiempo in instantanea.tiempos) + "\n")
+
     md_report = "\n".join(md_sections)
 
     # --- Additionally include a legacy plain-text section for backwards compatibility/tests ---
@@ -209,6 +348,9 @@ def run_system_analysis():
 
     ---[ 5. Información de Discos ]---
     {disk_report}
+
+    ---[ 6. Tiempos de Recopilación ]---
+    {timing_report}
     """.format(
         report_date=report_date,
         os_system=specs['os_info']['system'],
@@ -234,7 +376,8 @@ def run_system_analysis():
             f"    Dispositivo: {d['device']} | Montaje: {d['mountpoint']} | Tipo: {d['fstype']}\n" \
             f"    Tamaño: {d['total_size']} | Usado: {d['used']} ({d['percentage']})"
             for d in specs['disk_info']
-        ])
+        ]),
+        timing_report="\n".join(f"    {_describir_tiempo(tiempo)}" for tiempo in instantanea.tiempos).lstrip()
     )
 
     # Combine markdown and legacy plain text so tests and users both get a readable file
@@ -267,6 +410,9 @@ def run_system_analysis():
             # Si por alguna razón la impresión fallase, no detener el flujo
             pass
 
+        return instantanea
+
     except Exception as e:
         logger.error(f"Fallo al guardar el informe de análisis: {e}", exc_info=True)
         print(utils.colored_text(f"Error al guardar el informe de análisis: {e}", utils.Colors.RED))
+        return None
@@ -1,143 +1,1354 @@
 # src/system_cleaner.py
 
 import os
+import copy
+import json
+import queue
+import asyncio
 import logging
-import winshell
+import time
+import sqlite3
+import datetime
+import signal
+import itertools
+import threading
 import subprocess
+import multiprocessing
+import contextlib
+import logging.handlers
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, TimeoutError as FuturoSinTerminar
 from src import utils
+from src import config_manager
+from src import scan_index
+from src import cleanup_rules
+from src import cleanup_journal
+from src import duplicate_finder
+from src import size_breakdown
+from src import recycle_bin
+from src import io_throttle
+from src import scan_strategy
+from src import cleanup_targets
+from src import cleanup_manifest
+from src import cleanup_staging
+from src import subtree_delete
+from src import open_files
 from src.privileges import is_admin
 
 APP_LOGGER_NAME = 'OptiTechOptimizer'
 logger = logging.getLogger(APP_LOGGER_NAME)
 
-# Definición de rutas a limpiar, expandiendo variables de entorno de Windows
-CLEANUP_PATHS = {
-    'basico': [
-        os.path.expandvars(r'%TEMP%'),
-        os.path.expandvars(r'%SystemRoot%\Temp'),
-        os.path.expandvars(r'%SystemRoot%\SoftwareDistribution\Download'),
-    ],
-    'extendido': [
-        os.path.expandvars(r'%SystemRoot%\Prefetch'),
-        os.path.expandvars(r'%SystemRoot%\Logs\CBS'),
-    ],
-    'avanzado': [
-        # Rutas para limpieza avanzada (ej. WinSxS) requerirán comandos DISM
-        # y se manejarán de forma especial.
-    ]
-}
+# Registro ligero de un archivo candidato a limpieza: ruta completa, tamaño lógico en bytes,
+# fecha de modificación (epoch), raíz de limpieza a la que pertenece, bytes asignados en disco
+# e inodo (0 si el listado del directorio no lo proporciona, como en Windows).
+CandidatoLimpieza = namedtuple('CandidatoLimpieza', ['ruta', 'tamaño', 'mtime', 'raiz', 'asignado', 'inodo'], defaults=(0,))
 
-def limpiar_archivos_temporales(nivel='basico', modo_informe=False):
-    """Limpia archivos y directorios temporales según el nivel especificado."""
-    logger.info(f"Iniciando limpieza de archivos temporales (Nivel: {nivel}, Modo Informe: {modo_informe})")
-    
+class ResumenLimpieza:
+    """Totales de una limpieza de archivos temporales.
+
+    Puede actualizarse desde varios hilos: cada hilo acumula en local y fusiona sus
+    totales al terminar, de modo que el cerrojo solo se toma una vez por unidad de trabajo.
+    """
+
+    def __init__(self):
+        self.total_eliminado = 0
+        self.archivos_eliminados = 0
+        self.avisos = 0
+        self.omitidos = 0
+        self.asignado_eliminado = 0
+        self.directorios_eliminados = 0
+        # Archivos abiertos por otro proceso que no se han intentado eliminar (ver open_files)
+        self.en_uso = 0
+        self._lock = threading.Lock()
+
+    def acumular(self, total_eliminado=0, archivos_eliminados=0, avisos=0, omitidos=0, asignado_eliminado=0, directorios_eliminados=0,
+                 en_uso=0):
+        with self._lock:
+            self.total_eliminado += total_eliminado
+            self.archivos_eliminados += archivos_eliminados
+            self.avisos += avisos
+            self.omitidos += omitidos
+            self.asignado_eliminado += asignado_eliminado
+            self.directorios_eliminados += directorios_eliminados
+            self.en_uso += en_uso
+
+    def __getstate__(self):
+        # Se envía entre procesos sin el cerrojo (ver _limpiar_en_procesos)
+        estado = self.__dict__.copy()
+        del estado['_lock']
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._lock = threading.Lock()
+
+    def fusionar(self, otro):
+        self.acumular(otro.total_eliminado, otro.archivos_eliminados, otro.avisos, otro.omitidos,
+                      otro.asignado_eliminado, otro.directorios_eliminados, otro.en_uso)
+
+class _ContextoLimpieza:
+    """Opciones y estado compartidos por todas las etapas de una ejecución de limpieza."""
+
+    def __init__(self, modo_informe=False, predicado=None, diario=None, cancelacion=None, desglose=None, podar_directorios=False,
+                 limitador=None, reglas=None, reglas_por_raiz=None, eliminar_subarboles=False, purga=None, abiertos=None):
+        self.modo_informe = modo_informe
+        self.predicado = predicado
+        # Reglas sin compilar: el predicado no se puede enviar a otro proceso, las reglas sí
+        self.reglas = reglas
+        # Raíces cuyo objetivo de limpieza declara reglas propias, con su predicado compilado
+        self.reglas_por_raiz = reglas_por_raiz or {}
+        self.predicados = {raiz: _compilar_predicado(reglas_raiz) for raiz, reglas_raiz in self.reglas_por_raiz.items()}
+        self.diario = diario
+        self.desglose = desglose
+        self.podar_directorios = podar_directorios
+        # Eliminar de una vez los subdirectorios de las raíces sin reglas (ver _eliminar_subarbol)
+        self.eliminar_subarboles = eliminar_subarboles
+        self.limitador = limitador
+        # cleanup_staging.PurgaSegundoPlano que retoma las áreas de purga que encuentre el recorrido
+        self.purga = purga
+        # open_files.ArchivosAbiertos: archivos en uso que no se intentan eliminar (None: sin consulta)
+        self.abiertos = abiertos
+        self.cancelacion = cancelacion if cancelacion is not None else threading.Event()
+
+    def reglas_de(self, raiz):
+        return self.reglas_por_raiz.get(raiz, self.reglas)
+
+    def predicado_de(self, raiz):
+        return self.predicados.get(raiz, self.predicado)
+
+# Evento de cancelación cooperativa de la limpieza en curso (ver cancelar_limpieza)
+_evento_cancelacion = threading.Event()
+
+def cancelar_limpieza():
+    """Solicita que la limpieza de archivos temporales en curso se detenga de forma ordenada.
+
+    Los hilos terminan el archivo que estén procesando y el diario de control se vuelca,
+    de modo que la siguiente ejecución reanuda donde se quedó esta.
+    """
+    _evento_cancelacion.set()
+
+class _EstimadorProgreso:
+    """Estima el total de archivos de un recorrido de una sola pasada.
+
+    Como ya no se cuenta el árbol antes de procesarlo, el total se extrapola a partir
+    de los archivos descubiertos por directorio listado y de los directorios aún pendientes.
+    """
+
+    def __init__(self):
+        self.archivos_descubiertos = 0
+        self.archivos_vistos = 0
+        self.directorios_listados = 0
+        self.directorios_pendientes = 0
+
+    def total_estimado(self):
+        if self.directorios_pendientes == 0 or self.directorios_listados == 0:
+            return self.archivos_descubiertos
+        media = self.archivos_descubiertos / self.directorios_listados
+        # Nunca devolver un total alcanzado mientras queden directorios por listar,
+        # para que la barra no se cierre antes de tiempo.
+        return max(self.archivos_vistos + 1, int(self.archivos_descubiertos + media * self.directorios_pendientes))
+
+def _eliminar_limitado(funcion, ruta, limitador, nbytes=0):
+    """Ejecuta funcion(ruta) (os.remove / os.rmdir) respetando el limitador de E/S, si lo hay."""
+    if limitador is None:
+        funcion(ruta)
+        return
+    limitador.adquirir(nbytes)
+    inicio = time.perf_counter()
+    try:
+        funcion(ruta)
+    finally:
+        limitador.registrar_latencia(time.perf_counter() - inicio)
+
+def _podar_directorio(directorio, contexto):
+    """Elimina `directorio` si está vacío (en modo informe solo lo da por eliminable). Devuelve si se podó."""
+    if contexto.modo_informe:
+        return True
+    try:
+        _eliminar_limitado(os.rmdir, directorio, contexto.limitador)
+    except OSError as e:
+        # Normalmente no está vacío porque algún archivo no se pudo eliminar
+        logger.debug(f"No se eliminó el directorio {directorio}: {e}")
+        return False
+    logger.debug(f"Eliminado directorio vacío: {directorio}")
+    return True
+
+def _recorrer_ruta(ruta, estimador, resumen, contexto, raices_restantes=0, subdirectorios=None, raiz=None, listados=None):
+    """Recorre `ruta` una única vez con os.scandir.
+
+    Produce un CandidatoLimpieza por archivo reutilizando el resultado de DirEntry.stat(),
+    que en Windows viene cacheado del propio listado del directorio. `raiz` es la raíz de
+    limpieza de la que cuelga `ruta` (por defecto, la propia `ruta`).
+    Los enlaces simbólicos no se siguen. Si se pasa la lista `subdirectorios`, solo se
+    listan los archivos de `ruta` y sus subdirectorios se añaden a esa lista sin recorrerlos.
+    Si se pasa la lista `listados`, se añade a ella cada directorio listado.
+    Solo se producen los archivos que cumplen el predicado de `raiz` (si lo hay) y que no
+    están en `contexto.abiertos` (abiertos por otro proceso). Los avisos y los archivos
+    descartados o en uso se contabilizan en `resumen`.
+
+    El recorrido es en profundidad con marcas de post-orden: cuando se ha consumido todo el
+    subárbol de un directorio se registra en `contexto.diario`, y los directorios que el
+    diario ya da por completados no se vuelven a listar. El recorrido se detiene antes de
+    listar el siguiente directorio si se activa `contexto.cancelacion`.
+
+    Con `contexto.podar_directorios`, al completar un subárbol se elimina el directorio si
+    ha quedado vacío (nunca la raíz de limpieza). Solo se intenta si todos sus archivos se
+    produjeron como candidatos y todos sus subdirectorios se podaron; en modo informe se
+    contabiliza sin eliminar. Como el consumidor procesa cada candidato antes de pedir el
+    siguiente, al desapilar la marca los archivos del subárbol ya se han eliminado.
+
+    Con `contexto.eliminar_subarboles` y sin predicado (todo es eliminable), los
+    subdirectorios de cada directorio listado no se recorren: se eliminan de una vez con
+    _eliminar_subarbol, y solo se producen como candidatos los archivos que no se pudieron
+    eliminar, para que el consumidor los trate uno a uno.
+    """
+    raiz = raiz or ruta
+    # Una sola consulta por raíz (cacheada por volumen); el espacio asignado sale del stat del recorrido
+    tamaño_cluster = utils.get_cluster_size(raiz)
+    predicado = contexto.predicado_de(raiz)
+    diario = contexto.diario if subdirectorios is None else None
+    completados = diario.directorios_completados if diario is not None else ()
+    podar = contexto.podar_directorios and subdirectorios is None
+    subarboles = podar and contexto.eliminar_subarboles and predicado is None and not contexto.modo_informe
+    abiertos = contexto.abiertos.rutas if contexto.abiertos is not None else None
+    con_abiertos = contexto.abiertos.directorios if contexto.abiertos is not None else ()
+    # Directorios listados cuyo subárbol no ha terminado -> si pueden quedar vacíos. Solo
+    # contiene la rama actual, porque los hermanos pendientes aún no se han listado.
+    podables = {}
+    # Cada elemento es (directorio, es_marca_post_orden)
+    pendientes = [(ruta, False)]
+    marcas = 0
+    while pendientes:
+        directorio, es_marca = pendientes.pop()
+        if es_marca:
+            marcas -= 1
+            if diario is not None:
+                diario.marcar_directorio(directorio)
+            if podar:
+                if podables.pop(directorio) and directorio != raiz and _podar_directorio(directorio, contexto):
+                    resumen.acumular(directorios_eliminados=1)
+                elif os.path.dirname(directorio) in podables:
+                    podables[os.path.dirname(directorio)] = False
+            continue
+        if contexto.cancelacion.is_set():
+            return
+        if directorio in completados:
+            if os.path.dirname(directorio) in podables:
+                podables[os.path.dirname(directorio)] = False
+            continue
+        podable = True
+        try:
+            with os.scandir(directorio) as entradas:
+                archivos = []
+                hijos = []
+                for entrada in entradas:
+                    try:
+                        if entrada.is_dir(follow_symlinks=False):
+                            # El área de purga la vacía cleanup_staging, no el recorrido; si quedó algo
+                            # de una ejecución anterior, se retoma en segundo plano
+                            if directorio != raiz or entrada.name != cleanup_staging.DIRECTORIO_PURGA:
+                                hijos.append(entrada.path)
+                            elif contexto.purga is not None:
+                                contexto.purga.reanudar([raiz], contexto.limitador)
+                        else:
+                            archivos.append(entrada)
+                    except OSError as e:
+                        podable = False
+                        resumen.acumular(avisos=1)
+                        logger.warning(f"No se pudo inspeccionar {entrada.path}: {e}")
+        except FileNotFoundError:
+            resumen.acumular(avisos=1)
+            logger.warning(f"Directorio no encontrado durante el recorrido, puede haber sido eliminado por otro proceso: {directorio}")
+            continue
+        except PermissionError:
+            if os.path.dirname(directorio) in podables:
+                podables[os.path.dirname(directorio)] = False
+            resumen.acumular(avisos=1)
+            logger.warning(f"Permiso denegado para listar el directorio: {directorio}")
+            continue
+        except OSError as e:
+            if os.path.dirname(directorio) in podables:
+                podables[os.path.dirname(directorio)] = False
+            resumen.acumular(avisos=1)
+            logger.error(f"Error inesperado al listar {directorio}: {e}")
+            continue
+
+        if listados is not None:
+            listados.append(directorio)
+        if subdirectorios is not None:
+            subdirectorios.extend(hijos)
+        else:
+            if diario is not None or podar:
+                # La marca se apila antes que los hijos para desapilarse después de todos ellos
+                pendientes.append((directorio, True))
+                marcas += 1
+                if podar:
+                    podables[directorio] = podable
+            if subarboles:
+                for hijo in hijos:
+                    if hijo in completados:
+                        podables[directorio] = False
+                        continue
+                    if con_abiertos and open_files.normalizar(hijo) in con_abiertos:
+                        # Contiene archivos en uso: se recorre para conservarlos sin intentar eliminarlos
+                        pendientes.append((hijo, False))
+                        continue
+                    resultado = _eliminar_subarbol(hijo, tamaño_cluster, contexto, resumen)
+                    if not resultado.completo:
+                        podables[directorio] = False
+                    for ruta_fallida, info in resultado.fallidos:
+                        yield CandidatoLimpieza(ruta_fallida, info.st_size, info.st_mtime, raiz,
+                                                utils.allocated_size(info, tamaño_cluster), info.st_ino)
+                    if contexto.cancelacion.is_set():
+                        return
+            else:
+                pendientes.extend((hijo, False) for hijo in hijos)
+
+        estimador.directorios_listados += 1
+        estimador.directorios_pendientes = len(pendientes) - marcas + raices_restantes
+        estimador.archivos_descubiertos += len(archivos)
+        omitidos = 0
+        en_uso = 0
+        for entrada in archivos:
+            try:
+                info = entrada.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                estimador.archivos_descubiertos -= 1
+                resumen.acumular(avisos=1)
+                logger.warning(f"Archivo no encontrado durante el recorrido, puede haber sido eliminado por otro proceso: {entrada.path}")
+                continue
+            except OSError as e:
+                estimador.archivos_descubiertos -= 1
+                if podar:
+                    podables[directorio] = False
+                resumen.acumular(avisos=1)
+                logger.warning(f"No se pudo obtener información de {entrada.path}: {e}")
+                continue
+            if predicado is not None and not predicado(entrada.path, entrada.name, info):
+                estimador.archivos_descubiertos -= 1
+                if podar:
+                    podables[directorio] = False
+                omitidos += 1
+                continue
+            if abiertos and open_files.normalizar(entrada.path) in abiertos:
+                estimador.archivos_descubiertos -= 1
+                if podar:
+                    podables[directorio] = False
+                en_uso += 1
+                continue
+            yield CandidatoLimpieza(entrada.path, info.st_size, info.st_mtime, raiz, utils.allocated_size(info, tamaño_cluster), info.st_ino)
+        if omitidos or en_uso:
+            resumen.acumular(omitidos=omitidos, en_uso=en_uso)
+
+def _eliminar_subarbol(directorio, tamaño_cluster, contexto, resumen):
+    """Elimina `directorio` completo con subtree_delete y contabiliza lo eliminado en `resumen` y en el diario.
+
+    Evita crear un CandidatoLimpieza y evaluar reglas por archivo; donde el sistema lo admite,
+    las eliminaciones son relativas al descriptor de cada directorio. Devuelve el ResultadoSubarbol.
+    """
+    diario = contexto.diario
+    resultado = subtree_delete.eliminar_subarbol(directorio, tamaño_cluster, contexto.limitador, contexto.cancelacion,
+                                                 al_eliminar=diario.sumar if diario is not None else None)
+    resumen.acumular(resultado.bytes, resultado.archivos, resultado.avisos, asignado_eliminado=resultado.asignado,
+                     directorios_eliminados=resultado.directorios)
+    logger.debug(f"Subárbol eliminado: {directorio} ({resultado.archivos} archivos, {len(resultado.fallidos)} pendientes)")
+    return resultado
+
+def _resolver_rutas(nivel):
+    """Devuelve las rutas existentes del nivel, avisando de las que no existen."""
     rutas_a_limpiar = []
-    if nivel == 'basico':
-        rutas_a_limpiar.extend(CLEANUP_PATHS['basico'])
-    elif nivel == 'extendido':
-        rutas_a_limpiar.extend(CLEANUP_PATHS['basico'])
-        rutas_a_limpiar.extend(CLEANUP_PATHS['extendido'])
-    elif nivel == 'avanzado':
-        # La limpieza avanzada incluirá todo lo anterior más operaciones especiales
-        rutas_a_limpiar.extend(CLEANUP_PATHS['basico'])
-        rutas_a_limpiar.extend(CLEANUP_PATHS['extendido'])
-        logger.info("La limpieza avanzada se implementará con funciones adicionales (DISM, etc.).")
+    for ruta in (raiz.ruta for raiz in cleanup_targets.resolver_nivel(nivel)):
+        if os.path.exists(ruta):
+            rutas_a_limpiar.append(ruta)
+        else:
+            logger.warning(f"La ruta no existe, omitiendo: {ruta}")
+    return rutas_a_limpiar
+
+def _reglas_por_raiz(nivel, reglas):
+    """Reglas de las raíces del nivel cuyo objetivo declara reglas propias, combinadas con `reglas`."""
+    return {raiz.ruta: {**(reglas or {}), **raiz.reglas} for raiz in cleanup_targets.resolver_nivel(nivel) if raiz.reglas}
+
+def _compilar_predicado(reglas):
+    """Compila las reglas indicadas o, si son None, las de config/cleanup_rules.json."""
+    if reglas is None:
+        reglas = cleanup_rules.cargar_reglas()
+    return cleanup_rules.compilar_reglas(reglas)
+
+def _iterar_candidatos(rutas, resumen, contexto, estimador=None):
+    """Generador común de candidatos de todas las rutas; lo usan el informe y la eliminación."""
+    if estimador is None:
+        estimador = _EstimadorProgreso()
+    for indice, ruta in enumerate(rutas):
+        logger.info(f"Procesando ruta: {ruta}")
+        yield from _recorrer_ruta(ruta, estimador, resumen, contexto, len(rutas) - indice - 1)
+
+def iterar_candidatos_limpieza(nivel='basico', reglas=None):
+    """Produce de forma perezosa los archivos que se eliminarían en el nivel indicado.
+
+    Es el mismo generador que consume la eliminación, de modo que el informe y el borrado
+    no pueden discrepar. La memoria usada no depende del tamaño del árbol.
+
+    Args:
+        nivel (str): nivel declarado en config/cleanup_targets.json ('basico', 'extendido', ...).
+        reglas (dict, optional): reglas de selección; por defecto, las de config/cleanup_rules.json.
+
+    Yields:
+        CandidatoLimpieza: (ruta, tamaño, mtime, raiz) de cada archivo candidato.
+    """
+    if reglas is None:
+        reglas = cleanup_rules.cargar_reglas()
+    contexto = _ContextoLimpieza(modo_informe=True, predicado=_compilar_predicado(reglas), reglas=reglas,
+                                 reglas_por_raiz=_reglas_por_raiz(nivel, reglas))
+    yield from _iterar_candidatos(_resolver_rutas(nivel), ResumenLimpieza(), contexto)
+
+def _escribir_jsonl(candidatos, archivo):
+    """Escribe cada candidato como una línea JSON en `archivo` y lo vuelve a producir."""
+    for candidato in candidatos:
+        archivo.write(json.dumps(candidato._asdict(), ensure_ascii=False) + '\n')
+        yield candidato
+
+def _escribir_manifiesto(candidatos, escritor):
+    """Añade cada candidato al manifiesto de `escritor` (cleanup_manifest) y lo vuelve a producir."""
+    for candidato in candidatos:
+        inodo = candidato.inodo
+        if not inodo:
+            # En Windows el stat del listado no trae el identificador de archivo; sin él, la
+            # aplicación del manifiesto no podría comprobar que el archivo es el mismo
+            try:
+                inodo = os.stat(candidato.ruta, follow_symlinks=False).st_ino
+            except OSError as e:
+                logger.debug(f"No se pudo obtener el inodo de {candidato.ruta}; no se eliminará al aplicar el manifiesto: {e}")
+        escritor.agregar(candidato.ruta, candidato.tamaño, candidato.asignado, candidato.mtime, inodo)
+        yield candidato
 
+def exportar_candidatos_jsonl(destino, nivel='basico', reglas=None):
+    """Escribe en `destino` (JSON Lines) los candidatos a limpieza sin cargarlos en memoria.
+
+    Returns:
+        tuple[int, int]: bytes totales y número de candidatos exportados.
+    """
+    total_bytes = 0
+    total_archivos = 0
+    try:
+        archivo = open(destino, 'w', encoding=config_manager.get_default_encoding())
+    except OSError as e:
+        logger.error(f"No se pudo crear el archivo de exportación {destino}: {e}")
+        print(utils.colored_text(f"Error al crear el archivo de exportación: {e}", utils.Colors.RED))
+        return 0, 0
+    with archivo:
+        for candidato in _escribir_jsonl(iterar_candidatos_limpieza(nivel, reglas), archivo):
+            total_bytes += candidato.tamaño
+            total_archivos += 1
+    logger.info(f"Exportados {total_archivos} candidatos a limpieza ({total_bytes} bytes) en {destino}")
+    return total_bytes, total_archivos
+
+def _procesar_archivos(candidatos, contexto, resumen, al_procesar=None, desglose=None):
+    """Elimina (o solo contabiliza en modo informe) los archivos de un iterable de CandidatoLimpieza.
+
+    Los totales se acumulan en local y se vuelcan en `resumen` una sola vez al final.
+    `al_procesar`, si se indica, recibe el tamaño de cada archivo tratado. En modo informe,
+    cada archivo se añade también a `desglose` si se indica. Se detiene antes del siguiente
+    archivo si se activa `contexto.cancelacion`.
+    """
+    modo_informe = contexto.modo_informe
+    diario = contexto.diario
+    cancelacion = contexto.cancelacion
+    limitador = contexto.limitador
     total_eliminado = 0
+    asignado_eliminado = 0
     archivos_eliminados = 0
+    avisos = 0
+    try:
+        for candidato in candidatos:
+            if cancelacion.is_set():
+                break
+            ruta_completa = candidato.ruta
+            tamaño_archivo = candidato.tamaño
+            try:
+                if modo_informe:
+                    total_eliminado += tamaño_archivo
+                    asignado_eliminado += candidato.asignado
+                    archivos_eliminados += 1
+                    if desglose is not None:
+                        desglose.agregar(ruta_completa, tamaño_archivo, candidato.raiz)
+                else:
+                    if limitador is None:
+                        os.remove(ruta_completa)
+                    else:
+                        _eliminar_limitado(os.remove, ruta_completa, limitador, tamaño_archivo)
+                    total_eliminado += tamaño_archivo
+                    asignado_eliminado += candidato.asignado
+                    archivos_eliminados += 1
+                    if diario is not None:
+                        diario.sumar(tamaño_archivo, candidato.asignado)
+                    logger.debug(f"Eliminado archivo: {ruta_completa}")
+            except FileNotFoundError:
+                avisos += 1
+                logger.warning(f"Archivo no encontrado al intentar eliminar, puede haber sido eliminado por otro proceso: {ruta_completa}")
+                pass # Continuar con el siguiente archivo
+            except PermissionError:
+                avisos += 1
+                logger.warning(f"Permiso denegado para eliminar: {ruta_completa}")
+                pass # Continuar con el siguiente archivo
+            except Exception as e:
+                avisos += 1
+                logger.error(f"Error inesperado al eliminar {ruta_completa}: {e}")
+                pass # Continuar con el siguiente archivo
 
-    total_archivos_a_procesar = 0
-    for ruta in rutas_a_limpiar:
-        if os.path.exists(ruta):
-            for _, _, filenames in os.walk(ruta):
-                total_archivos_a_procesar += len(filenames)
+            if al_procesar is not None:
+                al_procesar(tamaño_archivo)
+    finally:
+        resumen.acumular(total_eliminado, archivos_eliminados, avisos, asignado_eliminado=asignado_eliminado)
 
-    archivos_procesados_actualmente = 0
+def _limpiar_secuencial(rutas, contexto, resumen, exportar=None, manifiesto=None):
+    """Procesa las rutas una tras otra en el hilo actual, con progreso estimado por archivo.
 
-    for ruta in rutas_a_limpiar:
-        if not os.path.exists(ruta):
-            logger.warning(f"La ruta no existe, omitiendo: {ruta}")
-            continue
-        
+    Si se indica `exportar` (archivo abierto), cada candidato se escribe en él como JSON Lines,
+    y si se indica `manifiesto` (cleanup_manifest.EscritorManifiesto), se añade al manifiesto.
+    """
+    estimador = _EstimadorProgreso()
+    progreso = utils.ProgressReporter(prefix='Progreso de limpieza:', suffix='Completado', length=30, unit='archivos')
+
+    def al_procesar(tamaño_archivo):
+        estimador.archivos_vistos += 1
+        progreso.set_total(estimador.total_estimado())
+        progreso.update(1, tamaño_archivo)
+
+    candidatos = _iterar_candidatos(rutas, resumen, contexto, estimador)
+    if exportar is not None:
+        candidatos = _escribir_jsonl(candidatos, exportar)
+    if manifiesto is not None:
+        candidatos = _escribir_manifiesto(candidatos, manifiesto)
+    _procesar_archivos(candidatos, contexto, resumen, al_procesar, contexto.desglose)
+    if contexto.desglose is not None:
+        contexto.desglose.finalizar()
+
+    progreso.finish()
+
+def _procesar_unidad(unidad, contexto, resumen):
+    """Procesa una unidad de trabajo del modo paralelo.
+
+    Una unidad es una tupla (subdirectorio de primer nivel, raíz), que se recorre completa,
+    o la lista ya recopilada de candidatos de los archivos sueltos de una raíz.
+    """
+    if contexto.cancelacion.is_set():
+        return
+    local = ResumenLimpieza()
+    if isinstance(unidad, tuple):
+        subdirectorio, raiz = unidad
+        archivos = _recorrer_ruta(subdirectorio, _EstimadorProgreso(), local, contexto, raiz=raiz)
+    else:
+        archivos = unidad
+    # Cada unidad es un subárbol completo: se desglosa por separado y se combina al final
+    desglose = size_breakdown.DesgloseDirectorios(contexto.desglose.top) if contexto.desglose is not None else None
+    _procesar_archivos(archivos, contexto, local, desglose=desglose)
+    resumen.fusionar(local)
+    if desglose is not None:
+        desglose.finalizar()
+        contexto.desglose.fusionar(desglose)
+
+def _limpiar_en_paralelo(rutas, contexto, workers, resumen):
+    """Reparte las rutas en unidades independientes y las procesa con un pool de hilos acotado.
+
+    Cada raíz se divide en sus archivos sueltos más un subdirectorio de primer nivel por
+    unidad, para que una raíz grande no quede en un único hilo. La eliminación está
+    limitada por la latencia de E/S, por lo que los hilos se solapan aunque exista el GIL.
+    """
+    unidades = []
+    for ruta in rutas:
         logger.info(f"Procesando ruta: {ruta}")
-        for dirpath, dirnames, filenames in os.walk(ruta):
-            for archivo in filenames:
-                ruta_completa = os.path.join(dirpath, archivo)
+        subdirectorios = []
+        archivos_raiz = list(_recorrer_ruta(ruta, _EstimadorProgreso(), resumen, contexto, subdirectorios=subdirectorios))
+        if archivos_raiz:
+            unidades.append(archivos_raiz)
+        completados = contexto.diario.directorios_completados if contexto.diario is not None else ()
+        unidades.extend((subdirectorio, ruta) for subdirectorio in subdirectorios if subdirectorio not in completados)
+
+    total_unidades = len(unidades)
+    progreso = utils.ProgressReporter(total=total_unidades, prefix='Progreso de limpieza:', suffix='Completado', length=30, unit='unidades')
+    logger.debug(f"Limpieza paralela: {total_unidades} unidades de trabajo con {workers} hilos.")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futuros = [executor.submit(_procesar_unidad, unidad, contexto, resumen) for unidad in unidades]
+        try:
+            for futuro in as_completed(futuros):
                 try:
-                    tamaño_archivo = os.path.getsize(ruta_completa)
-                    if modo_informe:
-                        total_eliminado += tamaño_archivo
-                        archivos_eliminados += 1
-                    else:
-                        os.remove(ruta_completa)
-                        total_eliminado += tamaño_archivo
-                        archivos_eliminados += 1
-                        logger.debug(f"Eliminado archivo: {ruta_completa}")
-                except FileNotFoundError:
-                    logger.warning(f"Archivo no encontrado al intentar eliminar, puede haber sido eliminado por otro proceso: {ruta_completa}")
-                    pass # Continuar con el siguiente archivo
-                except PermissionError:
-                    logger.warning(f"Permiso denegado para eliminar: {ruta_completa}")
-                    pass # Continuar con el siguiente archivo
+                    futuro.result()
                 except Exception as e:
-                    logger.error(f"Error inesperado al eliminar {ruta_completa}: {e}")
-                    pass # Continuar con el siguiente archivo
-                
-                archivos_procesados_actualmente += 1
-                utils.show_progress_bar(archivos_procesados_actualmente, total_archivos_a_procesar, prefix = 'Progreso de limpieza:', suffix = 'Completado', length = 30)
-    
+                    resumen.acumular(avisos=1)
+                    logger.error(f"Error inesperado en una unidad de limpieza paralela: {e}", exc_info=True)
+                progreso.update()
+        except KeyboardInterrupt:
+            # Avisar a los hilos antes de que el executor espere a que terminen
+            contexto.cancelacion.set()
+            for futuro in futuros:
+                futuro.cancel()
+            raise
+    progreso.finish()
 
-    
+class _ReenvioRegistro(logging.Handler):
+    """Entrega al logger de la aplicación los registros que llegan de los procesos del pool."""
+
+    def emit(self, record):
+        logger.handle(record)
+
+def _inicializar_proceso(cola_registro, nivel):
+    """Prepara un proceso del pool: su log va a la cola del proceso principal y Ctrl+C lo gestiona este."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    registro = logging.getLogger(APP_LOGGER_NAME)
+    registro.handlers[:] = [logging.handlers.QueueHandler(cola_registro)]
+    registro.setLevel(nivel)
+    registro.propagate = False
+
+def _escanear_fragmento(subdirectorio, raiz, reglas, podar_directorios, desglose_top, abiertos=None):
+    """Recorre en modo informe un fragmento (subdirectorio de primer nivel) dentro de un proceso del pool.
+
+    Devuelve solo agregados compactos, no los candidatos: el ResumenLimpieza del fragmento
+    y su desglose ya finalizado (None si no se pidió).
+    """
+    contexto = _ContextoLimpieza(modo_informe=True, predicado=_compilar_predicado(reglas), podar_directorios=podar_directorios,
+                                 abiertos=abiertos)
+    resumen = ResumenLimpieza()
+    desglose = size_breakdown.DesgloseDirectorios(desglose_top) if desglose_top > 0 else None
+    archivos = _recorrer_ruta(subdirectorio, _EstimadorProgreso(), resumen, contexto, raiz=raiz)
+    _procesar_archivos(archivos, contexto, resumen, desglose=desglose)
+    if desglose is not None:
+        desglose.finalizar()
+    return resumen, desglose
+
+def _limpiar_en_procesos(rutas, contexto, workers, resumen):
+    """Modo informe con un pool de procesos: cada subdirectorio de primer nivel es un fragmento.
+
+    En un árbol grande con la caché de disco caliente el recorrido está limitado por la CPU
+    de Python (rutas, contadores, reglas) y los hilos se serializan en el GIL. Cada proceso
+    recorre fragmentos completos y solo devuelve sus totales y su desglose, de modo que el
+    tráfico entre procesos no depende del número de archivos. Los archivos sueltos de cada
+    raíz se procesan en el proceso principal. Solo admite el modo informe: la eliminación
+    necesita el diario de reanudación y el limitador de E/S, que viven en este proceso.
+    """
+    fragmentos = []
+    for ruta in rutas:
+        logger.info(f"Procesando ruta: {ruta}")
+        subdirectorios = []
+        archivos_raiz = list(_recorrer_ruta(ruta, _EstimadorProgreso(), resumen, contexto, subdirectorios=subdirectorios))
+        _procesar_unidad(archivos_raiz, contexto, resumen)
+        fragmentos.extend((subdirectorio, ruta) for subdirectorio in subdirectorios)
+
+    desglose_top = contexto.desglose.top if contexto.desglose is not None else 0
+    progreso = utils.ProgressReporter(total=len(fragmentos), prefix='Progreso de limpieza:', suffix='Completado', length=30, unit='fragmentos')
+    logger.debug(f"Limpieza con procesos: {len(fragmentos)} fragmentos con {workers} procesos.")
+    cola_registro = multiprocessing.Queue()
+    oyente = logging.handlers.QueueListener(cola_registro, _ReenvioRegistro())
+    oyente.start()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_inicializar_proceso,
+                                 initargs=(cola_registro, logger.getEffectiveLevel())) as executor:
+            futuros = [executor.submit(_escanear_fragmento, subdirectorio, raiz, contexto.reglas_de(raiz), contexto.podar_directorios, desglose_top,
+                                       contexto.abiertos)
+                       for subdirectorio, raiz in fragmentos]
+            try:
+                for futuro in as_completed(futuros):
+                    try:
+                        local, desglose = futuro.result()
+                    except Exception as e:
+                        resumen.acumular(avisos=1)
+                        logger.error(f"Error inesperado en un fragmento de la limpieza con procesos: {e}", exc_info=True)
+                    else:
+                        resumen.fusionar(local)
+                        if desglose is not None:
+                            contexto.desglose.fusionar(desglose)
+                    progreso.update()
+                    if contexto.cancelacion.is_set():
+                        # Los fragmentos en curso terminan; los pendientes no llegan a empezar
+                        for pendiente in futuros:
+                            pendiente.cancel()
+                        break
+            except KeyboardInterrupt:
+                contexto.cancelacion.set()
+                for futuro in futuros:
+                    futuro.cancel()
+                raise
+    finally:
+        oyente.stop()
+        cola_registro.close()
+    progreso.finish()
+
+# Candidatos por lote en la cola de la limpieza asíncrona: cada lote es un salto entre hilos
+_TAMAÑO_LOTE_ASINCRONO = 64
+# Lotes en cola por worker de eliminación: acota la memoria y frena el descubrimiento cuando
+# la eliminación va por detrás
+_LOTES_EN_COLA_POR_WORKER = 4
+
+@contextlib.contextmanager
+def _registro_en_segundo_plano():
+    """Mientras dura el bloque, los registros del logger de la aplicación se escriben desde un hilo aparte.
+
+    Los hilos de eliminación solo encolan cada registro; el formateo y la escritura en consola
+    y en el archivo de log no retrasan las eliminaciones.
+    """
+    cola = queue.SimpleQueue()
+    manejadores = logger.handlers[:]
+    oyente = logging.handlers.QueueListener(cola, *manejadores, respect_handler_level=True)
+    logger.handlers[:] = [logging.handlers.QueueHandler(cola)]
+    oyente.start()
+    try:
+        yield
+    finally:
+        logger.handlers[:] = manejadores
+        oyente.stop()
+
+async def _tuberia_limpieza(rutas, contexto, workers, resumen):
+    """Tubería productor/consumidor de _limpiar_asincrono (ver su documentación)."""
+    bucle = asyncio.get_running_loop()
+    cola = asyncio.Queue(maxsize=workers * _LOTES_EN_COLA_POR_WORKER)
+    eventos = asyncio.Queue()
+    estimador = _EstimadorProgreso()
+    listados = []
+    # Cuando el descubrimiento termina un subárbol, sus archivos pueden seguir en la cola: ni
+    # se poda ni se marca en el diario durante el recorrido
+    contexto_descubrimiento = copy.copy(contexto)
+    contexto_descubrimiento.diario = None
+    contexto_descubrimiento.podar_directorios = False
+
+    def encolar(lote):
+        """Deja el lote en la cola; devuelve False si la limpieza se cancela mientras espera sitio."""
+        futuro = asyncio.run_coroutine_threadsafe(cola.put(lote), bucle)
+        while True:
+            try:
+                futuro.result(timeout=0.1)
+                return True
+            except FuturoSinTerminar:
+                # Si se cancela, el bucle puede no volver a atender la cola
+                if contexto.cancelacion.is_set():
+                    futuro.cancel()
+                    return False
+
+    def descubrir():
+        lote = []
+        for indice, ruta in enumerate(rutas):
+            if contexto.cancelacion.is_set():
+                return
+            logger.info(f"Procesando ruta: {ruta}")
+            for candidato in _recorrer_ruta(ruta, estimador, resumen, contexto_descubrimiento, len(rutas) - indice - 1, listados=listados):
+                lote.append(candidato)
+                if len(lote) >= _TAMAÑO_LOTE_ASINCRONO:
+                    if not encolar(lote):
+                        return
+                    lote = []
+        if lote:
+            encolar(lote)
+
+    async def productor():
+        try:
+            await bucle.run_in_executor(executor, descubrir)
+        finally:
+            for _ in range(workers):
+                await cola.put(None)
+
+    async def eliminador():
+        # Cada lote se vuelca en el resumen al terminar en su hilo (ver _procesar_archivos), aunque
+        # este consumidor se haya cancelado mientras lo esperaba
+        while (lote := await cola.get()) is not None:
+            await bucle.run_in_executor(executor, _procesar_archivos, lote, contexto, resumen)
+            eventos.put_nowait((len(lote), sum(candidato.tamaño for candidato in lote)))
+
+    async def informar_progreso():
+        progreso = utils.ProgressReporter(prefix='Progreso de limpieza:', suffix='Completado', length=30, unit='archivos')
+        while (evento := await eventos.get()) is not None:
+            archivos, num_bytes = evento
+            estimador.archivos_vistos += archivos
+            progreso.set_total(estimador.total_estimado())
+            progreso.update(archivos, num_bytes)
+        progreso.finish()
+
+    executor = ThreadPoolExecutor(max_workers=workers + 1)
+    consumidor = asyncio.create_task(informar_progreso())
+    try:
+        await asyncio.gather(productor(), *(eliminador() for _ in range(workers)))
+    except BaseException:
+        # El hilo de descubrimiento deja de esperar sitio en la cola y el executor puede cerrarse
+        contexto.cancelacion.set()
+        raise
+    finally:
+        eventos.put_nowait(None)
+        # Los lotes sin empezar se descartan y los que están en curso se detienen en el siguiente
+        # archivo; se espera a que terminen (para que sus totales consten) sin bloquear el bucle
+        await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+        await asyncio.shield(consumidor)
+    return listados
+
+def _limpiar_asincrono(rutas, contexto, workers, resumen):
+    """Modo eliminación con una tubería asyncio de descubrimiento y eliminación solapados.
+
+    Un hilo recorre las rutas y deja los candidatos, en lotes, en una cola acotada que frena el
+    descubrimiento cuando la eliminación va por detrás; `workers` consumidores eliminan cada lote
+    en un executor y otro consumidor actualiza el progreso. El log se escribe desde un hilo aparte.
+    Así la latencia de listar un directorio se solapa con la de eliminar archivos, que en discos
+    lentos o de red es lo que domina y que el recorrido secuencial suma. Los directorios vacíos
+    se podan al final, de abajo arriba, entre los que se listaron (sin volver a listarlos).
+    Si se interrumpe, el diario conserva los totales pero no los directorios completados.
+    """
+    workers = max(1, workers)
+    logger.debug(f"Limpieza asíncrona con {workers} workers de eliminación.")
+    try:
+        with _registro_en_segundo_plano():
+            listados = asyncio.run(_tuberia_limpieza(rutas, contexto, workers, resumen))
+    except KeyboardInterrupt:
+        contexto.cancelacion.set()
+        raise
+    if contexto.podar_directorios and not contexto.cancelacion.is_set():
+        raices = set(rutas)
+        for directorio in sorted(listados, key=lambda ruta: ruta.count(os.sep), reverse=True):
+            if directorio not in raices and _podar_directorio(directorio, contexto):
+                resumen.acumular(directorios_eliminados=1)
+
+def _elegir_modo_recorrido(modo_recorrido, rutas, workers, modo_informe):
+    """Resuelve `modo_recorrido` ('auto' o uno de scan_strategy.MODOS) a la estrategia que se usará."""
+    if modo_recorrido == 'auto':
+        if workers <= 1:
+            return 'secuencial'
+        muestra = scan_strategy.muestrear_arbol(rutas)
+        modo = scan_strategy.elegir_modo(muestra, workers, modo_informe)
+        logger.info(f"Estrategia de recorrido: {modo} (muestra de {muestra.directorios} directorios, "
+                    f"~{scan_strategy.archivos_estimados(muestra)} archivos estimados, {muestra.fragmentos} fragmentos).")
+        return modo
+    if modo_recorrido not in scan_strategy.MODOS:
+        raise ValueError(f"Modo de recorrido desconocido: {modo_recorrido}. Opciones: auto, {', '.join(scan_strategy.MODOS)}")
+    if modo_recorrido == 'procesos' and not modo_informe:
+        logger.warning("El recorrido con procesos solo está disponible en modo informe; se usarán hilos.")
+        return 'hilos'
+    if modo_recorrido == 'asincrono' and modo_informe:
+        logger.info("La limpieza asíncrona solo solapa eliminaciones; en modo informe se recorre secuencialmente.")
+        return 'secuencial'
+    return modo_recorrido
+
+def _totalizar_con_indice(rutas, resumen):
+    """Totaliza las rutas en modo informe usando el índice incremental persistente.
+
+    Devuelve False si el índice no está disponible, para que el llamante haga un recorrido completo.
+    """
+    ruta_bd = os.path.join(config_manager.get_app_data_path(), scan_index.INDEX_FILENAME)
+    local = ResumenLimpieza()
+    progreso = utils.ProgressReporter(total=len(rutas), prefix='Progreso de limpieza:', suffix='Completado', length=30, unit='rutas')
+    try:
+        indice = scan_index.IndiceEscaneo(ruta_bd)
+        for ruta in rutas:
+            logger.info(f"Procesando ruta con índice incremental: {ruta}")
+            archivos, num_bytes, asignados, listados, reutilizados = indice.totalizar(ruta)
+            local.acumular(num_bytes, archivos, asignado_eliminado=asignados)
+            logger.info(f"Índice incremental de {ruta}: {listados} directorios listados, {reutilizados} sin cambios.")
+            progreso.update(1, num_bytes)
+    except sqlite3.Error as e:
+        logger.warning(f"No se pudo usar el índice de escaneo {ruta_bd}, se realizará un recorrido completo: {e}")
+        return False
+    progreso.finish()
+    resumen.fusionar(local)
+    return True
+
+def _mostrar_resumen_limpieza(resumen_limpieza, modo_informe=False):
+    """Registra e imprime el resumen final y devuelve (total_eliminado, archivos_eliminados)."""
+    total_eliminado = resumen_limpieza.total_eliminado
+    archivos_eliminados = resumen_limpieza.archivos_eliminados
     resumen = f"Limpieza completada. Total de archivos procesados para eliminación: {archivos_eliminados}. Espacio total recuperado: {total_eliminado / (1024*1024):.2f} MB."
     logger.info(resumen)
     print(utils.colored_text(resumen, utils.Colors.GREEN))
+    # El tamaño lógico no refleja el redondeo a clúster ni los archivos dispersos o comprimidos
+    espacio = (f"Tamaño lógico: {total_eliminado / (1024*1024):.2f} MB | "
+               f"Espacio asignado en disco: {resumen_limpieza.asignado_eliminado / (1024*1024):.2f} MB.")
+    logger.info(espacio)
+    print(espacio)
+    if resumen_limpieza.directorios_eliminados:
+        if modo_informe:
+            directorios = f"Directorios que quedarían vacíos y se eliminarían: {resumen_limpieza.directorios_eliminados}."
+        else:
+            directorios = f"Directorios vacíos eliminados: {resumen_limpieza.directorios_eliminados}."
+        logger.info(directorios)
+        print(directorios)
+    if resumen_limpieza.omitidos:
+        logger.info(f"{resumen_limpieza.omitidos} archivos no cumplen las reglas de selección y se han conservado.")
+    if resumen_limpieza.en_uso:
+        en_uso = f"Archivos omitidos por estar abiertos por otro proceso: {resumen_limpieza.en_uso}."
+        logger.info(en_uso)
+        print(en_uso)
+    if resumen_limpieza.avisos:
+        print(utils.colored_text(f"Se registraron {resumen_limpieza.avisos} avisos durante la limpieza. Consulte el log para más detalles.", utils.Colors.YELLOW))
     
     return total_eliminado, archivos_eliminados
 
-def limpiar_papelera_reciclaje_seguro(confirmar=False, mostrar_progreso=True, sonido=False, modo_informe=False):
+def _mostrar_limitador(limitador):
+    """Informa del tiempo que la eliminación ha esperado por el limitador de E/S."""
+    mensaje = (f"Tiempo en espera por el limitador de E/S: {limitador.segundos_esperando:.1f} s "
+               f"({limitador.esperas} esperas; ritmo final al {limitador.factor:.0%} del configurado).")
+    logger.info(mensaje)
+    print(mensaje)
+
+def _preparar_purga(rutas, contexto, purga):
+    """Mueve al área de purga las raíces sin reglas de selección y encola los lotes. Devuelve las entradas movidas."""
+    movidas = 0
+    for ruta in rutas:
+        if contexto.cancelacion.is_set():
+            break
+        if contexto.predicado_de(ruta) is not None:
+            # Con reglas no todo el subárbol es eliminable: se recorre archivo a archivo
+            logger.debug(f"La ruta tiene reglas de selección; no se mueve al área de purga: {ruta}")
+            continue
+        lote, movidas_ruta = cleanup_staging.preparar(ruta, contexto.cancelacion, conservar=_en_uso(contexto.abiertos))
+        if lote is not None:
+            purga.agregar(lote, contexto.limitador)
+            movidas += movidas_ruta
+    return movidas
+
+def _en_uso(abiertos):
+    """Devuelve una función que indica si una ruta está abierta o contiene archivos abiertos (None si no hay consulta)."""
+    if abiertos is None:
+        return None
+    return lambda ruta: open_files.normalizar(ruta) in abiertos.rutas or open_files.normalizar(ruta) in abiertos.directorios
+
+def _mostrar_purga(purga, movidas):
+    """Informa de lo movido al área de purga y del avance de la purga en segundo plano."""
+    if movidas:
+        mensaje = f"Elementos movidos al área de purga: {movidas}. Se eliminan en segundo plano."
+        logger.info(mensaje)
+        print(utils.colored_text(mensaje, utils.Colors.GREEN))
+    if purga.activa() or movidas:
+        estado = "en curso" if purga.activa() else "completada"
+        mensaje = (f"Purga en segundo plano {estado}: {purga.bytes_purgados / (1024*1024):.2f} MB purgados "
+                   f"de {purga.bytes_preparados / (1024*1024):.2f} MB preparados ({purga.archivos_purgados} archivos).")
+        logger.info(mensaje)
+        print(mensaje)
+
+def _mostrar_desglose(desglose):
+    """Imprime los directorios más pesados del desglose y lo guarda en el directorio de informes."""
+    if not desglose.raices:
+        return None
+    mayores = desglose.directorios_mayores()
+    print(utils.colored_text(f"\nDirectorios con más espacio recuperable (top {len(mayores)}):", utils.Colors.CYAN))
+    for entrada in mayores:
+        print(f" - {entrada.bytes / (1024*1024):10.2f} MB  {entrada.archivos:>8} archivos  {entrada.ruta}")
+
+    fecha = datetime.datetime.now()
+    lineas = [
+        "# Desglose de la Limpieza por Directorio",
+        "",
+        f"**Informe generado el:** {fecha.strftime('%Y-%m-%d %H:%M:%S')}",
+        "",
+        "## Totales por ruta de limpieza",
+        "",
+        "| Ruta | Tamaño (MB) | Archivos |",
+        "|---|---:|---:|",
+    ]
+    lineas.extend(f"| `{raiz}` | {num_bytes / (1024*1024):.2f} | {archivos} |" for raiz, (num_bytes, archivos) in desglose.raices.items())
+    lineas.extend([
+        "",
+        f"## Directorios más pesados (top {len(mayores)})",
+        "",
+        "| Directorio | Tamaño (MB) | Archivos |",
+        "|---|---:|---:|",
+    ])
+    lineas.extend(f"| `{entrada.ruta}` | {entrada.bytes / (1024*1024):.2f} | {entrada.archivos} |" for entrada in mayores)
+
+    try:
+        ruta_informe = os.path.join(config_manager.get_report_path(), f"Informe_Desglose_Limpieza_{fecha.strftime('%Y%m%d_%H%M%S')}.md")
+        with open(ruta_informe, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lineas) + "\n")
+    except OSError as e:
+        logger.error(f"No se pudo guardar el desglose de la limpieza: {e}")
+        return None
+    logger.info(f"Desglose de la limpieza guardado en {ruta_informe}")
+    print(utils.colored_text(f"Desglose guardado en: {ruta_informe}", utils.Colors.GREEN))
+    return ruta_informe
+
+def limpiar_archivos_temporales(nivel='basico', modo_informe=False, workers=1, usar_indice=False, reglas=None, exportar_jsonl=None, reanudar=True, desglose_top=20, eliminar_directorios_vacios=True,
+                                limite_es=None, modo_recorrido='auto', manifiesto=None, purga_diferida=False, omitir_abiertos=False):
+    """Limpia archivos y directorios temporales según el nivel especificado.
+
+    Cada ruta se recorre una sola vez con os.scandir; el tamaño de cada archivo sale del
+    stat de la propia entrada del directorio y el progreso se estima sobre la marcha.
+
+    Args:
+        nivel (str): nivel declarado en config/cleanup_targets.json ('basico', 'extendido', ...).
+        modo_informe (bool): si True, solo contabiliza lo que se eliminaría.
+        workers (int): número máximo de hilos o procesos. Con más de 1, cada raíz se reparte
+            en unidades (archivos sueltos y subdirectorios de primer nivel) que se procesan
+            en paralelo.
+        usar_indice (bool): solo en modo informe; reutiliza los totales por directorio guardados
+            en el índice persistente y solo vuelve a listar los directorios cuyo mtime cambió.
+        reglas (dict, optional): reglas de selección de archivos (ver cleanup_rules.compilar_reglas).
+            Por defecto se cargan de config/cleanup_rules.json. Las reglas propias de cada objetivo
+            de config/cleanup_targets.json se aplican sobre ellas.
+        exportar_jsonl (str, optional): solo en modo informe; ruta de un archivo JSON Lines en el
+            que se escribe cada candidato a medida que se encuentra.
+        reanudar (bool): solo en modo eliminación; mantiene un diario de control en el directorio
+            de datos de la aplicación y, si una ejecución anterior del mismo nivel se interrumpió,
+            continúa donde se quedó sin volver a recorrer los directorios ya completados.
+        desglose_top (int): solo en modo informe; número de directorios más pesados que se
+            listan y se guardan en un informe de desglose. 0 lo desactiva. No se genera cuando
+            los totales salen del índice incremental, que no recorre los archivos.
+        eliminar_directorios_vacios (bool): elimina, en el mismo recorrido y de abajo arriba, los
+            directorios que quedan vacíos (nunca las propias rutas de limpieza). En modo informe
+            solo se cuentan.
+        limite_es (dict, optional): solo en modo eliminación; límites de E/S que sustituyen a los
+            de config/cleanup_throttle.json ('max_ops_per_second', 'max_mb_per_second',
+            'latency_threshold_ms'). Sin límites configurados no se limita nada.
+        modo_recorrido (str): 'secuencial', 'hilos', 'procesos' (solo modo informe),
+            'asincrono' (solo modo eliminación; ver _limpiar_asincrono) o 'auto', que con más
+            de un worker elige según una muestra rápida del árbol (ver scan_strategy.elegir_modo).
+        manifiesto (str, optional): solo en modo informe; ruta del manifiesto binario en el que
+            se guardan los candidatos (ruta, tamaño, mtime e inodo) para eliminarlos más tarde
+            con aplicar_manifiesto. Solo se publica si el análisis termina sin cancelarse.
+        purga_diferida (bool): solo en modo eliminación; mueve con un renombrado el contenido de
+            las rutas sin reglas de selección a su área de purga (un subdirectorio de la propia
+            ruta, en el mismo volumen) y lo elimina un hilo en segundo plano, de modo que la
+            función vuelve en cuanto termina de moverlo. Lo que no se puede mover se elimina
+            con el recorrido normal. Los totales devueltos no incluyen lo purgado en segundo plano.
+        omitir_abiertos (bool): antes de recorrer, consulta una sola vez los archivos abiertos
+            por otros procesos (open_files) y no los intenta eliminar ni los cuenta como
+            recuperables; el resumen indica cuántos se omitieron. Si la plataforma no permite
+            la consulta, se detectan como hasta ahora, al fallar su eliminación.
+
+    En modo eliminación, las áreas de purga que una ejecución anterior dejó a medias se retoman
+    en segundo plano cuando el recorrido las encuentra.
+
+    La limpieza puede detenerse con Ctrl+C o con cancelar_limpieza(): el trabajo hecho hasta
+    ese momento se conserva en el diario y se devuelven los totales parciales.
+
+    Returns:
+        tuple[int, int]: bytes recuperados y número de archivos procesados para eliminación.
+    """
+    logger.info(f"Iniciando limpieza de archivos temporales (Nivel: {nivel}, Modo Informe: {modo_informe}, Hilos: {workers})")
+
+    rutas_a_limpiar = _resolver_rutas(nivel)
+    if reglas is None:
+        reglas = cleanup_rules.cargar_reglas()
+    predicado = _compilar_predicado(reglas)
+    reglas_por_raiz = _reglas_por_raiz(nivel, reglas)
+    _evento_cancelacion.clear()
+
+    resumen_limpieza = ResumenLimpieza()
+    if exportar_jsonl and not modo_informe:
+        logger.warning("La exportación JSON Lines solo está disponible en modo informe; se omite.")
+        exportar_jsonl = None
+    if manifiesto and not modo_informe:
+        logger.warning("El manifiesto de limpieza solo se genera en modo informe; se omite.")
+        manifiesto = None
+    if purga_diferida and modo_informe:
+        logger.info("La purga diferida solo se aplica en modo eliminación; se omite.")
+        purga_diferida = False
+    if usar_indice and not modo_informe:
+        logger.warning("El índice de escaneo solo se usa en modo informe; se realizará un recorrido completo.")
+        usar_indice = False
+    if usar_indice and (predicado is not None or reglas_por_raiz):
+        logger.warning("El índice de escaneo guarda totales sin filtrar y no admite reglas de selección; se realizará un recorrido completo.")
+        usar_indice = False
+    if usar_indice and omitir_abiertos:
+        logger.info("El índice de escaneo no distingue los archivos abiertos; se realizará un recorrido completo.")
+        usar_indice = False
+
+    diario = None
+    if reanudar and not modo_informe:
+        try:
+            diario = cleanup_journal.DiarioLimpieza(cleanup_journal.ruta_diario(nivel), rutas_a_limpiar, nivel=nivel,
+                                                    reglas={'generales': reglas, 'por_raiz': reglas_por_raiz})
+        except OSError as e:
+            logger.warning(f"No se pudo abrir el diario de limpieza; la ejecución no podrá reanudarse: {e}")
+        if diario is not None and diario.reanudado:
+            mensaje = (f"Reanudando una limpieza interrumpida: {len(diario.directorios_completados)} directorios ya completados, "
+                       f"{diario.total_archivos} archivos ({diario.total_bytes / (1024*1024):.2f} MB) eliminados anteriormente.")
+            logger.info(mensaje)
+            print(utils.colored_text(mensaje, utils.Colors.YELLOW))
+            resumen_limpieza.acumular(diario.total_bytes, diario.total_archivos, asignado_eliminado=diario.total_asignado)
+
+    desglose = size_breakdown.DesgloseDirectorios(desglose_top) if modo_informe and desglose_top > 0 else None
+    limitador = None if modo_informe else io_throttle.crear_limitador(limite_es)
+    contexto = _ContextoLimpieza(modo_informe=modo_informe, predicado=predicado, diario=diario,
+                                 cancelacion=_evento_cancelacion, desglose=desglose,
+                                 podar_directorios=eliminar_directorios_vacios, limitador=limitador, reglas=reglas,
+                                 reglas_por_raiz=reglas_por_raiz, eliminar_subarboles=not modo_informe,
+                                 purga=None if modo_informe else cleanup_staging.purga(),
+                                 abiertos=open_files.consultar(rutas_a_limpiar) if omitir_abiertos else None)
+    purga = contexto.purga
+    movidas_purga = 0
+    if purga is not None:
+        # El avance de la purga que se muestra al final es el de esta ejecución
+        purga.reiniciar_contadores()
+    try:
+        if purga_diferida:
+            movidas_purga = _preparar_purga(rutas_a_limpiar, contexto, purga)
+        if exportar_jsonl or manifiesto:
+            # La exportación necesita cada candidato en orden: se usa el recorrido secuencial
+            with contextlib.ExitStack() as pila:
+                archivo = None
+                escritor = None
+                try:
+                    if exportar_jsonl:
+                        archivo = pila.enter_context(open(exportar_jsonl, 'w', encoding=config_manager.get_default_encoding()))
+                    if manifiesto:
+                        escritor = pila.enter_context(cleanup_manifest.EscritorManifiesto(manifiesto, nivel))
+                except OSError as e:
+                    # Solo en modo informe: no hay diario ni purga que cerrar
+                    logger.error(f"No se pudo crear el archivo de destino del análisis: {e}")
+                    print(utils.colored_text(f"Error al crear el archivo de destino del análisis: {e}", utils.Colors.RED))
+                    return 0, 0
+                _limpiar_secuencial(rutas_a_limpiar, contexto, resumen_limpieza, exportar=archivo, manifiesto=escritor)
+                if escritor is not None and contexto.cancelacion.is_set():
+                    # Un manifiesto parcial no debe poder aplicarse como si fuera el plan completo
+                    escritor.descartar()
+                    logger.warning("Análisis cancelado: no se ha guardado el manifiesto de limpieza.")
+            if exportar_jsonl:
+                logger.info(f"Candidatos a limpieza exportados en {exportar_jsonl}")
+            if escritor is not None and not contexto.cancelacion.is_set():
+                mensaje = f"Manifiesto de limpieza guardado en {manifiesto} ({escritor.registros} archivos)."
+                logger.info(mensaje)
+                print(utils.colored_text(mensaje, utils.Colors.GREEN))
+        elif not (usar_indice and _totalizar_con_indice(rutas_a_limpiar, resumen_limpieza)):
+            modo = _elegir_modo_recorrido(modo_recorrido, rutas_a_limpiar, workers, modo_informe)
+            if modo == 'procesos':
+                _limpiar_en_procesos(rutas_a_limpiar, contexto, workers, resumen_limpieza)
+            elif modo == 'asincrono':
+                _limpiar_asincrono(rutas_a_limpiar, contexto, workers, resumen_limpieza)
+            elif modo == 'hilos':
+                _limpiar_en_paralelo(rutas_a_limpiar, contexto, workers, resumen_limpieza)
+            else:
+                _limpiar_secuencial(rutas_a_limpiar, contexto, resumen_limpieza)
+    except KeyboardInterrupt:
+        contexto.cancelacion.set()
+    finally:
+        if diario is not None:
+            diario.cerrar(completado=not contexto.cancelacion.is_set())
+
+    if contexto.cancelacion.is_set():
+        mensaje = "Limpieza cancelada. Los totales mostrados son parciales."
+        if diario is not None:
+            mensaje += " La próxima ejecución de este nivel continuará donde se quedó."
+        logger.warning(mensaje)
+        print(utils.colored_text(mensaje, utils.Colors.YELLOW))
+
+    totales = _mostrar_resumen_limpieza(resumen_limpieza, modo_informe)
+    if limitador is not None:
+        _mostrar_limitador(limitador)
+    if purga is not None:
+        _mostrar_purga(purga, movidas_purga)
+    if desglose is not None:
+        _mostrar_desglose(desglose)
+    return totales
+
+def _registros_vigentes(registros, contadores):
+    """Convierte en CandidatoLimpieza los registros del manifiesto que siguen igual que en el análisis.
+
+    Un archivo solo se da por el mismo si conserva el inodo y la fecha de modificación. Los que
+    han cambiado o ya no existen se cuentan en `contadores` ('modificados', 'desaparecidos').
+    """
+    for registro in registros:
+        try:
+            info = os.stat(registro.ruta, follow_symlinks=False)
+        except FileNotFoundError:
+            contadores['desaparecidos'] += 1
+            continue
+        except OSError as e:
+            contadores['avisos'] += 1
+            logger.warning(f"No se pudo obtener información de {registro.ruta}: {e}")
+            continue
+        if cleanup_manifest.normalizar_inodo(info.st_ino) != registro.inodo or info.st_mtime != registro.mtime:
+            contadores['modificados'] += 1
+            logger.debug(f"El archivo ha cambiado desde el análisis y se conserva: {registro.ruta}")
+            continue
+        yield CandidatoLimpieza(registro.ruta, registro.tamaño, registro.mtime, None, registro.asignado, registro.inodo)
+
+def aplicar_manifiesto(ruta_manifiesto, limite_es=None):
+    """Elimina los archivos planificados en un manifiesto generado en modo informe.
+
+    Separa la decisión de qué eliminar (limpiar_archivos_temporales con `manifiesto`, por
+    ejemplo fuera de horario) de la eliminación, que puede hacerse en una ventana de
+    mantenimiento corta. Solo se elimina un archivo si conserva el inodo y la fecha de
+    modificación registrados; los demás se conservan. El manifiesto se recorre con mmap registro
+    a registro, así que la memoria no depende de su tamaño. Aplicar de nuevo un manifiesto
+    interrumpido es seguro: los archivos ya eliminados cuentan como desaparecidos.
+
+    Args:
+        ruta_manifiesto (str): manifiesto generado por limpiar_archivos_temporales.
+        limite_es (dict, optional): límites de E/S (ver limpiar_archivos_temporales).
+
+    Returns:
+        tuple[int, int]: bytes recuperados y número de archivos eliminados.
+    """
+    logger.info(f"Aplicando el manifiesto de limpieza {ruta_manifiesto}")
+    try:
+        cabecera = cleanup_manifest.leer_cabecera(ruta_manifiesto)
+    except (OSError, cleanup_manifest.ManifiestoInvalido) as e:
+        logger.error(f"No se pudo leer el manifiesto de limpieza {ruta_manifiesto}: {e}")
+        print(utils.colored_text(f"Error al leer el manifiesto de limpieza: {e}", utils.Colors.RED))
+        return 0, 0
+    creado = datetime.datetime.fromtimestamp(cabecera.creado).strftime('%Y-%m-%d %H:%M:%S')
+    mensaje = (f"Manifiesto del nivel '{cabecera.nivel}' generado el {creado}: {cabecera.registros} archivos "
+               f"({cabecera.bytes / (1024*1024):.2f} MB).")
+    logger.info(mensaje)
+    print(mensaje)
+
+    _evento_cancelacion.clear()
+    limitador = io_throttle.crear_limitador(limite_es)
+    contexto = _ContextoLimpieza(cancelacion=_evento_cancelacion, limitador=limitador)
+    resumen_limpieza = ResumenLimpieza()
+    contadores = {'modificados': 0, 'desaparecidos': 0, 'avisos': 0}
+    progreso = utils.ProgressReporter(total=cabecera.registros, prefix='Progreso de limpieza:', suffix='Completado', length=30, unit='archivos')
+    try:
+        candidatos = _registros_vigentes(cleanup_manifest.leer_registros(ruta_manifiesto), contadores)
+        _procesar_archivos(candidatos, contexto, resumen_limpieza, al_procesar=lambda tamaño: progreso.update(1, tamaño))
+    except KeyboardInterrupt:
+        contexto.cancelacion.set()
+    except cleanup_manifest.ManifiestoInvalido as e:
+        contadores['avisos'] += 1
+        logger.error(f"El manifiesto de limpieza está dañado; se detiene la aplicación: {e}")
+    except OSError as e:
+        # Los errores al eliminar se tratan archivo a archivo; este es de lectura del manifiesto
+        contadores['avisos'] += 1
+        logger.error(f"No se pudo leer el manifiesto de limpieza {ruta_manifiesto}; se detiene la aplicación: {e}")
+        print(utils.colored_text(f"Error al leer el manifiesto de limpieza: {e}", utils.Colors.RED))
+    progreso.finish()
+    resumen_limpieza.acumular(avisos=contadores['avisos'])
+
+    if contexto.cancelacion.is_set():
+        mensaje = "Limpieza cancelada. Los totales mostrados son parciales; puede volver a aplicar el mismo manifiesto."
+        logger.warning(mensaje)
+        print(utils.colored_text(mensaje, utils.Colors.YELLOW))
+    totales = _mostrar_resumen_limpieza(resumen_limpieza)
+    if contadores['modificados'] or contadores['desaparecidos']:
+        mensaje = (f"Archivos conservados por haber cambiado desde el análisis: {contadores['modificados']}. "
+                   f"Archivos que ya no existían: {contadores['desaparecidos']}.")
+        logger.info(mensaje)
+        print(mensaje)
+    if limitador is not None:
+        _mostrar_limitador(limitador)
+    return totales
+
+def _guardar_informe_duplicados(grupos, rutas, total_recuperable):
+    """Escribe el informe Markdown de duplicados en el directorio de informes y devuelve su ruta."""
+    fecha = datetime.datetime.now()
+    lineas = [
+        "# Informe de Archivos Duplicados",
+        "",
+        f"**Informe generado el:** {fecha.strftime('%Y-%m-%d %H:%M:%S')}",
+        "",
+        "**Rutas analizadas:**",
+        "",
+    ]
+    lineas.extend(f"- `{ruta}`" for ruta in rutas)
+    lineas.extend([
+        "",
+        f"**Grupos de duplicados:** {len(grupos)}",
+        f"**Espacio recuperable:** {total_recuperable / (1024*1024):.2f} MB",
+        "",
+    ])
+    for indice, grupo in enumerate(grupos, 1):
+        lineas.append(f"## Grupo {indice}: {len(grupo.rutas)} copias de {grupo.tamaño / (1024*1024):.2f} MB "
+                      f"({grupo.recuperable / (1024*1024):.2f} MB recuperables)")
+        lineas.append("")
+        lineas.extend(f"- `{ruta}`" for ruta in grupo.rutas)
+        lineas.append("")
+
+    ruta_informe = os.path.join(config_manager.get_report_path(), f"Informe_Duplicados_{fecha.strftime('%Y%m%d_%H%M%S')}.md")
+    with open(ruta_informe, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lineas))
+    return ruta_informe
+
+def buscar_archivos_duplicados(nivel='basico', rutas_extra=None, workers=4, tamaño_minimo=1, guardar_informe=True):
+    """Busca archivos duplicados en las rutas de limpieza del nivel y en rutas adicionales.
+
+    Es un modo de solo informe: no elimina nada. Los archivos se agrupan por tamaño y solo
+    se leen los que coinciden con otro; primero el principio y el final de cada uno y, si
+    siguen coincidiendo, el contenido completo (ver duplicate_finder.buscar_duplicados).
+
+    Args:
+        nivel (str): nivel cuyas rutas de limpieza se analizan.
+        rutas_extra (list[str], optional): rutas adicionales, por ejemplo cachés de descargas.
+        workers (int): hilos usados para calcular los hashes.
+        tamaño_minimo (int): tamaño mínimo en bytes de los archivos a comparar.
+        guardar_informe (bool): si True, guarda un informe Markdown en el directorio de informes.
+
+    Returns:
+        tuple: (bytes recuperables, lista de duplicate_finder.GrupoDuplicados).
+    """
+    utils.show_header("Búsqueda de Archivos Duplicados")
+    rutas = _resolver_rutas(nivel)
+    for ruta in rutas_extra or []:
+        if not os.path.isdir(ruta):
+            logger.warning(f"La ruta no existe, omitiendo: {ruta}")
+        elif ruta not in rutas:
+            rutas.append(ruta)
+
+    resumen = ResumenLimpieza()
+    contexto = _ContextoLimpieza(modo_informe=True)
+    print("Buscando archivos duplicados...")
+    grupos = duplicate_finder.buscar_duplicados(_iterar_candidatos(rutas, resumen, contexto), workers=workers, tamaño_minimo=tamaño_minimo)
+    total_recuperable = sum(grupo.recuperable for grupo in grupos)
+
+    mensaje = f"Búsqueda completada. Grupos de duplicados: {len(grupos)}. Espacio recuperable: {total_recuperable / (1024*1024):.2f} MB."
+    logger.info(mensaje)
+    print(utils.colored_text(mensaje, utils.Colors.GREEN))
+    for grupo in grupos[:10]:
+        print(f" - {len(grupo.rutas)} copias de {os.path.basename(grupo.rutas[0])}: {grupo.recuperable / (1024*1024):.2f} MB recuperables")
+    if resumen.avisos:
+        print(utils.colored_text(f"Se registraron {resumen.avisos} avisos durante la búsqueda. Consulte el log para más detalles.", utils.Colors.YELLOW))
+
+    if guardar_informe and grupos:
+        try:
+            ruta_informe = _guardar_informe_duplicados(grupos, rutas, total_recuperable)
+            logger.info(f"Informe de duplicados guardado en {ruta_informe}")
+            print(utils.colored_text(f"Informe guardado en: {ruta_informe}", utils.Colors.GREEN))
+        except OSError as e:
+            logger.error(f"No se pudo guardar el informe de duplicados: {e}")
+            print(utils.colored_text(f"Error al guardar el informe de duplicados: {e}", utils.Colors.RED))
+
+    return total_recuperable, grupos
+
+# Elementos de la papelera que se listan uno a uno en modo informe; del resto solo se da el total
+_MAX_ELEMENTOS_LISTADOS = 50
+
+def limpiar_papelera_reciclaje_seguro(confirmar=False, mostrar_progreso=True, sonido=False, modo_informe=False, backend=None):
     """Vacía la papelera de reciclaje de Windows de forma segura usando winshell.
 
+    La papelera se recorre de forma perezosa: para saber si está vacía basta con el primer
+    elemento, y en modo informe los tamaños se suman mientras se itera, sin cargarla entera.
+
     Args:
         confirmar (bool): si se muestra confirmación al vaciar (winshell).
         mostrar_progreso (bool): si se muestra progreso.
         sonido (bool): si se reproduce sonido.
         modo_informe (bool): si True, no vacía la papelera; solo lista el contenido y devuelve un resumen.
+        backend (recycle_bin.BackendPapelera, optional): acceso a la papelera; por defecto, winshell.
     """
     logger.info(f"Iniciando limpieza segura de la papelera de reciclaje (Confirmar: {confirmar}, Progreso: {mostrar_progreso}, Sonido: {sonido}, Modo Informe: {modo_informe})")
     try:
-        rb = winshell.recycle_bin()
-        items = list(rb)
-        if not items:
+        if backend is None:
+            backend = recycle_bin.BackendWinshell()
+
+        if modo_informe:
+            elementos = backend.elementos()
+            primero = next(elementos, None)
+            vacia = primero is None
+        else:
+            vacia = backend.esta_vacia()
+        if vacia:
             logger.info("La papelera de reciclaje ya está vacía.")
             print(utils.colored_text("La papelera de reciclaje ya está vacía.", utils.Colors.YELLOW))
             return True # Considerar éxito si ya está vacía
 
         if modo_informe:
-            # Listar contenido y tamaño aproximado si está disponible
+            # Listar los primeros elementos y acumular el tamaño de todos en la misma pasada
             print(utils.colored_text("Papelera de reciclaje - MODO INFORME", utils.Colors.YELLOW))
             total = 0
             count = 0
-            for entry in items:
-                try:
-                    # Algunos objetos pueden exponer un Name o filename; usar repr como fallback
-                    name = getattr(entry, 'name', None) or getattr(entry, 'Name', None) or repr(entry)
-                    size = 0
-                    # intentar obtener tamaño si el objeto lo expone
-                    if hasattr(entry, 'size'):
-                        size = getattr(entry, 'size') or 0
-                    elif hasattr(entry, 'inner') and hasattr(entry.inner, 'size'):
-                        size = getattr(entry.inner, 'size') or 0
-                    total += size
-                    count += 1
-                    print(f" - {name} | Tamaño aproximado: {size} bytes")
-                except Exception:
-                    print(f" - {repr(entry)}")
+            for entry in itertools.chain([primero], elementos):
+                total += entry.tamaño
+                count += 1
+                if count <= _MAX_ELEMENTOS_LISTADOS:
+                    print(f" - {entry.nombre} | Tamaño aproximado: {entry.tamaño} bytes")
+            if count > _MAX_ELEMENTOS_LISTADOS:
+                print(f" ... y {count - _MAX_ELEMENTOS_LISTADOS} elementos más.")
             print(f"Resumen: {count} elementos en la papelera. Tamaño total aproximado: {total} bytes.")
             logger.info(f"Modo informe: {count} elementos en la papelera. Tamaño total aproximado: {total} bytes.")
             return True
 
         # No es modo informe: proceder a vaciar
-        rb.empty(confirm=confirmar, show_progress=mostrar_progreso, sound=sonido)
+        backend.vaciar(confirmar=confirmar, mostrar_progreso=mostrar_progreso, sonido=sonido)
         logger.info("La papelera de reciclaje ha sido vaciada con éxito.")
         print(utils.colored_text("La papelera de reciclaje ha sido vaciada con éxito.", utils.Colors.GREEN))
         return True
@@ -209,18 +1420,34 @@ def limpiar_copias_sombra():
         print(utils.colored_text(f"Error inesperado al eliminar copias de sombra: {e}", utils.Colors.RED))
         return False
 
-def ejecutar_limpiador():
-    """Presenta un menú interactivo para realizar diferentes tipos de limpieza del sistema."""
+# Niveles con número fijo en el menú del limpiador (opciones 1 y 2)
+_NIVELES_MENU_FIJOS = ('basico', 'extendido')
+
+def ejecutar_limpiador(workers=1, limite_es=None, purga_diferida=False, omitir_abiertos=False):
+    """Presenta un menú interactivo para realizar diferentes tipos de limpieza del sistema.
+
+    Args:
+        workers (int): hilos usados por la limpieza de archivos temporales.
+        limite_es (dict, optional): límites de E/S para la eliminación (ver limpiar_archivos_temporales).
+        purga_diferida (bool): mueve los temporales al área de purga y los elimina en segundo plano.
+        omitir_abiertos (bool): no intenta eliminar los archivos abiertos por otros procesos.
+    """
     utils.show_header("Módulo de Limpieza del Sistema")
     logger.info("Iniciando módulo de limpieza del sistema.")
 
-    opciones_limpieza = {
-        '1': {'nombre': 'Limpieza Básica (Archivos Temporales)', 'nivel': 'basico'},
-        '2': {'nombre': 'Limpieza Extendida (Archivos Temporales y Prefetch)', 'nivel': 'extendido'},
-        '3': {'nombre': 'Vaciar Papelera de Reciclaje', 'funcion': limpiar_papelera_reciclaje_seguro},
-        '4': {'nombre': 'Limpiar Almacén WinSxS', 'funcion': limpiar_winsxs},
-        '5': {'nombre': 'Eliminar Copias de Sombra', 'funcion': limpiar_copias_sombra},
-    }
+    # Las opciones de siempre conservan su número: los niveles básico y extendido, las
+    # operaciones especiales y los duplicados. Los demás niveles del menú declarados en
+    # config/cleanup_targets.json se añaden a continuación, en el orden del archivo
+    niveles_menu = [nivel for nivel in cleanup_targets.niveles() if nivel.menu]
+    tareas = [{'nombre': nivel.etiqueta, 'nivel': nivel.nombre} for nivel in niveles_menu if nivel.nombre in _NIVELES_MENU_FIJOS]
+    tareas.extend([
+        {'nombre': 'Vaciar Papelera de Reciclaje', 'funcion': limpiar_papelera_reciclaje_seguro},
+        {'nombre': 'Limpiar Almacén WinSxS', 'funcion': limpiar_winsxs},
+        {'nombre': 'Eliminar Copias de Sombra', 'funcion': limpiar_copias_sombra},
+        {'nombre': 'Buscar Archivos Duplicados (Informe)', 'duplicados': True},
+    ])
+    tareas.extend({'nombre': nivel.etiqueta, 'nivel': nivel.nombre} for nivel in niveles_menu if nivel.nombre not in _NIVELES_MENU_FIJOS)
+    opciones_limpieza = {str(numero): tarea for numero, tarea in enumerate(tareas, start=1)}
 
     while True:
         print("\nSeleccione una opción de limpieza:")
@@ -232,6 +1459,9 @@ def ejecutar_limpiador():
 
         if opcion == '0':
             logger.info("Saliendo del módulo de limpieza.")
+            if cleanup_staging.purga().activa():
+                print(utils.colored_text("La purga de archivos temporales continúa en segundo plano. "
+                                         "Si se cierra el programa antes de que termine, se completará en la próxima limpieza.", utils.Colors.YELLOW))
             break
         elif opcion in opciones_limpieza:
             tarea = opciones_limpieza[opcion]
@@ -245,7 +1475,9 @@ def ejecutar_limpiador():
                 else:
                     modo_informe = True
 
-                total_recuperado, num_archivos = limpiar_archivos_temporales(nivel=tarea['nivel'], modo_informe=modo_informe)
+                total_recuperado, num_archivos = limpiar_archivos_temporales(nivel=tarea['nivel'], modo_informe=modo_informe, workers=workers,
+                                                                             limite_es=limite_es, purga_diferida=purga_diferida,
+                                                                             omitir_abiertos=omitir_abiertos)
 
                 # Asegurar que el resumen se imprime también en ejecutar_limpiador para que los tests que parchean
                 # limpiar_archivos_temporales sigan observando la salida esperada.
@@ -253,6 +1485,11 @@ def ejecutar_limpiador():
                 logger.info(f"Limpieza de archivos temporales ({tarea['nivel']}) - Recuperado: {total_recuperado / (1024*1024):.2f} MB, Archivos: {num_archivos}")
                 print(utils.colored_text(resumen, utils.Colors.GREEN))
 
+            elif 'duplicados' in tarea: # Solo informe, no requiere confirmación
+                rutas_extra = input("Rutas adicionales a analizar, separadas por ';' (Enter para ninguna): ").strip()
+                buscar_archivos_duplicados(rutas_extra=[ruta.strip() for ruta in rutas_extra.split(';') if ruta.strip()],
+                                           workers=max(workers, 4))
+
             elif 'funcion' in tarea: # Para otras funciones de limpieza
                 if not utils.confirm_operation(f"¿Está seguro de ejecutar \'{tarea['nombre']}\'? (Esta acción es irreversible)"):
                     logger.info(f"Operación '{tarea['nombre']}' cancelada por el usuario.")
@@ -0,0 +1,234 @@
+# src/system_snapshot.py
+
+import json
+import math
+import struct
+import logging
+from collections import namedtuple
+
+APP_LOGGER_NAME = 'OptiTechOptimizer'
+logger = logging.getLogger(APP_LOGGER_NAME)
+
+# Modelo de una instantánea del análisis con los valores sin formatear: bytes como enteros,
+# frecuencias en MHz y porcentajes como float. Los campos que el sistema no informa (por
+# ejemplo, los núcleos físicos en algunas máquinas virtuales) o de un disco que no respondió
+# son None. El texto se genera solo al presentar los datos (funciones formatear_*).
+
+# Sistema operativo
+InfoSO = namedtuple('InfoSO', ['sistema', 'edicion', 'version', 'arquitectura', 'hostname'])
+
+# CPU: núcleos, frecuencias (MHz) y uso (%) total y por núcleo lógico
+InfoCPU = namedtuple('InfoCPU', ['nucleos_fisicos', 'nucleos_logicos', 'frecuencia_max', 'frecuencia_min',
+                                 'frecuencia_actual', 'uso_por_nucleo', 'uso_total'])
+
+# Memoria física en bytes y porcentaje en uso
+InfoMemoria = namedtuple('InfoMemoria', ['total', 'disponible', 'usada', 'porcentaje'])
+
+# Partición: identificación, espacio en bytes y porcentaje en uso
+InfoDisco = namedtuple('InfoDisco', ['dispositivo', 'montaje', 'sistema_archivos', 'total', 'usado', 'libre', 'porcentaje'])
+
+# Servicios del sistema por estado
+EstadoServicios = namedtuple('EstadoServicios', ['total', 'en_ejecucion', 'detenidos', 'pausados', 'otros'])
+
+# Tiempo de un recolector: nombre, estado (ver parallel_collectors y collector_registry) y segundos
+Tiempo = namedtuple('Tiempo', ['nombre', 'estado', 'segundos'])
+
+# Instantánea completa: fecha (epoch), secciones (None si su recolector no terminó bien o
+# no se ejecutó), discos y tiempo de cada recolector
+Instantanea = namedtuple('Instantanea', ['fecha', 'sistema', 'cpu', 'memoria', 'discos', 'servicios', 'tiempos'])
+
+_GB = 1024**3
+
+def formatear_so(info):
+    return {
+        "system": info.sistema,
+        "release": info.edicion,
+        "version": info.version,
+        "architecture": info.arquitectura,
+        "hostname": info.hostname,
+    }
+
+def formatear_cpu(info):
+    return {
+        "physical_cores": info.nucleos_fisicos,
+        "total_cores": info.nucleos_logicos,
+        "max_frequency": f"{info.frecuencia_max:.2f} Mhz",
+        "min_frequency": f"{info.frecuencia_min:.2f} Mhz",
+        "current_frequency": f"{info.frecuencia_actual:.2f} Mhz",
+        "usage_per_core": [f"{uso}%" for uso in info.uso_por_nucleo],
+        "total_usage": f"{info.uso_total}%",
+    }
+
+def formatear_memoria(info):
+    return {
+        "total": f"{info.total / _GB:.2f} GB",
+        "available": f"{info.disponible / _GB:.2f} GB",
+        "used": f"{info.usada / _GB:.2f} GB",
+        "percentage": f"{info.porcentaje}%",
+    }
+
+def formatear_disco(info):
+    return {
+        "device": info.dispositivo,
+        "mountpoint": info.montaje,
+        "fstype": info.sistema_archivos,
+        "total_size": f"{info.total / _GB:.2f} GB",
+        "used": f"{info.usado / _GB:.2f} GB",
+        "free": f"{info.libre / _GB:.2f} GB",
+        "percentage": f"{info.porcentaje}%",
+    }
+
+def formatear_servicios(info):
+    return {
+        'total': info.total,
+        'running': info.en_ejecucion,
+        'stopped': info.detenidos,
+        'paused': info.pausados,
+        'other': info.otros,
+    }
+
+# --- JSON ---
+
+def a_diccionario(instantanea):
+    """Convierte la instantánea en tipos de JSON (diccionarios, listas, números y cadenas)."""
+    def seccion(info):
+        return None if info is None else info._asdict()
+    return {
+        'fecha': instantanea.fecha,
+        'sistema': seccion(instantanea.sistema),
+        'cpu': seccion(instantanea.cpu),
+        'memoria': seccion(instantanea.memoria),
+        'discos': [disco._asdict() for disco in instantanea.discos],
+        'servicios': seccion(instantanea.servicios),
+        'tiempos': [list(tiempo) for tiempo in instantanea.tiempos],
+    }
+
+def desde_diccionario(datos):
+    def seccion(tipo, valores):
+        return None if valores is None else tipo(**valores)
+    cpu = seccion(InfoCPU, datos['cpu'])
+    if cpu is not None:
+        cpu = cpu._replace(uso_por_nucleo=list(cpu.uso_por_nucleo))
+    return Instantanea(datos['fecha'], seccion(InfoSO, datos['sistema']), cpu, seccion(InfoMemoria, datos['memoria']),
+                       [InfoDisco(**disco) for disco in datos['discos']], seccion(EstadoServicios, datos['servicios']),
+                       [Tiempo(*tiempo) for tiempo in datos['tiempos']])
+
+def a_json(instantanea):
+    return json.dumps(a_diccionario(instantanea), ensure_ascii=False, separators=(',', ':'))
+
+def desde_json(texto):
+    return desde_diccionario(json.loads(texto))
+
+# --- Binario ---
+
+# Formato binario (little-endian): firma de 8 bytes, fecha (double) y un byte con las
+# secciones presentes; después cada sección presente, el número de discos (uint16) y sus
+# registros, y el número de tiempos (uint16) y los suyos. Cada campo se codifica según su
+# tipo en _CAMPOS: 's' cadena UTF-8 con su longitud (uint16), 'q' entero (int64, -1 si es
+# None), 'd' real (double, NaN si es None) y 'L' lista de reales con su longitud (uint16).
+FIRMA = b'OPTISNP1'
+_CABECERA = struct.Struct('<8sdB')
+_LONGITUD = struct.Struct('<H')
+_ENTERO = struct.Struct('<q')
+_REAL = struct.Struct('<d')
+_ERRORES_TEXTO = 'surrogatepass'
+
+_CAMPOS = {
+    InfoSO: 'sssss',
+    InfoCPU: 'qqdddLd',
+    InfoMemoria: 'qqqd',
+    InfoDisco: 'sssqqqd',
+    EstadoServicios: 'qqqqq',
+    Tiempo: 'ssd',
+}
+# Secciones opcionales, en el orden de los bits del byte de presencia
+_SECCIONES = (('sistema', InfoSO), ('cpu', InfoCPU), ('memoria', InfoMemoria), ('servicios', EstadoServicios))
+
+class InstantaneaInvalida(ValueError):
+    """Los datos no son una instantánea binaria o están truncados."""
+
+def _empaquetar(registro, partes):
+    for tipo, valor in zip(_CAMPOS[type(registro)], registro):
+        if tipo == 's':
+            codificada = valor.encode('utf-8', _ERRORES_TEXTO)
+            partes.append(_LONGITUD.pack(len(codificada)))
+            partes.append(codificada)
+        elif tipo == 'q':
+            partes.append(_ENTERO.pack(-1 if valor is None else valor))
+        elif tipo == 'd':
+            partes.append(_REAL.pack(math.nan if valor is None else valor))
+        else:
+            partes.append(_LONGITUD.pack(len(valor)))
+            partes.append(struct.pack(f'<{len(valor)}d', *valor))
+
+def _desempaquetar(tipo_registro, datos, posicion):
+    valores = []
+    for tipo in _CAMPOS[tipo_registro]:
+        if tipo == 's':
+            longitud, = _LONGITUD.unpack_from(datos, posicion)
+            posicion += _LONGITUD.size
+            if posicion + longitud > len(datos):
+                raise InstantaneaInvalida("Instantánea truncada.")
+            valores.append(bytes(datos[posicion:posicion + longitud]).decode('utf-8', _ERRORES_TEXTO))
+            posicion += longitud
+        elif tipo == 'q':
+            valor, = _ENTERO.unpack_from(datos, posicion)
+            posicion += _ENTERO.size
+            valores.append(None if valor == -1 else valor)
+        elif tipo == 'd':
+            valor, = _REAL.unpack_from(datos, posicion)
+            posicion += _REAL.size
+            valores.append(None if math.isnan(valor) else valor)
+        else:
+            longitud, = _LONGITUD.unpack_from(datos, posicion)
+            posicion += _LONGITUD.size
+            valores.append(list(struct.unpack_from(f'<{longitud}d', datos, posicion)))
+            posicion += longitud * _REAL.size
+    return tipo_registro(*valores), posicion
+
+def a_binario(instantanea):
+    """Codifica la instantánea en el formato binario compacto (ver FIRMA)."""
+    presentes = 0
+    for bit, (campo, _) in enumerate(_SECCIONES):
+        if getattr(instantanea, campo) is not None:
+            presentes |= 1 << bit
+    partes = [_CABECERA.pack(FIRMA, instantanea.fecha, presentes)]
+    for campo, _ in _SECCIONES:
+        if getattr(instantanea, campo) is not None:
+            _empaquetar(getattr(instantanea, campo), partes)
+    for lista in (instantanea.discos, instantanea.tiempos):
+        partes.append(_LONGITUD.pack(len(lista)))
+        for registro in lista:
+            _empaquetar(registro, partes)
+    return b''.join(partes)
+
+def desde_binario(datos):
+    """Decodifica una instantánea de a_binario.
+
+    Raises:
+        InstantaneaInvalida: si los datos no son una instantánea o están truncados.
+    """
+    if len(datos) < _CABECERA.size:
+        raise InstantaneaInvalida("Los datos son demasiado cortos para ser una instantánea.")
+    firma, fecha, presentes = _CABECERA.unpack_from(datos, 0)
+    if firma != FIRMA:
+        raise InstantaneaInvalida("Los datos no son una instantánea de análisis de OptiTech.")
+    posicion = _CABECERA.size
+    try:
+        secciones = {}
+        for bit, (campo, tipo) in enumerate(_SECCIONES):
+            secciones[campo] = None
+            if presentes & (1 << bit):
+                secciones[campo], posicion = _desempaquetar(tipo, datos, posicion)
+        listas = []
+        for tipo in (InfoDisco, Tiempo):
+            cantidad, = _LONGITUD.unpack_from(datos, posicion)
+            posicion += _LONGITUD.size
+            registros = []
+            for _ in range(cantidad):
+                registro, posicion = _desempaquetar(tipo, datos, posicion)
+                registros.append(registro)
+            listas.append(registros)
+    except struct.error as e:
+        raise InstantaneaInvalida(f"Instantánea truncada: {e}") from e
+    return Instantanea(fecha, secciones['sistema'], secciones['cpu'], secciones['memoria'], listas[0], secciones['servicios'], listas[1])
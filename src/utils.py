@@ -4,6 +4,8 @@ import sys
 import time
 import winreg
 import os
+import ctypes
+import functools
 import subprocess
 
 
@@ -124,11 +126,8 @@ def confirm_operation(prompt):
         else:
             print("Invalid input. Please enter 'y' or 'n'.")
 
-def show_progress_bar(iteration, total, prefix='', suffix='', decimals=1, length=50, fill='█'):
-    """
-    Muestra o actualiza una barra de progreso en la consola.
-    Maneja casos de total cero y limpia la línea al completarse.
-    """
+def _format_progress_bar(iteration, total, prefix='', suffix='', decimals=1, length=50, fill='█'):
+    """Construye la línea de una barra de progreso (sin escribirla)."""
     # Determinar el porcentaje y el relleno de la barra
     if total > 0:
         percent = ("{0:." + str(decimals) + "f}").format(100 * (iteration / float(total)))
@@ -139,10 +138,18 @@ def show_progress_bar(iteration, total, prefix='', suffix='', decimals=1, length
 
     bar = fill * filled_length + '-' * (length - filled_length)
 
-    # Construir la cadena de la barra de progreso
     # El espacio al final asegura que se sobrescriban los caracteres de una línea anterior más larga
-    line = f'\r{prefix} |{bar}| {percent}% {suffix} ' 
-    sys.stdout.write(line)
+    return f'\r{prefix} |{bar}| {percent}% {suffix} '
+
+def show_progress_bar(iteration, total, prefix='', suffix='', decimals=1, length=50, fill='█'):
+    """
+    Muestra o actualiza una barra de progreso en la consola.
+    Maneja casos de total cero y limpia la línea al completarse.
+
+    Escribe y vacía stdout en cada llamada; para bucles con muchas iteraciones
+    es preferible usar ProgressReporter, que limita la frecuencia de redibujado.
+    """
+    sys.stdout.write(_format_progress_bar(iteration, total, prefix, suffix, decimals, length, fill))
 
     # Manejar la finalización
     if iteration == total:
@@ -150,6 +157,164 @@ def show_progress_bar(iteration, total, prefix='', suffix='', decimals=1, length
     
     sys.stdout.flush()
 
+def _format_duration(seconds):
+    """Formatea una duración en segundos como H:MM:SS o M:SS."""
+    seconds = int(seconds)
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+class ProgressReporter:
+    """
+    Barra de progreso con redibujado limitado, pensada para bucles de millones de iteraciones.
+
+    Solo redibuja cuando ha pasado `min_interval` segundos desde el último dibujo o cuando
+    el porcentaje ha avanzado al menos `min_percent_step` puntos. Si la salida no es una
+    terminal (por ejemplo, redirigida a un archivo de log) no dibuja nada. Muestra además
+    el rendimiento (elementos/s y MB/s) y una estimación del tiempo restante.
+
+    Args:
+        total (int): número total de elementos esperado; puede ajustarse con set_total().
+        prefix (str): texto antes de la barra.
+        suffix (str): texto después del porcentaje.
+        length (int): ancho de la barra en caracteres.
+        min_interval (float): segundos mínimos entre redibujados (0.1 equivale a 10 Hz).
+        min_percent_step (float, optional): puntos porcentuales que fuerzan un redibujado.
+        unit (str): nombre de los elementos para el rendimiento (ej. "archivos").
+        stream (file, optional): destino de la salida. Por defecto, sys.stdout.
+        enabled (bool, optional): fuerza o desactiva el dibujado; por defecto, solo si `stream` es una TTY.
+    """
+
+    def __init__(self, total=0, prefix='', suffix='', length=50, min_interval=0.1, min_percent_step=None,
+                 unit='elem', stream=None, enabled=None, decimals=1, fill='█'):
+        self.total = total
+        self.prefix = prefix
+        self.suffix = suffix
+        self.length = length
+        self.min_interval = min_interval
+        self.min_percent_step = min_percent_step
+        self.unit = unit
+        self.decimals = decimals
+        self.fill = fill
+        self.stream = stream if stream is not None else sys.stdout
+        if enabled is None:
+            try:
+                enabled = self.stream.isatty()
+            except (AttributeError, ValueError):
+                enabled = False
+        self.enabled = enabled
+
+        self.count = 0
+        self.bytes = 0
+        self.draws = 0
+        self._start = time.monotonic()
+        self._last_draw = None
+        self._last_percent = None
+        self._finished = False
+
+    def set_total(self, total):
+        """Actualiza el total esperado (útil cuando solo se conoce una estimación)."""
+        self.total = total
+
+    def update(self, count=1, nbytes=0):
+        """Registra `count` elementos y `nbytes` bytes procesados y redibuja si corresponde."""
+        self.count += count
+        self.bytes += nbytes
+        if not self.enabled:
+            return
+
+        now = time.monotonic()
+        if self._last_draw is not None and now - self._last_draw < self.min_interval:
+            if self.min_percent_step is None or self.total <= 0:
+                return
+            if 100.0 * self.count / self.total - self._last_percent < self.min_percent_step:
+                return
+        self._draw(now)
+
+    def finish(self):
+        """Dibuja el estado final y pasa a la línea siguiente. Es idempotente."""
+        if self._finished:
+            return
+        self._finished = True
+        if self.enabled:
+            self.total = self.count
+            self._draw(time.monotonic(), final=True)
+
+    def _draw(self, now, final=False):
+        elapsed = now - self._start
+        rate = self.count / elapsed if elapsed > 0 else 0.0
+        mb_rate = self.bytes / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+        stats = f"{rate:.0f} {self.unit}/s"
+        if self.bytes:
+            stats += f" {mb_rate:.1f} MB/s"
+        if final:
+            stats += f" en {_format_duration(elapsed)}"
+        elif rate > 0 and self.total > self.count:
+            stats += f" ETA {_format_duration((self.total - self.count) / rate)}"
+
+        line = _format_progress_bar(min(self.count, self.total) if self.total > 0 else self.count, self.total,
+                                    self.prefix, f"{self.suffix} | {stats}", self.decimals, self.length, self.fill)
+        self.stream.write(line + ('\n' if final else ''))
+        self.stream.flush()
+        self.draws += 1
+        self._last_draw = now
+        self._last_percent = 100.0 * self.count / self.total if self.total > 0 else 100.0
+
+# Tamaño de clúster supuesto cuando no se puede consultar el del volumen
+DEFAULT_CLUSTER_SIZE = 4096
+
+@functools.lru_cache(maxsize=64)
+def _volume_cluster_size(volume):
+    try:
+        if os.name == 'nt':
+            sectors_per_cluster = ctypes.c_ulong()
+            bytes_per_sector = ctypes.c_ulong()
+            if ctypes.windll.kernel32.GetDiskFreeSpaceW(ctypes.c_wchar_p(volume), ctypes.byref(sectors_per_cluster),
+                                                        ctypes.byref(bytes_per_sector), None, None):
+                return sectors_per_cluster.value * bytes_per_sector.value or DEFAULT_CLUSTER_SIZE
+        else:
+            return os.statvfs(volume).f_frsize or DEFAULT_CLUSTER_SIZE
+    except (OSError, AttributeError, ValueError):
+        pass
+    return DEFAULT_CLUSTER_SIZE
+
+def get_cluster_size(path):
+    """
+    Devuelve el tamaño de clúster (unidad mínima de asignación) del volumen que contiene `path`.
+    El resultado se cachea por volumen, así que basta con consultarlo una vez por raíz.
+
+    Args:
+        path (str): Una ruta cualquiera del volumen.
+
+    Returns:
+        int: El tamaño de clúster en bytes, o DEFAULT_CLUSTER_SIZE si no se puede determinar.
+    """
+    if os.name == 'nt':
+        drive = os.path.splitdrive(os.path.abspath(path))[0]
+        return _volume_cluster_size(drive + '\\') if drive else DEFAULT_CLUSTER_SIZE
+    return _volume_cluster_size(path)
+
+def allocated_size(stat_result, cluster_size=DEFAULT_CLUSTER_SIZE):
+    """
+    Calcula el espacio que ocupa realmente un archivo en disco a partir de su stat.
+
+    Usa st_blocks (bloques de 512 bytes) cuando el sistema lo proporciona, lo que refleja
+    archivos dispersos y comprimidos. Si no (Windows), redondea el tamaño lógico al
+    tamaño de clúster. No realiza ninguna llamada al sistema.
+
+    Args:
+        stat_result (os.stat_result): El resultado de stat del archivo.
+        cluster_size (int): El tamaño de clúster del volumen (ver get_cluster_size).
+
+    Returns:
+        int: Los bytes asignados en disco.
+    """
+    blocks = getattr(stat_result, 'st_blocks', None)
+    if blocks is not None:
+        return blocks * 512
+    return -(-stat_result.st_size // cluster_size) * cluster_size
 
 def get_service_status(service_name):
     """
@@ -0,0 +1,91 @@
+# tests/test_cleanup_journal.py
+
+import unittest
+import os
+import tempfile
+from src import cleanup_journal
+
+class TestCleanupJournal(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self._tmp.name, 'diario.journal')
+        self.raices = [os.path.join(self._tmp.name, 'temp')]
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_reanuda_estado_de_ejecucion_interrumpida(self):
+        diario = cleanup_journal.DiarioLimpieza(self.ruta, self.raices)
+        self.assertFalse(diario.reanudado)
+        diario.sumar(100)
+        diario.sumar(50)
+        diario.marcar_directorio(os.path.join(self.raices[0], 'a'))
+        diario.cerrar(completado=False)
+
+        reanudado = cleanup_journal.DiarioLimpieza(self.ruta, self.raices)
+        self.assertTrue(reanudado.reanudado)
+        self.assertEqual((reanudado.total_bytes, reanudado.total_archivos), (150, 2))
+        self.assertEqual(reanudado.directorios_completados, {os.path.join(self.raices[0], 'a')})
+        reanudado.cerrar(completado=False)
+
+    def test_ignora_linea_final_incompleta(self):
+        diario = cleanup_journal.DiarioLimpieza(self.ruta, self.raices)
+        diario.marcar_directorio('completo')
+        diario.cerrar(completado=False)
+        with open(self.ruta, 'a', encoding='utf-8') as f:
+            f.write('D\tcortad')
+
+        reanudado = cleanup_journal.DiarioLimpieza(self.ruta, self.raices)
+        self.assertEqual(reanudado.directorios_completados, {'completo'})
+        reanudado.cerrar(completado=False)
+
+    def test_descarta_diario_de_otras_rutas(self):
+        diario = cleanup_journal.DiarioLimpieza(self.ruta, self.raices)
+        diario.marcar_directorio('completo')
+        diario.cerrar(completado=False)
+
+        otro = cleanup_journal.DiarioLimpieza(self.ruta, [os.path.join(self._tmp.name, 'otra')])
+        self.assertFalse(otro.reanudado)
+        otro.cerrar(completado=False)
+
+    def test_descarta_diario_de_otra_configuracion(self):
+        diario = cleanup_journal.DiarioLimpieza(self.ruta, self.raices, nivel='basico', reglas={'exclude': ['*.lock']})
+        diario.marcar_directorio('completo')
+        diario.cerrar(completado=False)
+
+        otro_nivel = cleanup_journal.DiarioLimpieza(self.ruta, self.raices, nivel='extendido', reglas={'exclude': ['*.lock']})
+        self.assertFalse(otro_nivel.reanudado)
+        otro_nivel.marcar_directorio('completo')
+        otro_nivel.cerrar(completado=False)
+        otras_reglas = cleanup_journal.DiarioLimpieza(self.ruta, self.raices, nivel='extendido', reglas={})
+        self.assertFalse(otras_reglas.reanudado)
+        otras_reglas.cerrar(completado=False)
+
+    def test_descarta_diario_antiguo(self):
+        ahora = [1_000_000.0]
+        reloj = lambda: ahora[0]
+        diario = cleanup_journal.DiarioLimpieza(self.ruta, self.raices, reloj=reloj)
+        diario.marcar_directorio('completo')
+        diario.cerrar(completado=False)
+
+        ahora[0] += cleanup_journal.ANTIGUEDAD_MAXIMA_SEGUNDOS - 60
+        reciente = cleanup_journal.DiarioLimpieza(self.ruta, self.raices, reloj=reloj)
+        self.assertTrue(reciente.reanudado)
+        reciente.cerrar(completado=False)
+
+        # La antigüedad se cuenta desde la primera ejecución, aunque se haya reanudado después
+        ahora[0] += 120
+        antiguo = cleanup_journal.DiarioLimpieza(self.ruta, self.raices, reloj=reloj)
+        self.assertFalse(antiguo.reanudado)
+        self.assertEqual(antiguo.directorios_completados, set())
+        antiguo.cerrar(completado=False)
+
+    def test_elimina_el_diario_al_completar(self):
+        diario = cleanup_journal.DiarioLimpieza(self.ruta, self.raices)
+        diario.marcar_directorio('completo')
+        diario.cerrar(completado=True)
+        self.assertFalse(os.path.exists(self.ruta))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+# tests/test_cleanup_manifest.py
+
+import os
+import tempfile
+import unittest
+from src import cleanup_manifest
+
+class TestCleanupManifest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.destino = os.path.join(self._tmp.name, 'plan.bin')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_escribir_y_leer(self):
+        registros = [
+            cleanup_manifest.RegistroManifiesto('/tmp/a.tmp', 10, 4096, 1700000000.25, 42),
+            cleanup_manifest.RegistroManifiesto('/tmp/ñandú \udcff.log', 0, 0, 0.0, 1 << 63),
+        ]
+        with cleanup_manifest.EscritorManifiesto(self.destino, 'basico') as escritor:
+            for registro in registros:
+                escritor.agregar(*registro)
+
+        cabecera = cleanup_manifest.leer_cabecera(self.destino)
+        self.assertEqual((cabecera.registros, cabecera.bytes, cabecera.nivel), (2, 10, 'basico'))
+        self.assertEqual(list(cleanup_manifest.leer_registros(self.destino)), registros)
+        self.assertFalse(os.path.exists(self.destino + '.tmp'))
+
+    def test_se_descarta_si_falla_el_analisis(self):
+        with self.assertRaises(RuntimeError):
+            with cleanup_manifest.EscritorManifiesto(self.destino) as escritor:
+                escritor.agregar('/tmp/a.tmp', 1, 1, 0.0, 1)
+                raise RuntimeError("fallo")
+
+        self.assertEqual(os.listdir(self._tmp.name), [])
+
+    def test_manifiesto_invalido_o_truncado(self):
+        with open(self.destino, 'wb') as f:
+            f.write(b'no es un manifiesto, solo texto')
+        with self.assertRaises(cleanup_manifest.ManifiestoInvalido):
+            list(cleanup_manifest.leer_registros(self.destino))
+
+        open(self.destino, 'wb').close()
+        with self.assertRaises(cleanup_manifest.ManifiestoInvalido):
+            list(cleanup_manifest.leer_registros(self.destino))
+
+        with cleanup_manifest.EscritorManifiesto(self.destino) as escritor:
+            escritor.agregar('/tmp/a.tmp', 1, 1, 0.0, 1)
+            escritor.agregar('/tmp/b.tmp', 1, 1, 0.0, 2)
+        with open(self.destino, 'r+b') as f:
+            f.truncate(os.path.getsize(self.destino) - 3)
+        leidos = []
+        with self.assertRaises(cleanup_manifest.ManifiestoInvalido):
+            for registro in cleanup_manifest.leer_registros(self.destino):
+                leidos.append(registro.ruta)
+        self.assertEqual(leidos, ['/tmp/a.tmp'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+# tests/test_cleanup_rules.py
+
+import unittest
+import os
+from unittest.mock import patch
+from src import cleanup_rules
+
+AHORA = 1_700_000_000.0
+DIA = 86400
+
+def _stat(tamaño=0, antiguedad_dias=10):
+    # os.stat_result admite construirse a partir de una tupla de 10 campos
+    mtime = AHORA - antiguedad_dias * DIA
+    return os.stat_result((0o100644, 0, 0, 1, 0, 0, tamaño, mtime, mtime, mtime))
+
+class TestCleanupRules(unittest.TestCase):
+
+    def test_reglas_vacias_no_filtran(self):
+        self.assertIsNone(cleanup_rules.compilar_reglas({}))
+        self.assertIsNone(cleanup_rules.compilar_reglas({'min_age_days': 0, 'include': [], 'max_size_mb': None}))
+
+    def test_antiguedad_y_tamaño(self):
+        predicado = cleanup_rules.compilar_reglas({'min_age_days': 3, 'min_size_mb': 100}, ahora=AHORA)
+        grande = 200 * 1024 * 1024
+        self.assertTrue(predicado('/t/a.bin', 'a.bin', _stat(grande, antiguedad_dias=5)))
+        self.assertFalse(predicado('/t/a.bin', 'a.bin', _stat(grande, antiguedad_dias=1)))
+        self.assertFalse(predicado('/t/a.bin', 'a.bin', _stat(1024, antiguedad_dias=5)))
+
+    def test_globs_de_nombre_y_de_ruta(self):
+        predicado = cleanup_rules.compilar_reglas({
+            'include': ['*.tmp', '*.log', 'cache/*'],
+            'exclude': ['keep_*', 'cache/important/*'],
+        }, ahora=AHORA)
+        self.assertTrue(predicado('/t/x/a.tmp', 'a.tmp', _stat()))
+        self.assertTrue(predicado('/t/cache/data.bin', 'data.bin', _stat()))
+        self.assertFalse(predicado('/t/x/a.dat', 'a.dat', _stat()))
+        self.assertFalse(predicado('/t/x/keep_me.tmp', 'keep_me.tmp', _stat()))
+        self.assertFalse(predicado('/t/cache/important/a.tmp', 'a.tmp', _stat()))
+        # Los patrones con separador se alinean a componentes completos de la ruta
+        self.assertFalse(predicado('/t/mycache/data.bin', 'data.bin', _stat()))
+
+    def test_extensiones(self):
+        predicado = cleanup_rules.compilar_reglas({'extensions': ['tmp', '.LOG'], 'exclude_extensions': ['.log']}, ahora=AHORA)
+        self.assertTrue(predicado('/t/a.TMP', 'a.TMP', _stat()))
+        self.assertFalse(predicado('/t/a.log', 'a.log', _stat()))
+        self.assertFalse(predicado('/t/a.txt', 'a.txt', _stat()))
+
+    @patch('src.cleanup_rules.config_manager.load_config', return_value=[])
+    def test_cargar_reglas_archivo_inexistente(self, mock_load_config):
+        self.assertEqual(cleanup_rules.cargar_reglas(), {})
+        mock_load_config.assert_called_once_with('cleanup_rules.json')
+
+if __name__ == '__main__':
+    unittest.main()
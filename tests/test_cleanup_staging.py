@@ -0,0 +1,104 @@
+# tests/test_cleanup_staging.py
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from src import cleanup_staging
+
+class TestCleanupStaging(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.raiz = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _crear_archivo(self, relativa, tamaño):
+        ruta = os.path.join(self.raiz, relativa)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        with open(ruta, 'wb') as f:
+            f.write(b'x' * tamaño)
+        return ruta
+
+    def test_preparar_y_purgar(self):
+        self._crear_archivo('suelto.tmp', 10)
+        self._crear_archivo(os.path.join('dir', 'sub', 'a.tmp'), 20)
+        self._crear_archivo(os.path.join('dir', 'b.tmp'), 30)
+
+        lote, movidas = cleanup_staging.preparar(self.raiz)
+
+        self.assertEqual(movidas, 2)
+        self.assertEqual(os.listdir(self.raiz), [cleanup_staging.DIRECTORIO_PURGA])
+        self.assertEqual(cleanup_staging.lotes_pendientes(self.raiz), [lote])
+
+        purga = cleanup_staging.PurgaSegundoPlano()
+        purga.agregar(lote)
+        self.assertTrue(purga.esperar(timeout=10))
+
+        self.assertEqual((purga.bytes_preparados, purga.bytes_purgados, purga.archivos_purgados), (60, 60, 3))
+        self.assertEqual(os.listdir(self.raiz), []) # El área de purga se elimina al quedar vacía
+        self.assertFalse(purga.activa())
+
+    def test_contadores_por_ejecucion(self):
+        """Prueba que el lote se mide antes de purgarlo y que los totales se reinician en cada ejecución."""
+        self._crear_archivo(os.path.join('dir', 'a.tmp'), 20)
+        self._crear_archivo(os.path.join('dir', 'sub', 'b.tmp'), 30)
+        purga = cleanup_staging.PurgaSegundoPlano()
+        eliminar_original = cleanup_staging.subtree_delete.eliminar_subarbol
+        preparados_al_empezar = []
+
+        def eliminar_y_anotar(*args, **kwargs):
+            preparados_al_empezar.append((purga.bytes_preparados, purga.bytes_purgados))
+            return eliminar_original(*args, **kwargs)
+
+        with patch('src.cleanup_staging.subtree_delete.eliminar_subarbol', side_effect=eliminar_y_anotar):
+            lote, _ = cleanup_staging.preparar(self.raiz)
+            purga.agregar(lote)
+            self.assertTrue(purga.esperar(timeout=10))
+
+            purga.reiniciar_contadores()
+            self._crear_archivo('c.tmp', 5)
+            lote, _ = cleanup_staging.preparar(self.raiz)
+            purga.agregar(lote)
+            self.assertTrue(purga.esperar(timeout=10))
+
+        # El lote completo consta como preparado antes de eliminar nada
+        self.assertEqual(preparados_al_empezar, [(50, 0), (5, 0)])
+        self.assertEqual((purga.bytes_preparados, purga.bytes_purgados, purga.archivos_purgados), (5, 5, 1))
+
+    def test_entradas_que_no_se_pueden_mover(self):
+        self._crear_archivo(os.path.join('abierto', 'a.tmp'), 10)
+        self._crear_archivo('b.tmp', 10)
+        rename_original = os.rename
+
+        def rename_bloqueado(origen, destino):
+            if os.path.basename(origen) == 'abierto':
+                raise PermissionError("En uso")
+            rename_original(origen, destino)
+
+        with patch('os.rename', side_effect=rename_bloqueado):
+            lote, movidas = cleanup_staging.preparar(self.raiz)
+
+        self.assertEqual(movidas, 1)
+        self.assertEqual(sorted(os.listdir(self.raiz)), [cleanup_staging.DIRECTORIO_PURGA, 'abierto'])
+        self.assertEqual(os.listdir(lote), ['b.tmp'])
+
+    def test_reanudar_lotes_pendientes(self):
+        """Prueba que se retoman los lotes que dejó una purga interrumpida, una sola vez."""
+        lote = os.path.join(cleanup_staging.area_purga(self.raiz), 'interrumpido')
+        self._crear_archivo(os.path.join(lote, 'dir', 'a.tmp'), 10)
+        purga = cleanup_staging.PurgaSegundoPlano()
+
+        with patch.object(purga, 'agregar', wraps=purga.agregar) as mock_agregar:
+            self.assertEqual(purga.reanudar([self.raiz, os.path.join(self.raiz, 'no_existe')]), 1)
+            purga.esperar(timeout=10)
+
+        mock_agregar.assert_called_once_with(lote, None)
+        self.assertEqual(purga.archivos_purgados, 1)
+        self.assertEqual(os.listdir(self.raiz), [])
+        self.assertEqual(purga.reanudar([self.raiz]), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+# tests/test_cleanup_targets.py
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from src import cleanup_targets
+
+class TestCleanupTargets(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.base = self._tmp.name
+        cleanup_targets.recargar()
+
+    def tearDown(self):
+        cleanup_targets.recargar()
+        self._tmp.cleanup()
+
+    def _configuracion(self):
+        for perfil in ('Default', 'Profile 1'):
+            os.makedirs(os.path.join(self.base, 'navegador', perfil, 'Cache'))
+        return {
+            'levels': {
+                'basico': {'label': 'Básica', 'targets': ['temporales']},
+                'extendido': {'label': 'Extendida', 'extends': 'basico', 'targets': ['temporales', 'registros', 'inexistente']},
+                'caches': {'label': 'Cachés', 'targets': ['navegador']},
+            },
+            'targets': {
+                'temporales': {'paths': ['${OPTITECH_PRUEBA}/temp']},
+                'registros': {'paths': ['${OPTITECH_PRUEBA}/logs']},
+                'navegador': {'paths': ['${OPTITECH_PRUEBA}/navegador/*/Cache'], 'rules': {'min_age_days': 7}},
+            },
+        }
+
+    def test_resolver_nivel(self):
+        with patch('src.cleanup_targets.config_manager.load_config', return_value=self._configuracion()) as mock_load_config, \
+             patch.dict(os.environ, {'OPTITECH_PRUEBA': self.base}):
+            extendido = cleanup_targets.resolver_nivel('extendido')
+            caches = cleanup_targets.resolver_nivel('caches')
+            cleanup_targets.resolver_nivel('extendido')
+            niveles = cleanup_targets.niveles()
+
+        # Herencia sin duplicados, variables expandidas y globs resueltos con las reglas del objetivo
+        self.assertEqual([raiz.ruta for raiz in extendido], [f"{self.base}/temp", f"{self.base}/logs"])
+        self.assertEqual(caches, (cleanup_targets.RaizLimpieza(os.path.join(self.base, 'navegador', 'Default', 'Cache'), {'min_age_days': 7}),
+                                  cleanup_targets.RaizLimpieza(os.path.join(self.base, 'navegador', 'Profile 1', 'Cache'), {'min_age_days': 7})))
+        self.assertEqual([(nivel.nombre, nivel.etiqueta) for nivel in niveles], [('basico', 'Básica'), ('extendido', 'Extendida'), ('caches', 'Cachés')])
+        mock_load_config.assert_called_once() # La configuración se lee una sola vez
+
+    def test_configuracion_por_defecto(self):
+        with patch('src.cleanup_targets.config_manager.load_config', return_value=[]):
+            self.assertEqual([nivel.nombre for nivel in cleanup_targets.niveles()], ['basico', 'extendido', 'avanzado'])
+            self.assertEqual(len(cleanup_targets.resolver_nivel('extendido')), 5)
+            self.assertEqual(cleanup_targets.resolver_nivel('avanzado'), cleanup_targets.resolver_nivel('extendido'))
+            self.assertEqual(cleanup_targets.resolver_nivel('desconocido'), ())
+
+    def test_configuracion_incluida(self):
+        niveles = cleanup_targets.niveles()
+        _, objetivos = cleanup_targets.cargar_configuracion()
+        for nivel in niveles:
+            for objetivo in nivel.objetivos:
+                self.assertIn(objetivo, objetivos)
+            self.assertTrue(nivel.hereda is None or nivel.hereda in [n.nombre for n in niveles])
+        # El nivel avanzado de siempre sigue existiendo, fuera del menú
+        avanzado = {nivel.nombre: nivel for nivel in niveles}['avanzado']
+        self.assertFalse(avanzado.menu)
+        self.assertEqual(avanzado.hereda, 'extendido')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+# tests/test_collector_registry.py
+
+import unittest
+from src import collector_registry, parallel_collectors
+from src.collector_registry import RegistroRecolectores, BARATO, COSTOSO, BLOQUEANTE, RAPIDO, COMPLETO
+
+class RelojFalso:
+    """Reloj controlado por la prueba."""
+
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+class TestCollectorRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.reloj = RelojFalso()
+        self.registro = RegistroRecolectores(reloj=self.reloj)
+        self.llamadas = []
+
+    def _funcion(self, nombre, valor):
+        def recolector(**dependencias):
+            self.llamadas.append(nombre)
+            return valor
+        return recolector
+
+    def test_planificar_por_coste_y_perfil(self):
+        self.registro.registrar('servicios', self._funcion('servicios', 1), coste=BLOQUEANTE)
+        self.registro.registrar('discos', self._funcion('discos', 2), coste=COSTOSO, dependencias=('particiones',))
+        self.registro.registrar('cpu', self._funcion('cpu', 3))
+        self.registro.registrar('particiones', self._funcion('particiones', 4), coste=COSTOSO)
+        # Barato, pero depende de un recolector que el perfil rápido no ejecuta
+        self.registro.registrar('resumen_discos', self._funcion('resumen_discos', 5), dependencias=('discos',))
+
+        completo = self.registro.planificar(COMPLETO)
+        rapido = self.registro.planificar(RAPIDO)
+
+        self.assertEqual([d.nombre for d in completo], ['cpu', 'resumen_discos', 'discos', 'particiones', 'servicios'])
+        self.assertEqual([d.plazo for d in completo], [5.0, 5.0, 10.0, 10.0, 30.0])
+        self.assertEqual([d.nombre for d in rapido], ['cpu'])
+        with self.assertRaises(ValueError):
+            self.registro.planificar('exhaustivo')
+        with self.assertRaises(ValueError):
+            self.registro.registrar('gpu', self._funcion('gpu', 0), coste='gratis')
+
+    def test_decorador_y_dependencias(self):
+        @self.registro.recolector('particiones', coste=COSTOSO)
+        def particiones():
+            return ['C:\\', 'D:\\']
+
+        @self.registro.recolector('discos', coste=COSTOSO, dependencias=('particiones',))
+        def discos(particiones):
+            return len(particiones)
+
+        resultados = self.registro.ejecutar()
+
+        self.assertEqual(resultados['discos'].valor, 2)
+        self.assertEqual(particiones(), ['C:\\', 'D:\\']) # El decorador devuelve la función
+
+    def test_cache_con_ttl(self):
+        self.registro.registrar('sistema_operativo', self._funcion('sistema_operativo', 'Windows'), ttl=60)
+        self.registro.registrar('cpu', self._funcion('cpu', 25.0))
+        terminados = []
+
+        self.registro.ejecutar(RAPIDO)
+        self.reloj.ahora = 30
+        resultados = self.registro.ejecutar(RAPIDO, al_terminar=lambda nombre, resultado: terminados.append(resultado.estado))
+
+        self.assertEqual(self.llamadas, ['sistema_operativo', 'cpu', 'cpu'])
+        self.assertEqual(resultados['sistema_operativo'].estado, collector_registry.EN_CACHE)
+        self.assertEqual(resultados['sistema_operativo'].valor, 'Windows')
+        self.assertEqual(resultados['cpu'].estado, parallel_collectors.OK)
+        self.assertEqual(sorted(terminados), sorted([collector_registry.EN_CACHE, parallel_collectors.OK]))
+
+        # Caducado
+        self.reloj.ahora = 61
+        self.registro.ejecutar(RAPIDO)
+        self.assertEqual(self.llamadas.count('sistema_operativo'), 2)
+
+        self.registro.vaciar_cache()
+        self.registro.ejecutar(RAPIDO)
+        self.assertEqual(self.llamadas.count('sistema_operativo'), 3)
+
+if __name__ == '__main__':
+    unittest.main()
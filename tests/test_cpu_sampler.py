@@ -0,0 +1,166 @@
+# tests/test_cpu_sampler.py
+
+import time
+import unittest
+from collections import namedtuple
+from unittest.mock import patch
+from src import cpu_sampler
+
+# Campos de psutil.cpu_times en Windows
+TiemposCPU = namedtuple('TiemposCPU', ['user', 'system', 'idle', 'interrupt', 'dpc'])
+# Campos en Linux, donde guest y guest_nice ya están incluidos en user y nice
+TiemposLinux = namedtuple('TiemposLinux', ['user', 'nice', 'system', 'idle', 'iowait', 'irq', 'softirq',
+                                           'steal', 'guest', 'guest_nice'])
+
+class RelojFalso:
+    """Reloj controlado por la prueba; dormir avanza el tiempo sin esperar."""
+
+    def __init__(self):
+        self.ahora = 0.0
+        self.esperas = []
+
+    def __call__(self):
+        return self.ahora
+
+    def dormir(self, segundos):
+        self.esperas.append(segundos)
+        self.ahora += segundos
+
+class TestCpuSampler(unittest.TestCase):
+
+    def setUp(self):
+        self.reloj = RelojFalso()
+        # El hilo de renovación no llega a actuar durante la prueba: se simula con renovar()
+        self.muestreador = cpu_sampler.MuestreadorCPU(reloj=self.reloj, dormir=self.reloj.dormir, intervalo=3600)
+
+    def tearDown(self):
+        self.muestreador.detener()
+
+    def _instantaneas(self, *instantaneas):
+        return patch('psutil.cpu_times', side_effect=list(instantaneas))
+
+    def test_calentado_no_espera(self):
+        antes = [TiemposCPU(10, 5, 85, 0, 0), TiemposCPU(0, 0, 100, 0, 0)]
+        despues = [TiemposCPU(40, 10, 150, 0, 0), TiemposCPU(10, 0, 190, 0, 0)]
+
+        with self._instantaneas(antes, despues) as mock_cpu_times:
+            self.muestreador.calentar()
+            self.reloj.ahora = 2.0
+            uso = self.muestreador.medir()
+
+        self.assertEqual(self.reloj.esperas, [])
+        mock_cpu_times.assert_called_with(percpu=True)
+        # Núcleo 0: 35 de 100 ocupado; núcleo 1: 10 de 100; total 45 de 200
+        self.assertEqual(uso, cpu_sampler.UsoCPU(22.5, [35.0, 10.0], 2.0))
+
+    def test_espera_la_ventana_minima(self):
+        antes = [TiemposCPU(0, 0, 0, 0, 0)]
+        despues = [TiemposCPU(1, 0, 3, 0, 0)]
+
+        with self._instantaneas(antes, despues):
+            self.muestreador.calentar()
+            self.reloj.ahora = 0.04
+            uso = self.muestreador.medir()
+
+        self.assertEqual(len(self.reloj.esperas), 1)
+        self.assertAlmostEqual(self.reloj.esperas[0], cpu_sampler.VENTANA_MINIMA_SEGUNDOS - 0.04)
+        self.assertEqual(uso.total, 25.0)
+
+    def test_sin_calentar_y_medidas_encadenadas(self):
+        instantaneas = [[TiemposCPU(0, 0, 0, 0, 0)], [TiemposCPU(50, 0, 50, 0, 0)], [TiemposCPU(50, 0, 150, 0, 0)]]
+
+        with self._instantaneas(*instantaneas):
+            primera = self.muestreador.medir()
+            self.reloj.ahora += 3
+            segunda = self.muestreador.medir()
+
+        self.assertEqual(self.reloj.esperas, [cpu_sampler.VENTANA_SIN_CALENTAR_SEGUNDOS])
+        self.assertEqual(primera.total, 50.0)
+        # La segunda medida parte de la instantánea de la primera
+        self.assertEqual(segunda.total, 0.0)
+        self.assertEqual(segunda.segundos, 3)
+
+    def test_renovacion_no_espera(self):
+        """Prueba que, con la referencia renovada en segundo plano, una medida mucho después del arranque no espera."""
+        arranque = [TiemposCPU(0, 0, 0, 0, 0)]
+        renovada = [TiemposCPU(500, 0, 500, 0, 0)]
+        actual = [TiemposCPU(500, 0, 600, 0, 0)]
+
+        with self._instantaneas(arranque, renovada, actual):
+            self.muestreador.calentar()
+            self.reloj.ahora = 300
+            self.muestreador.renovar() # Lo que hace el hilo cada INTERVALO_RENOVACION_SEGUNDOS
+            self.reloj.ahora = 300.5
+            uso = self.muestreador.medir()
+
+        self.assertEqual(self.reloj.esperas, [])
+        # Con la instantánea del arranque el uso sería del 50 %; desde la renovada es 0
+        self.assertEqual(uso.total, 0.0)
+        self.assertEqual(uso.segundos, 0.5)
+
+    def test_referencia_mas_reciente_con_ventana_minima(self):
+        instantaneas = [[TiemposCPU(0, 0, 0, 0, 0)], [TiemposCPU(50, 0, 50, 0, 0)], [TiemposCPU(50, 0, 60, 0, 0)],
+                        [TiemposCPU(60, 0, 140, 0, 0)]]
+
+        with self._instantaneas(*instantaneas):
+            self.muestreador.calentar()
+            self.reloj.ahora = 1.0
+            self.muestreador.renovar()
+            self.reloj.ahora = 2.0
+            self.muestreador.renovar()
+            self.reloj.ahora = 2.05
+            uso = self.muestreador.medir()
+
+        # La instantánea de hace 0,05 s es demasiado reciente: se mide desde la de hace 1,05 s
+        self.assertEqual(self.reloj.esperas, [])
+        self.assertEqual(uso.total, 10.0)
+        self.assertAlmostEqual(uso.segundos, 1.05)
+
+    def test_hilo_de_renovacion(self):
+        muestreador = cpu_sampler.MuestreadorCPU(intervalo=0.01)
+        with patch('psutil.cpu_times', return_value=[TiemposCPU(0, 0, 0, 0, 0)]) as mock_cpu_times:
+            muestreador.calentar()
+            limite = time.monotonic() + 5
+            while mock_cpu_times.call_count < 3 and time.monotonic() < limite:
+                time.sleep(0.01)
+            muestreador.detener()
+
+        self.assertGreaterEqual(mock_cpu_times.call_count, 3)
+
+    def test_referencia_antigua(self):
+        """Prueba que, sin el hilo de renovación, una instantánea de hace minutos se renueva en lugar de dar la media desde entonces."""
+        arranque = [TiemposCPU(0, 0, 0, 0, 0)]
+        renovada = [TiemposCPU(500, 0, 500, 0, 0)]
+        actual = [TiemposCPU(500, 0, 600, 0, 0)]
+
+        with self._instantaneas(arranque, renovada, actual):
+            self.muestreador.calentar()
+            self.reloj.ahora = 300
+            uso = self.muestreador.medir()
+
+        # Con la instantánea del arranque el uso sería del 50 %; la carga del último segundo es 0
+        self.assertEqual(self.reloj.esperas, [cpu_sampler.VENTANA_SIN_CALENTAR_SEGUNDOS])
+        self.assertEqual(uso.total, 0.0)
+        self.assertEqual(uso.segundos, cpu_sampler.VENTANA_SIN_CALENTAR_SEGUNDOS)
+
+    def test_tiempos_de_linux(self):
+        antes = [TiemposLinux(0, 0, 0, 0, 0, 0, 0, 0, 0, 0)]
+        # 20 de user (de los que 10 son guest), 60 idle y 20 iowait: solo user cuenta como ocupado
+        despues = [TiemposLinux(20, 0, 0, 60, 20, 0, 0, 0, 10, 0)]
+
+        with self._instantaneas(antes, despues):
+            self.muestreador.calentar()
+            self.reloj.ahora = 1.0
+            uso = self.muestreador.medir()
+
+        self.assertEqual(uso.por_nucleo, [20.0])
+
+    def test_sin_variacion(self):
+        tiempos = [TiemposCPU(1, 1, 1, 0, 0)]
+        with self._instantaneas(tiempos, tiempos):
+            self.muestreador.calentar()
+            self.reloj.ahora = 1.0
+            self.assertEqual(self.muestreador.medir().total, 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+# tests/test_duplicate_finder.py
+
+import unittest
+import os
+import tempfile
+from unittest.mock import patch
+from src import duplicate_finder
+from src.system_cleaner import CandidatoLimpieza
+
+class TestDuplicateFinder(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _candidato(self, nombre, contenido):
+        ruta = os.path.join(self._tmp.name, nombre)
+        with open(ruta, 'wb') as f:
+            f.write(contenido)
+        return CandidatoLimpieza(ruta, len(contenido), 0, self._tmp.name, len(contenido))
+
+    def test_tamaño_unico_no_se_lee(self):
+        candidatos = [self._candidato('a', b'x' * 10), self._candidato('b', b'x' * 20)]
+        with patch('builtins.open') as mock_open:
+            grupos = duplicate_finder.buscar_duplicados(candidatos)
+        self.assertEqual(grupos, [])
+        mock_open.assert_not_called()
+
+    def test_hash_completo_solo_si_coincide_el_parcial(self):
+        bloque = 16
+        comun = b'a' * bloque
+        candidatos = [
+            self._candidato('a', comun + b'1' * 10 + comun),
+            self._candidato('b', comun + b'1' * 10 + comun),
+            self._candidato('c', comun + b'2' * 10 + comun), # Mismos extremos, distinto centro
+            self._candidato('d', b'b' * bloque + b'1' * 10 + comun), # Distinto principio
+        ]
+        with patch('src.duplicate_finder._hash_completo', wraps=duplicate_finder._hash_completo) as mock_completo:
+            grupos = duplicate_finder.buscar_duplicados(candidatos, workers=2, bloque=bloque)
+
+        self.assertEqual(len(grupos), 1)
+        self.assertEqual(grupos[0].rutas, sorted([candidatos[0].ruta, candidatos[1].ruta]))
+        self.assertEqual(grupos[0].recuperable, len(comun) * 2 + 10)
+        self.assertEqual(mock_completo.call_count, 3) # 'd' se descarta con el hash parcial
+
+    def test_archivos_pequeños_no_repiten_lectura(self):
+        candidatos = [self._candidato(nombre, b'igual') for nombre in ('a', 'b', 'c')]
+        with patch('src.duplicate_finder._hash_completo') as mock_completo:
+            grupos = duplicate_finder.buscar_duplicados(candidatos, bloque=16)
+        mock_completo.assert_not_called()
+        self.assertEqual([(g.tamaño, len(g.rutas), g.recuperable) for g in grupos], [(5, 3, 10)])
+
+    def test_ruta_repetida_no_es_duplicado(self):
+        candidato = self._candidato('a', b'contenido')
+        self.assertEqual(duplicate_finder.buscar_duplicados([candidato, candidato]), [])
+
+    def test_enlaces_duros_no_son_duplicados(self):
+        original = self._candidato('a', b'contenido')
+        enlace = os.path.join(self._tmp.name, 'enlace')
+        try:
+            os.link(original.ruta, enlace)
+        except (OSError, AttributeError) as e:
+            self.skipTest(f"El sistema de archivos no admite enlaces duros: {e}")
+        copia = self._candidato('copia', b'contenido')
+
+        solo_enlaces = duplicate_finder.buscar_duplicados([original, original._replace(ruta=enlace)])
+        con_copia = duplicate_finder.buscar_duplicados([original, original._replace(ruta=enlace), copia])
+
+        self.assertEqual(solo_enlaces, [])
+        # El enlace y el original son un solo archivo: solo la copia libera espacio
+        self.assertEqual(len(con_copia), 1)
+        self.assertEqual(len(con_copia[0].rutas), 2)
+        self.assertIn(copia.ruta, con_copia[0].rutas)
+        self.assertEqual(con_copia[0].recuperable, len(b'contenido'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+# tests/test_io_throttle.py
+
+import unittest
+from unittest.mock import patch
+from src import io_throttle
+
+class RelojFalso:
+    """Reloj controlado por la prueba; dormir avanza el tiempo sin esperar."""
+
+    def __init__(self):
+        self.ahora = 0.0
+        self.esperas = []
+
+    def __call__(self):
+        return self.ahora
+
+    def dormir(self, segundos):
+        self.esperas.append(segundos)
+        self.ahora += segundos
+
+class TestIoThrottle(unittest.TestCase):
+
+    def _limitador(self, **kwargs):
+        self.reloj = RelojFalso()
+        return io_throttle.LimitadorES(reloj=self.reloj, dormir=self.reloj.dormir, **kwargs)
+
+    def test_limita_operaciones_por_segundo(self):
+        limitador = self._limitador(max_ops_por_segundo=100)
+        for _ in range(110):
+            limitador.adquirir()
+        # Ráfaga inicial de 10 operaciones y después una cada 10 ms
+        self.assertAlmostEqual(self.reloj.ahora, 1.0, places=6)
+        self.assertAlmostEqual(limitador.segundos_esperando, 1.0, places=6)
+        self.assertEqual(limitador.esperas, 100)
+
+    def test_limita_bytes_por_segundo(self):
+        limitador = self._limitador(max_bytes_por_segundo=1000)
+        limitador.adquirir(100) # Cabe en la ráfaga
+        limitador.adquirir(500)
+        self.assertAlmostEqual(self.reloj.ahora, 0.5, places=6)
+
+    def test_reduce_y_recupera_el_ritmo_segun_la_latencia(self):
+        limitador = self._limitador(max_ops_por_segundo=100, latencia_umbral_ms=10)
+        limitador.registrar_latencia(0.050)
+        self.assertEqual(limitador.factor, 0.5)
+        limitador.registrar_latencia(0.050)
+        self.assertEqual(limitador.factor, 0.25)
+        for _ in range(100):
+            limitador.registrar_latencia(0.001)
+        self.assertEqual(limitador.factor, 1.0)
+
+    def test_sin_limites_no_se_crea_limitador(self):
+        with patch('src.io_throttle.config_manager.load_config', return_value={'max_ops_per_second': None}):
+            self.assertIsNone(io_throttle.crear_limitador())
+            self.assertIsNone(io_throttle.crear_limitador({'latency_threshold_ms': 50}))
+
+    def test_las_opciones_sustituyen_a_la_configuracion(self):
+        configuracion = {'max_ops_per_second': 10, 'max_mb_per_second': 5, 'latency_threshold_ms': 20}
+        with patch('src.io_throttle.config_manager.load_config', return_value=configuracion):
+            limitador = io_throttle.crear_limitador({'max_ops_per_second': 200, 'max_mb_per_second': None})
+        self.assertEqual(limitador.max_ops, 200)
+        self.assertEqual(limitador.max_bytes, 5 * 1024 * 1024)
+        self.assertEqual(limitador.latencia_umbral, 0.020)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+# tests/test_open_files.py
+
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+from src import open_files
+
+class TestOpenFiles(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.raiz = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _proceso(self, *rutas, sin_acceso=False):
+        # process_iter(ad_value=None) deja None en los atributos a los que no se tiene acceso
+        archivos = None if sin_acceso else [SimpleNamespace(path=ruta) for ruta in rutas]
+        return SimpleNamespace(info={'open_files': archivos})
+
+    def test_consultar(self):
+        dentro = os.path.join(self.raiz, 'dir', 'sub', 'abierto.tmp')
+        procesos = [
+            self._proceso(dentro, os.path.join(os.sep, 'fuera', 'de', 'la_raiz.log')),
+            self._proceso(sin_acceso=True),
+            self._proceso(),
+        ]
+
+        with patch('psutil.process_iter', return_value=procesos):
+            abiertos = open_files.consultar([self.raiz])
+
+        self.assertEqual(abiertos.rutas, frozenset([open_files.normalizar(dentro)]))
+        # Los directorios que lo contienen, sin la raíz
+        self.assertEqual(abiertos.directorios, frozenset([open_files.normalizar(os.path.join(self.raiz, 'dir')),
+                                                          open_files.normalizar(os.path.join(self.raiz, 'dir', 'sub'))]))
+
+    def test_ruta_real_de_la_raiz(self):
+        """Prueba que las rutas reales se reescriben sobre la raíz tal como se recorre (enlaces, nombres cortos)."""
+        real = os.path.join(self.raiz, 'real')
+        os.makedirs(real)
+        alias = os.path.join(self.raiz, 'alias')
+        try:
+            os.symlink(real, alias)
+        except (OSError, NotImplementedError):
+            self.skipTest("No se pueden crear enlaces simbólicos")
+
+        with patch('psutil.process_iter', return_value=[self._proceso(os.path.join(real, 'a.tmp'))]):
+            abiertos = open_files.consultar([alias])
+
+        self.assertEqual(abiertos.rutas, frozenset([open_files.normalizar(os.path.join(alias, 'a.tmp'))]))
+
+    def test_archivo_abierto_por_este_proceso(self):
+        ruta = os.path.join(self.raiz, 'abierto.tmp')
+        with open(ruta, 'wb') as archivo:
+            abiertos = open_files.consultar([self.raiz])
+            archivo.write(b'x')
+
+        if abiertos is None:
+            self.skipTest("La plataforma no permite consultar los archivos abiertos")
+        self.assertIn(open_files.normalizar(ruta), abiertos.rutas)
+
+    def test_plataforma_sin_consulta(self):
+        with patch('src.open_files.disponible', return_value=False):
+            self.assertIsNone(open_files.consultar([self.raiz]))
+        with patch('psutil.process_iter', side_effect=NotImplementedError):
+            self.assertIsNone(open_files.consultar([self.raiz]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+# tests/test_parallel_collectors.py
+
+import time
+import threading
+import unittest
+from src import parallel_collectors
+from src.parallel_collectors import Recolector
+
+class TestParallelCollectors(unittest.TestCase):
+
+    def setUp(self):
+        self.liberar = threading.Event()
+        self.addCleanup(self.liberar.set)
+
+    def _lento(self, segundos, valor):
+        def recolector():
+            time.sleep(segundos)
+            return valor
+        return recolector
+
+    def test_en_paralelo(self):
+        recolectores = [Recolector(f"r{i}", self._lento(0.2, i), 5) for i in range(4)]
+
+        inicio = time.monotonic()
+        resultados = parallel_collectors.ejecutar(recolectores)
+
+        # Cerca del más lento, no de la suma
+        self.assertLess(time.monotonic() - inicio, 0.6)
+        self.assertEqual(list(resultados), ['r0', 'r1', 'r2', 'r3'])
+        self.assertEqual([r.valor for r in resultados.values()], [0, 1, 2, 3])
+        self.assertTrue(all(r.estado == parallel_collectors.OK and r.segundos >= 0.2 for r in resultados.values()))
+
+    def test_plazo_agotado_y_error(self):
+        def falla():
+            raise RuntimeError("Sin acceso")
+        terminados = []
+        recolectores = [
+            Recolector('colgado', lambda: self.liberar.wait(10), 0.1),
+            Recolector('rapido', lambda: 'datos', 5),
+            Recolector('falla', falla, 5),
+        ]
+
+        inicio = time.monotonic()
+        with self.assertLogs('OptiTechOptimizer', level='WARNING'):
+            resultados = parallel_collectors.ejecutar(recolectores, al_terminar=lambda nombre, resultado: terminados.append(nombre))
+
+        self.assertLess(time.monotonic() - inicio, 1)
+        self.assertEqual(resultados['colgado'], parallel_collectors.ResultadoRecolector(parallel_collectors.TIEMPO_AGOTADO, None, 0.1))
+        self.assertEqual(resultados['rapido'].valor, 'datos')
+        self.assertEqual(resultados['falla'].estado, parallel_collectors.ERROR)
+        self.assertEqual(sorted(terminados), ['colgado', 'falla', 'rapido'])
+
+    def test_dependencias(self):
+        orden = []
+        def particiones():
+            time.sleep(0.1)
+            orden.append('particiones')
+            return ['C:\\']
+        def discos(particiones):
+            orden.append('discos')
+            return len(particiones)
+        recolectores = [
+            Recolector('discos', discos, 5, ('particiones',)),
+            Recolector('particiones', particiones, 5),
+            Recolector('colgado', lambda: self.liberar.wait(10), 0.1),
+            Recolector('sin_datos', lambda colgado: 'nunca', 5, ('colgado',)),
+        ]
+
+        resultados = parallel_collectors.ejecutar(recolectores)
+
+        self.assertEqual(orden, ['particiones', 'discos'])
+        self.assertEqual(resultados['discos'].valor, 1)
+        # Una dependencia agotada impide ejecutar a las que dependen de ella
+        self.assertEqual(resultados['sin_datos'].estado, parallel_collectors.ERROR)
+
+    def test_dependencias_invalidas(self):
+        with self.assertRaises(ValueError):
+            parallel_collectors.ejecutar([Recolector('discos', lambda particiones: None, 5, ('particiones',))])
+        with self.assertRaises(ValueError):
+            parallel_collectors.ejecutar([Recolector('a', lambda b: None, 5, ('b',)), Recolector('b', lambda a: None, 5, ('a',))])
+
+if __name__ == '__main__':
+    unittest.main()
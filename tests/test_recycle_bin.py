@@ -0,0 +1,60 @@
+# tests/test_recycle_bin.py
+
+import os
+import struct
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+from src import recycle_bin
+
+class TestRecycleBin(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.papelera = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _elemento(self, sufijo, tamaño_metadatos=None, contenido=b''):
+        """Crea $R<sufijo> (una carpeta con un archivo) y, si se indica, su $I con el tamaño."""
+        ruta_real = os.path.join(self.papelera, f'$R{sufijo}')
+        os.makedirs(ruta_real)
+        with open(os.path.join(ruta_real, 'archivo.bin'), 'wb') as f:
+            f.write(contenido)
+        if tamaño_metadatos is not None:
+            with open(os.path.join(self.papelera, f'$I{sufijo}'), 'wb') as f:
+                f.write(struct.pack('<qqq', 2, tamaño_metadatos, 0))
+        elemento = MagicMock()
+        elemento.original_filename.return_value = f'C:\\Usuarios\\prueba\\{sufijo}'
+        elemento.real_filename.return_value = ruta_real
+        return elemento
+
+    def test_interfaz_abstracta(self):
+        with self.assertRaises(TypeError):
+            recycle_bin.BackendPapelera()
+
+        class SinVaciar(recycle_bin.BackendPapelera):
+            def elementos(self):
+                return iter(())
+
+        with self.assertRaises(TypeError):
+            SinVaciar()
+
+    @patch('winshell.recycle_bin', create=True)
+    def test_tamaño_de_los_metadatos_sin_recorrer_carpetas(self, mock_recycle_bin):
+        con_metadatos = self._elemento('ABC123', tamaño_metadatos=5000, contenido=b'x' * 10)
+        sin_metadatos = self._elemento('DEF456', contenido=b'x' * 30)
+        mock_recycle_bin.return_value = [con_metadatos, sin_metadatos]
+        backend = recycle_bin.BackendWinshell()
+
+        with patch('src.recycle_bin._tamaño_ruta', wraps=recycle_bin._tamaño_ruta) as mock_tamaño_ruta:
+            elementos = list(backend.elementos())
+
+        self.assertEqual(elementos, [recycle_bin.ElementoPapelera('C:\\Usuarios\\prueba\\ABC123', 5000),
+                                     recycle_bin.ElementoPapelera('C:\\Usuarios\\prueba\\DEF456', 30)])
+        # Solo se mide el elemento sin $I
+        mock_tamaño_ruta.assert_called_once_with(sin_metadatos.real_filename.return_value)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+# tests/test_scan_index.py
+
+import unittest
+import os
+import sqlite3
+import tempfile
+from contextlib import closing
+from unittest.mock import patch
+from src import scan_index
+
+class TestScanIndex(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.raiz = os.path.join(self._tmp.name, 'temp')
+        for i in range(3):
+            os.makedirs(os.path.join(self.raiz, f'dir{i}'))
+            with open(os.path.join(self.raiz, f'dir{i}', 'archivo.tmp'), 'wb') as f:
+                f.write(b'x' * 100)
+        self._envejecer_directorios()
+        self.indice = scan_index.IndiceEscaneo(os.path.join(self._tmp.name, scan_index.INDEX_FILENAME))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _envejecer_directorios(self):
+        # Los mtime muy recientes no se consideran estables; se retrasan una hora.
+        for dirpath, _, _ in os.walk(self.raiz):
+            os.utime(dirpath, ns=(os.stat(dirpath).st_atime_ns, os.stat(dirpath).st_mtime_ns - 3600 * 10**9))
+
+    def test_primer_recorrido_lista_todo(self):
+        archivos, num_bytes, asignados, listados, reutilizados = self.indice.totalizar(self.raiz)
+        self.assertEqual((archivos, num_bytes), (3, 300))
+        self.assertGreaterEqual(asignados, 0)
+        self.assertEqual((listados, reutilizados), (4, 0))
+
+    def test_recorrido_sin_cambios_no_lista_directorios(self):
+        primero = self.indice.totalizar(self.raiz)
+        with patch('os.scandir', wraps=os.scandir) as mock_scandir:
+            archivos, num_bytes, asignados, listados, reutilizados = self.indice.totalizar(self.raiz)
+        self.assertEqual((archivos, num_bytes, asignados), primero[:3])
+        self.assertEqual((listados, reutilizados), (0, 4))
+        mock_scandir.assert_not_called()
+
+    def test_solo_se_relistan_directorios_modificados(self):
+        self.indice.totalizar(self.raiz)
+        with open(os.path.join(self.raiz, 'dir1', 'nuevo.tmp'), 'wb') as f:
+            f.write(b'x' * 50)
+        archivos, num_bytes, _, listados, reutilizados = self.indice.totalizar(self.raiz)
+        self.assertEqual((archivos, num_bytes), (4, 350))
+        self.assertEqual((listados, reutilizados), (1, 3))
+
+    def test_directorios_eliminados_se_purgan(self):
+        self.indice.totalizar(self.raiz)
+        os.remove(os.path.join(self.raiz, 'dir2', 'archivo.tmp'))
+        os.rmdir(os.path.join(self.raiz, 'dir2'))
+        archivos, num_bytes, _, _, _ = self.indice.totalizar(self.raiz)
+        self.assertEqual((archivos, num_bytes), (2, 200))
+
+    def test_area_de_purga_no_se_totaliza(self):
+        lote = os.path.join(self.raiz, scan_index.cleanup_staging.DIRECTORIO_PURGA, 'lote')
+        os.makedirs(lote)
+        with open(os.path.join(lote, 'movido.tmp'), 'wb') as f:
+            f.write(b'x' * 1000)
+        self._envejecer_directorios()
+
+        primero = self.indice.totalizar(self.raiz)
+        # Un índice anterior que sí la registró como subdirectorio tampoco la reutiliza
+        with closing(sqlite3.connect(self.indice.ruta_bd)) as conn, conn:
+            conn.execute("UPDATE directorios SET subdirectorios = subdirectorios || ? WHERE ruta = ?",
+                         ('\0' + scan_index.cleanup_staging.DIRECTORIO_PURGA, self.raiz))
+        segundo = self.indice.totalizar(self.raiz)
+
+        self.assertEqual(primero[:2], (3, 300))
+        self.assertEqual(primero[3:], (4, 0))
+        self.assertEqual(segundo[:2], (3, 300))
+        self.assertEqual(segundo[3:], (0, 4))
+
+    def test_indice_de_esquema_anterior_se_reconstruye(self):
+        ruta_bd = os.path.join(self._tmp.name, 'antiguo.sqlite3')
+        with closing(sqlite3.connect(ruta_bd)) as conn:
+            conn.execute("CREATE TABLE directorios (ruta TEXT PRIMARY KEY, raiz TEXT, mtime_ns INTEGER, archivos INTEGER, bytes INTEGER, subdirectorios TEXT)")
+        archivos, num_bytes, _, listados, reutilizados = scan_index.IndiceEscaneo(ruta_bd).totalizar(self.raiz)
+        self.assertEqual((archivos, num_bytes, listados, reutilizados), (3, 300, 4, 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+# tests/test_scan_strategy.py
+
+import os
+import tempfile
+import unittest
+from src import scan_strategy
+
+class TestScanStrategy(unittest.TestCase):
+
+    def _muestra(self, archivos=10000, fragmentos=8, segundos=0.01):
+        # 64 directorios listados y ninguno pendiente: el árbol completo tiene `archivos` archivos
+        return scan_strategy.MuestraArbol(64, archivos, 0, fragmentos, segundos)
+
+    def test_muestrear_arbol(self):
+        with tempfile.TemporaryDirectory() as base:
+            for i in range(3):
+                os.makedirs(os.path.join(base, f'dir{i}', 'sub'))
+                with open(os.path.join(base, f'dir{i}', 'f.tmp'), 'w') as f:
+                    f.write('x')
+            with open(os.path.join(base, 'suelto.tmp'), 'w') as f:
+                f.write('x')
+
+            completa = scan_strategy.muestrear_arbol([base])
+            parcial = scan_strategy.muestrear_arbol([base], max_directorios=2)
+
+        self.assertEqual(completa[:4], (7, 4, 0, 3))
+        self.assertEqual(parcial.directorios, 2)
+        self.assertEqual(parcial.pendientes, 3) # dir1, dir2 y la 'sub' de dir0 ya vista
+        self.assertEqual(scan_strategy.archivos_estimados(parcial), 2 + 1 * 3)
+
+    def test_elegir_modo(self):
+        elegir = scan_strategy.elegir_modo
+        self.assertEqual(elegir(self._muestra(), 1, True, cpus=8), 'secuencial')
+        self.assertEqual(elegir(self._muestra(archivos=100), 8, True, cpus=8), 'secuencial')
+        self.assertEqual(elegir(self._muestra(fragmentos=1), 8, True, cpus=8), 'secuencial')
+        self.assertEqual(elegir(self._muestra(), 8, True, cpus=8), 'hilos')
+        self.assertEqual(elegir(self._muestra(archivos=100000), 8, True, cpus=8), 'procesos')
+        self.assertEqual(elegir(self._muestra(archivos=100000), 8, True, cpus=1), 'hilos')
+        # La eliminación y la E/S lenta se quedan en hilos
+        self.assertEqual(elegir(self._muestra(archivos=100000), 8, False, cpus=8), 'hilos')
+        self.assertEqual(elegir(self._muestra(archivos=100000, segundos=1.0), 8, True, cpus=8), 'hilos')
+        # Eliminación con E/S lenta y pocos fragmentos para los workers: tubería asíncrona
+        self.assertEqual(elegir(self._muestra(segundos=1.0, fragmentos=3), 8, False, cpus=8), 'asincrono')
+        self.assertEqual(elegir(self._muestra(segundos=1.0, fragmentos=16), 8, False, cpus=8), 'hilos')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+# tests/test_size_breakdown.py
+
+import unittest
+import os
+from src import size_breakdown
+
+RAIZ = os.path.join(os.sep, 'temp')
+
+def _ruta(*partes):
+    return os.path.join(RAIZ, *partes)
+
+class TestSizeBreakdown(unittest.TestCase):
+
+    def test_acumula_en_los_padres_en_orden_de_profundidad(self):
+        desglose = size_breakdown.DesgloseDirectorios(top=10)
+        desglose.agregar(_ruta('suelto.tmp'), 5, RAIZ)
+        desglose.agregar(_ruta('a', 'x.tmp'), 10, RAIZ)
+        desglose.agregar(_ruta('a', 'b', 'c', 'y.tmp'), 20, RAIZ)
+        desglose.agregar(_ruta('a', 'd', 'z.tmp'), 30, RAIZ)
+        desglose.agregar(_ruta('e', 'w.tmp'), 1, RAIZ)
+        desglose.finalizar()
+
+        self.assertEqual(desglose.raices, {RAIZ: [66, 5]})
+        self.assertEqual(desglose.directorios_mayores(), [
+            size_breakdown.EntradaDesglose(_ruta('a'), 60, 3),
+            size_breakdown.EntradaDesglose(_ruta('a', 'd'), 30, 1),
+            size_breakdown.EntradaDesglose(_ruta('a', 'b'), 20, 1),
+            size_breakdown.EntradaDesglose(_ruta('a', 'b', 'c'), 20, 1),
+            size_breakdown.EntradaDesglose(_ruta('e'), 1, 1),
+        ])
+
+    def test_monticulo_acotado(self):
+        desglose = size_breakdown.DesgloseDirectorios(top=2)
+        for i in range(50):
+            desglose.agregar(_ruta(f'dir{i:02d}', 'f.tmp'), i, RAIZ)
+        desglose.finalizar()
+
+        self.assertEqual(len(desglose._monticulo), 2)
+        self.assertEqual([e.ruta for e in desglose.directorios_mayores()], [_ruta('dir49'), _ruta('dir48')])
+
+    def test_fusionar_desgloses_de_varias_unidades(self):
+        total = size_breakdown.DesgloseDirectorios(top=3)
+        for nombre, tamaño in (('a', 10), ('b', 20)):
+            unidad = size_breakdown.DesgloseDirectorios(top=3)
+            unidad.agregar(_ruta(nombre, 'f.tmp'), tamaño, RAIZ)
+            unidad.finalizar()
+            total.fusionar(unidad)
+
+        self.assertEqual(total.raices, {RAIZ: [30, 2]})
+        self.assertEqual([e.ruta for e in total.directorios_mayores()], [_ruta('b'), _ruta('a')])
+
+if __name__ == '__main__':
+    unittest.main()
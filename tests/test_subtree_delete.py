@@ -0,0 +1,107 @@
+# tests/test_subtree_delete.py
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+from src import subtree_delete
+
+class TestSubtreeDelete(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.base = self._tmp.name
+        self.arbol = os.path.join(self.base, 'arbol')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _crear_archivo(self, relativa, tamaño):
+        ruta = os.path.join(self.arbol, relativa)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        with open(ruta, 'wb') as f:
+            f.write(b'x' * tamaño)
+        return ruta
+
+    def _crear_arbol(self):
+        self._crear_archivo('a.tmp', 10)
+        self._crear_archivo(os.path.join('dir', 'b.tmp'), 20)
+        self._crear_archivo(os.path.join('dir', 'sub', 'c.tmp'), 30)
+        os.makedirs(os.path.join(self.arbol, 'vacio'))
+
+    def _probar_eliminacion_completa(self):
+        self._crear_arbol()
+        eliminados = []
+
+        resultado = subtree_delete.eliminar_subarbol(self.arbol, al_eliminar=lambda tamaño, asignado: eliminados.append(tamaño))
+
+        self.assertEqual((resultado.bytes, resultado.archivos, resultado.directorios), (60, 3, 4))
+        self.assertEqual(resultado.asignado, 3 * 4096)
+        self.assertTrue(resultado.completo)
+        self.assertEqual(sorted(eliminados), [10, 20, 30])
+        self.assertFalse(os.path.exists(self.arbol))
+
+    def test_eliminar_subarbol(self):
+        self._probar_eliminacion_completa()
+
+    def test_eliminar_subarbol_con_rutas(self):
+        """Prueba la variante para sistemas sin operaciones relativas a descriptores (Windows)."""
+        with patch('src.subtree_delete.ADMITE_DIR_FD', False):
+            self._probar_eliminacion_completa()
+
+    @unittest.skipUnless(subtree_delete.ADMITE_DIR_FD, "Requiere operaciones relativas a descriptores de directorio")
+    def test_archivo_en_uso(self):
+        """Prueba que un archivo que no se puede eliminar se devuelve y conserva su directorio."""
+        self._crear_arbol()
+        en_uso = os.path.join(self.arbol, 'dir', 'b.tmp')
+        unlink_original = os.unlink
+
+        def unlink_bloqueado(nombre, *args, **kwargs):
+            if nombre == 'b.tmp':
+                raise PermissionError("En uso")
+            return unlink_original(nombre, *args, **kwargs)
+
+        with patch('os.unlink', side_effect=unlink_bloqueado):
+            resultado = subtree_delete.eliminar_subarbol(self.arbol)
+
+        self.assertFalse(resultado.completo)
+        self.assertEqual((resultado.bytes, resultado.archivos, resultado.avisos), (40, 2, 0))
+        self.assertEqual([(ruta, info.st_size) for ruta, info in resultado.fallidos], [(en_uso, 20)])
+        self.assertEqual(os.listdir(self.arbol), ['dir'])
+        self.assertEqual(os.listdir(os.path.join(self.arbol, 'dir')), ['b.tmp'])
+
+    @unittest.skipUnless(hasattr(os, 'symlink') and os.name != 'nt', "Requiere enlaces simbólicos")
+    def test_no_sigue_enlaces(self):
+        externo = os.path.join(self.base, 'externo')
+        os.makedirs(externo)
+        with open(os.path.join(externo, 'conservar.txt'), 'wb') as f:
+            f.write(b'x')
+        self._crear_archivo('a.tmp', 10)
+        os.symlink(externo, os.path.join(self.arbol, 'enlace'))
+
+        resultado = subtree_delete.eliminar_subarbol(self.arbol)
+
+        self.assertTrue(resultado.completo)
+        self.assertFalse(os.path.exists(self.arbol))
+        self.assertTrue(os.path.exists(os.path.join(externo, 'conservar.txt')))
+
+    def test_limitador_y_cancelacion(self):
+        self._crear_arbol()
+        limitador = MagicMock()
+        cancelacion = MagicMock()
+        cancelacion.is_set.return_value = True
+
+        resultado = subtree_delete.eliminar_subarbol(self.arbol, limitador=limitador, cancelacion=cancelacion)
+
+        self.assertFalse(resultado.completo)
+        self.assertEqual(resultado.archivos, 0)
+        self.assertTrue(os.path.exists(self.arbol))
+
+        resultado = subtree_delete.eliminar_subarbol(self.arbol, limitador=limitador)
+
+        self.assertTrue(resultado.completo)
+        self.assertEqual(limitador.adquirir.call_count, 3 + 4) # Tres archivos y cuatro directorios
+        self.assertEqual(limitador.registrar_latencia.call_count, 7)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,12 @@
 import unittest
 from unittest.mock import patch, MagicMock, mock_open, call
 import tempfile
+import threading
+import time
 import os
-from src import system_analysis, utils
+import psutil
+from contextlib import ExitStack
+from src import system_analysis, utils, cpu_sampler
 
 class TestSystemAnalysis(unittest.TestCase):
 
@@ -10,7 +14,7 @@ class TestSystemAnalysis(unittest.TestCase):
     @patch('psutil.disk_partitions')
     @patch('psutil.virtual_memory')
     @patch('psutil.cpu_freq')
-    @patch('psutil.cpu_percent')
+    @patch('src.cpu_sampler.muestreador')
     @patch('psutil.cpu_count')
     @patch('platform.node', return_value='TestHost')
     @patch('platform.machine', return_value='x86_64')
@@ -18,7 +22,7 @@ class TestSystemAnalysis(unittest.TestCase):
     @patch('platform.release', return_value='11')
     @patch('platform.system', return_value='Windows')
     def test_get_system_specs_success(self, mock_system, mock_release, mock_version, mock_machine, mock_node, 
-                                      mock_cpu_count, mock_cpu_percent, mock_cpu_freq, mock_virtual_memory, 
+                                      mock_cpu_count, mock_muestreador, mock_cpu_freq, mock_virtual_memory, 
                                       mock_disk_partitions, mock_disk_usage):
         """Prueba la recopilación exitosa de especificaciones del sistema."""
         # --- Mock CPU ---
@@ -28,7 +32,8 @@ class TestSystemAnalysis(unittest.TestCase):
         mock_cpu_freq_obj.min = 1200.0
         mock_cpu_freq_obj.current = 2800.0
         mock_cpu_freq.return_value = mock_cpu_freq_obj
-        mock_cpu_percent.side_effect = [[10.0, 20.0, 30.0, 40.0, 15.0, 25.0, 35.0, 45.0], 25.0] # percpu, total
+        mock_muestreador.return_value.medir.return_value = cpu_sampler.UsoCPU(
+            25.0, [10.0, 20.0, 30.0, 40.0, 15.0, 25.0, 35.0, 45.0], 0.5)
 
         # --- Mock Memory ---
         mock_svmem = MagicMock()
@@ -66,6 +71,11 @@ class TestSystemAnalysis(unittest.TestCase):
         self.assertEqual(specs['cpu_info']['physical_cores'], 4)
         self.assertEqual(specs['cpu_info']['total_cores'], 8)
         self.assertEqual(specs['cpu_info']['total_usage'], '25.0%')
+        self.assertEqual(specs['cpu_info']['usage_per_core'][1], '20.0%')
+        self.assertEqual(specs['cpu_info']['max_frequency'], '3400.00 Mhz')
+        # Una sola consulta de frecuencias y una sola medida de uso
+        mock_cpu_freq.assert_called_once()
+        mock_muestreador.return_value.medir.assert_called_once()
 
         # Memory Info
         self.assertEqual(specs['memory_info']['total'], '16.00 GB')
@@ -106,23 +116,34 @@ class TestSystemAnalysis(unittest.TestCase):
         self.assertEqual(status_counts['stopped'], 1)
         self.assertEqual(status_counts['paused'], 1)
 
-    @patch('src.system_analysis.get_system_specs')
-    @patch('src.system_analysis.get_service_status')
+    def setUp(self):
+        # Los recolectores con TTL no deben reutilizar resultados de otra prueba
+        system_analysis.registro.vaciar_cache()
+
+    def _simular_recolectores(self, stack):
+        """Sustituye las fuentes de datos del análisis por datos fijos (una partición D:\\)."""
+        for nombre, valor in [('system', 'TestOS'), ('release', '1.0'), ('version', '1.0.0'), ('node', 'TestHost'), ('machine', 'x64')]:
+            stack.enter_context(patch(f'platform.{nombre}', return_value=valor))
+        stack.enter_context(patch('psutil.cpu_count', side_effect=lambda logical=True: 4 if logical else 2))
+        stack.enter_context(patch('psutil.cpu_freq', return_value=MagicMock(max=3000.0, min=1000.0, current=2000.0)))
+        muestreador = stack.enter_context(patch('src.cpu_sampler.muestreador'))
+        muestreador.return_value.medir.return_value = cpu_sampler.UsoCPU(50.0, [40.0, 60.0, 50.0, 50.0], 1.0)
+        stack.enter_context(patch('psutil.virtual_memory', return_value=MagicMock(total=16 * 1024**3, available=8 * 1024**3, used=8 * 1024**3, percent=50.0)))
+        stack.enter_context(patch('psutil.disk_partitions', return_value=[MagicMock(device='D:\\', mountpoint='D:\\', fstype='NTFS')]))
+        stack.enter_context(patch('psutil.disk_usage', return_value=MagicMock(total=100 * 1024**3, used=50 * 1024**3, free=50 * 1024**3, percent=50.0)))
+        return stack.enter_context(patch('src.system_analysis.get_service_status', return_value=
+            {'total': 10, 'running': 5, 'stopped': 4, 'paused': 1, 'other': 0}))
+
     @patch('src.system_analysis.config_manager.get_report_path')
     @patch("builtins.open", new_callable=mock_open)
     @patch('src.utils.show_header')
-    @patch('src.utils.show_progress_bar')
+    @patch('src.utils.ProgressReporter')
     @patch('builtins.print')
-    def test_run_system_analysis_success(self, mock_print, mock_show_progress_bar, mock_show_header, mock_file, mock_get_report_path, mock_get_service_status, mock_get_system_specs):
+    def test_run_system_analysis_success(self, mock_print, mock_progress_reporter, mock_show_header, mock_file, mock_get_report_path):
         """Prueba la función principal que ejecuta el análisis."""
-        # --- Mock return values ---
-        mock_get_system_specs.return_value = {
-            'os_info': {'system': 'TestOS', 'release': '1.0', 'version': '1.0.0', 'hostname': 'TestHost', 'architecture': 'x64'},
-            'cpu_info': {'physical_cores': 2, 'total_cores': 4, 'current_frequency': '2000.00 Mhz', 'min_frequency': '1000.00 Mhz', 'max_frequency': '3000.00 Mhz', 'total_usage': '50.0%'},
-            'memory_info': {'total': '16.00 GB', 'available': '8.00 GB', 'used': '8.00 GB', 'percentage': '50.0%'},
-            'disk_info': [{'device': 'D:\\', 'mountpoint': 'D:\\', 'fstype': 'NTFS', 'total_size': '100.00 GB', 'used': '50.00 GB', 'free': '50.00 GB', 'percentage': '50.0%'}]
-        }
-        mock_get_service_status.return_value = {'total': 10, 'running': 5, 'stopped': 4, 'paused': 1}
+        stack = ExitStack()
+        self.addCleanup(stack.close)
+        self._simular_recolectores(stack)
         
         temp_dir = tempfile.gettempdir()
         mock_get_report_path.return_value = temp_dir
@@ -132,11 +153,9 @@ class TestSystemAnalysis(unittest.TestCase):
 
         # --- Assertions ---
         mock_show_header.assert_called_once_with("Módulo de Análisis del Sistema")
-        self.assertEqual(mock_show_progress_bar.call_count, 3) # Dos pasos de análisis + una llamada final para 100%
-        mock_show_progress_bar.assert_has_calls([
-            call(1, 2, prefix='Progreso del Análisis:', suffix='Completado', length=30),
-            call(2, 2, prefix='Progreso del Análisis:', suffix='Completado', length=30)
-        ])
+        mock_progress_reporter.assert_called_once_with(total=6, prefix='Progreso del Análisis:', suffix='Completado', length=30, unit='pasos')
+        self.assertEqual(mock_progress_reporter.return_value.update.call_count, 6) # Sistema, CPU, memoria, particiones, discos y servicios
+        mock_progress_reporter.return_value.finish.assert_called_once()
         mock_print.assert_any_call(utils.colored_text("\nAnálisis del sistema completado con éxito.", utils.Colors.GREEN))
 
         mock_file.assert_called_once()
@@ -153,3 +172,50 @@ class TestSystemAnalysis(unittest.TestCase):
         self.assertIn("En uso:     8.00 GB (50.0%)", written_content)
         self.assertIn("Servicios Totales: 10", written_content)
         self.assertIn("Dispositivo: D:\\", written_content)
+        self.assertIn("## 6. Tiempos de Recopilación", written_content)
+        self.assertIn("- servicios: ", written_content)
+
+    @patch('src.system_analysis.PLAZO_PARTICION_SEGUNDOS', 0.2)
+    @patch('src.system_analysis.config_manager.get_report_path')
+    @patch("builtins.open", new_callable=mock_open)
+    @patch('src.utils.show_header')
+    @patch('src.utils.ProgressReporter')
+    @patch('builtins.print')
+    def test_recolector_con_plazo_agotado(self, mock_print, mock_progress_reporter, mock_show_header, mock_file, mock_get_report_path):
+        """Prueba que un disco que no responde no bloquea el análisis y aparece como agotado."""
+        stack = ExitStack()
+        self.addCleanup(stack.close)
+        self._simular_recolectores(stack)
+        liberar = threading.Event()
+        self.addCleanup(liberar.set)
+        stack.enter_context(patch('src.system_analysis._info_particion', side_effect=lambda partition: liberar.wait(5)))
+        mock_get_report_path.return_value = tempfile.gettempdir()
+
+        inicio = time.monotonic()
+        system_analysis.run_system_analysis()
+
+        self.assertLess(time.monotonic() - inicio, 2)
+        written_content = mock_file().write.call_args[0][0]
+        self.assertIn("Tamaño: tiempo de espera agotado", written_content)
+        self.assertIn("- disco D:\\: tiempo de espera agotado (0.20 s)", written_content)
+        self.assertIn("Carga Total: 50.0%", written_content)
+        mock_print.assert_any_call(utils.colored_text("Aviso: disco D:\\: tiempo de espera agotado (0.20 s).", utils.Colors.YELLOW))
+
+    @patch('builtins.print')
+    def test_sonda_de_salud(self, mock_print):
+        """Prueba que el perfil rápido solo ejecuta los recolectores baratos."""
+        stack = ExitStack()
+        self.addCleanup(stack.close)
+        mock_get_service_status = self._simular_recolectores(stack)
+
+        instantanea = system_analysis.run_health_probe()
+
+        # Valores sin formatear; el texto solo se genera al mostrarlos
+        self.assertEqual(instantanea.cpu.uso_total, 50.0)
+        self.assertEqual(instantanea.memoria.total, 16 * 1024**3)
+        self.assertEqual(instantanea.sistema.hostname, 'TestHost')
+        self.assertEqual(instantanea.discos, [])
+        self.assertIsNone(instantanea.servicios)
+        mock_get_service_status.assert_not_called()
+        psutil.disk_partitions.assert_not_called()
+        self.assertTrue(mock_print.call_args_list[0][0][0].startswith("TestHost | CPU: 50.0% | RAM: 8.00 GB / 16.00 GB (50.0%)"))
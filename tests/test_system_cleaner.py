@@ -2,115 +2,678 @@
 
 import unittest
 from unittest.mock import patch, MagicMock, call
-from src import system_cleaner, utils
+from src import system_cleaner, utils, cleanup_targets, cleanup_staging, open_files
 import os
+import json
+import _thread
+import tempfile
 import winshell
 import subprocess
 
+# Niveles del menú en las pruebas, independientes de los declarados en config/cleanup_targets.json
+NIVELES_MENU = [
+    cleanup_targets.NivelLimpieza('basico', 'Limpieza Básica (Archivos Temporales)', ('temp_usuario',), None),
+    cleanup_targets.NivelLimpieza('extendido', 'Limpieza Extendida (Archivos Temporales y Prefetch)', ('prefetch',), 'basico'),
+    cleanup_targets.NivelLimpieza('caches', 'Limpieza de Cachés', ('cache_pip',), None),
+    cleanup_targets.NivelLimpieza('avanzado', 'Limpieza Avanzada', (), 'extendido', False),
+]
+
 class TestSystemCleaner(unittest.TestCase):
 
-    @patch('src.utils.show_progress_bar')
-    @patch('os.path.getsize')
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.base = self._tmp.name
+        # El diario, el índice y los informes se guardan en el directorio temporal de la prueba
+        self._app_data = patch('src.config_manager.get_app_data_path', return_value=self.base)
+        self._app_data.start()
+        self._report_path = patch('src.config_manager.get_report_path', return_value=self.base)
+        self._report_path.start()
+
+    def tearDown(self):
+        self._report_path.stop()
+        self._app_data.stop()
+        self._tmp.cleanup()
+
+    def _niveles(self, basico=(), extendido=()):
+        """Sustituye las raíces de config/cleanup_targets.json por rutas de la prueba ('extendido' hereda de 'basico')."""
+        niveles = {'basico': list(basico), 'extendido': list(basico) + list(extendido)}
+        return patch('src.cleanup_targets.resolver_nivel',
+                     side_effect=lambda nivel: tuple(cleanup_targets.RaizLimpieza(ruta, {}) for ruta in niveles.get(nivel, [])))
+
+    def _crear_archivo(self, ruta_relativa, tamaño):
+        ruta = os.path.join(self.base, ruta_relativa)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        with open(ruta, 'wb') as f:
+            f.write(b'x' * tamaño)
+        return ruta
+
+    @patch('src.utils.ProgressReporter')
     @patch('os.remove')
-    @patch('os.walk')
-    @patch('os.path.exists', return_value=True)
-    @patch('src.system_cleaner.CLEANUP_PATHS', {
-        'basico': ['/mock/temp'],
-        'extendido': ['/mock/prefetch'],
-        'avanzado': []
-    })
-    @patch('builtins.print')
-    def test_limpiar_archivos_temporales_informe(self, mock_print, mock_exists, mock_walk, mock_remove, mock_getsize, mock_show_progress_bar):
+    @patch('builtins.print')
+    def test_limpiar_archivos_temporales_informe(self, mock_print, mock_remove, mock_progress_reporter):
         """Prueba que el modo informe calcula el tamaño pero no elimina archivos."""
-        # Mock del sistema de archivos
-        mock_walk.return_value = [('/mock/temp', ('subdir',), ('file1.tmp', 'file2.log'))]
-        mock_getsize.return_value = 1024 # 1 KB por archivo
+        self._crear_archivo(os.path.join('temp', 'file1.tmp'), 1024)
+        self._crear_archivo(os.path.join('temp', 'subdir', 'file2.log'), 1024)
 
-        total_eliminado, archivos_eliminados = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=True)
+        with self._niveles(basico=[os.path.join(self.base, 'temp')]):
+            total_eliminado, archivos_eliminados = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=True)
 
         self.assertEqual(archivos_eliminados, 2)
         self.assertEqual(total_eliminado, 2048)
         mock_remove.assert_not_called() # Verificar que no se llamó a os.remove
-        mock_show_progress_bar.assert_called() # Verificar que la barra de progreso fue llamada
+        mock_progress_reporter.return_value.update.assert_called() # Verificar que la barra de progreso fue actualizada
         mock_print.assert_any_call(utils.colored_text(f"Limpieza completada. Total de archivos procesados para eliminación: {archivos_eliminados}. Espacio total recuperado: {total_eliminado / (1024*1024):.2f} MB.", utils.Colors.GREEN))
 
-    @patch('src.utils.show_progress_bar')
-    @patch('os.path.getsize')
-    @patch('os.remove')
-    @patch('os.walk')
-    @patch('os.path.exists', return_value=True)
-    @patch('src.system_cleaner.CLEANUP_PATHS', {
-        'basico': ['/mock/temp'],
-        'extendido': ['/mock/prefetch'],
-        'avanzado': []
-    })
+    @patch('src.utils.ProgressReporter')
     @patch('builtins.print')
-    def test_limpiar_archivos_temporales_eliminacion(self, mock_print, mock_exists, mock_walk, mock_remove, mock_getsize, mock_show_progress_bar):
-        """Prueba que el modo de eliminación llama a os.remove."""
-        mock_walk.return_value = [('/mock/temp', (), ('file1.tmp',))]
-        mock_getsize.return_value = 512
+    def test_limpiar_archivos_temporales_eliminacion(self, mock_print, mock_progress_reporter):
+        """Prueba que el modo de eliminación borra los archivos del disco."""
+        ruta_archivo = self._crear_archivo(os.path.join('temp', 'file1.tmp'), 512)
 
-        total_eliminado, archivos_eliminados = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=False)
+        with self._niveles(basico=[os.path.join(self.base, 'temp')]):
+            total_eliminado, archivos_eliminados = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=False)
 
         self.assertEqual(archivos_eliminados, 1)
         self.assertEqual(total_eliminado, 512)
-        mock_remove.assert_called_once_with(os.path.join('/mock/temp', 'file1.tmp'))
-        mock_show_progress_bar.assert_called() # Verificar que la barra de progreso fue llamada
+        self.assertFalse(os.path.exists(ruta_archivo))
+        mock_progress_reporter.return_value.update.assert_called() # Verificar que la barra de progreso fue actualizada
         mock_print.assert_any_call(utils.colored_text(f"Limpieza completada. Total de archivos procesados para eliminación: {archivos_eliminados}. Espacio total recuperado: {total_eliminado / (1024*1024):.2f} MB.", utils.Colors.GREEN))
 
-    @patch('src.utils.show_progress_bar')
-    @patch('os.path.getsize')
-    @patch('os.remove')
-    @patch('os.walk')
-    @patch('os.path.exists', return_value=True)
-    @patch('src.system_cleaner.CLEANUP_PATHS', {
-        'basico': ['/mock/temp'],
-        'extendido': ['/mock/prefetch'],
-        'avanzado': []
-    })
-    @patch('builtins.print')
-    def test_niveles_de_limpieza(self, mock_print, mock_exists, mock_walk, mock_remove, mock_getsize, mock_show_progress_bar):
+    @patch('src.utils.ProgressReporter')
+    @patch('builtins.print')
+    def test_informe_de_espacio_asignado(self, mock_print, mock_progress_reporter):
+        """Prueba que se informa del tamaño lógico y del espacio asignado en disco sin stat adicionales."""
+        archivos = [self._crear_archivo(os.path.join('temp', f'pequeño{i}.tmp'), 10) for i in range(3)]
+        raiz = os.path.join(self.base, 'temp')
+        tamaño_cluster = utils.get_cluster_size(raiz)
+        asignado = sum(utils.allocated_size(os.stat(ruta), tamaño_cluster) for ruta in archivos)
+
+        with self._niveles(basico=[raiz]), \
+             patch('os.stat', wraps=os.stat) as mock_stat:
+            resultado = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=True)
+
+        self.assertEqual(resultado, (30, 3))
+        self.assertFalse(any(llamada.args[0] in archivos for llamada in mock_stat.call_args_list))
+        mock_print.assert_any_call(f"Tamaño lógico: {30 / (1024*1024):.2f} MB | Espacio asignado en disco: {asignado / (1024*1024):.2f} MB.")
+
+    @patch('src.utils.ProgressReporter')
+    @patch('builtins.print')
+    def test_niveles_de_limpieza(self, mock_print, mock_progress_reporter):
         """Prueba que el nivel 'extendido' incluye las rutas del nivel 'basico'."""
-        # Simular dos rutas con un archivo cada una
-        mock_walk.side_effect = [
-            [('/mock/temp', (), ('file1.tmp',))],
-            [('/mock/prefetch', (), ('file2.pf',))]
-        ] * 2 # Duplicar para simular la pre-lectura de archivos y luego el procesamiento
-        mock_getsize.return_value = 1000
+        self._crear_archivo(os.path.join('temp', 'file1.tmp'), 1000)
+        self._crear_archivo(os.path.join('prefetch', 'file2.pf'), 1000)
+        rutas = {'basico': [os.path.join(self.base, 'temp')], 'extendido': [os.path.join(self.base, 'prefetch')]}
 
-        total_eliminado, archivos_eliminados = system_cleaner.limpiar_archivos_temporales(nivel='extendido', modo_informe=True)
+        with self._niveles(**rutas):
+            total_eliminado, archivos_eliminados = system_cleaner.limpiar_archivos_temporales(nivel='extendido', modo_informe=True)
 
         self.assertEqual(archivos_eliminados, 2)
         self.assertEqual(total_eliminado, 2000)
-        # Verificar que se procesaron ambas rutas
-        self.assertEqual(mock_walk.call_count, 4)
-        mock_walk.assert_has_calls([call('/mock/temp'), call('/mock/prefetch')])
-        mock_show_progress_bar.assert_called() # Verificar que la barra de progreso fue llamada
+        mock_progress_reporter.return_value.update.assert_called() # Verificar que la barra de progreso fue actualizada
         mock_print.assert_any_call(utils.colored_text(f"Limpieza completada. Total de archivos procesados para eliminación: {archivos_eliminados}. Espacio total recuperado: {total_eliminado / (1024*1024):.2f} MB.", utils.Colors.GREEN))
 
-    @patch('src.utils.show_progress_bar')
-    @patch('os.path.getsize', return_value=1)
-    @patch('os.remove', side_effect=PermissionError)
+    @patch('src.utils.ProgressReporter')
     @patch('os.walk')
-    @patch('os.path.exists', return_value=True)
-    @patch('src.system_cleaner.CLEANUP_PATHS', {
-        'basico': ['/mock/locked_dir'],
-        'extendido': [],
-        'avanzado': []
-    })
-    @patch('builtins.print')
-    def test_manejo_permission_error(self, mock_print, mock_exists, mock_walk, mock_remove, mock_getsize, mock_show_progress_bar):
+    @patch('builtins.print')
+    def test_recorrido_de_una_sola_pasada(self, mock_print, mock_walk, mock_progress_reporter):
+        """Prueba que cada directorio se lista una sola vez y no se usa os.walk ni getsize."""
+        for i in range(3):
+            self._crear_archivo(os.path.join('temp', f'dir{i}', f'file{i}.tmp'), 10)
+        raiz = os.path.join(self.base, 'temp')
+
+        with self._niveles(basico=[raiz]), \
+             patch('os.scandir', wraps=os.scandir) as mock_scandir, \
+             patch('os.path.getsize') as mock_getsize:
+            total_eliminado, archivos_eliminados = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=True)
+
+        self.assertEqual((total_eliminado, archivos_eliminados), (30, 3))
+        self.assertEqual(mock_scandir.call_count, 4) # La raíz y sus tres subdirectorios
+        mock_walk.assert_not_called()
+        mock_getsize.assert_not_called()
+        # Una actualización de la barra por archivo y un cierre final
+        self.assertEqual(mock_progress_reporter.return_value.update.call_count, 3)
+        mock_progress_reporter.return_value.finish.assert_called_once()
+
+    @patch('src.utils.ProgressReporter')
+    @patch('builtins.print')
+    def test_limpieza_paralela(self, mock_print, mock_progress_reporter):
+        """Prueba que el modo con varios hilos agrega correctamente los totales de todas las unidades."""
+        rutas_archivos = [self._crear_archivo(os.path.join('temp', 'suelto.tmp'), 100)]
+        for i in range(5):
+            rutas_archivos.append(self._crear_archivo(os.path.join('temp', f'dir{i}', 'sub', f'file{i}.tmp'), 100))
+        rutas_archivos.append(self._crear_archivo(os.path.join('prefetch', 'file.pf'), 100))
+        rutas = {'basico': [os.path.join(self.base, 'temp')], 'extendido': [os.path.join(self.base, 'prefetch')]}
+
+        with self._niveles(**rutas):
+            informe = system_cleaner.limpiar_archivos_temporales(nivel='extendido', modo_informe=True, workers=4, modo_recorrido='hilos')
+            eliminacion = system_cleaner.limpiar_archivos_temporales(nivel='extendido', modo_informe=False, workers=4, modo_recorrido='hilos')
+
+        self.assertEqual(informe, (700, 7))
+        self.assertEqual(eliminacion, (700, 7))
+        self.assertFalse(any(os.path.exists(ruta) for ruta in rutas_archivos))
+        # Una unidad por los archivos sueltos de cada raíz con archivos y otra por cada subdirectorio
+        for llamada in mock_progress_reporter.call_args_list:
+            self.assertEqual(llamada.kwargs['total'], 7)
+
+    @patch('src.utils.ProgressReporter')
+    @patch('builtins.print')
+    def test_reglas_propias_de_objetivo(self, mock_print, mock_progress_reporter):
+        """Prueba que las reglas de un objetivo de config/cleanup_targets.json solo se aplican a sus raíces."""
+        self._crear_archivo(os.path.join('temp', 'a.log'), 100)
+        self._crear_archivo(os.path.join('temp', 'b.tmp'), 100)
+        self._crear_archivo(os.path.join('cache', 'c.log'), 100)
+        self._crear_archivo(os.path.join('cache', 'sub', 'd.tmp'), 100)
+        raices = (cleanup_targets.RaizLimpieza(os.path.join(self.base, 'temp'), {}),
+                  cleanup_targets.RaizLimpieza(os.path.join(self.base, 'cache'), {'extensions': ['tmp']}))
+
+        with patch('src.cleanup_targets.resolver_nivel', return_value=raices):
+            for workers, modo in ((1, 'secuencial'), (2, 'hilos'), (2, 'procesos')):
+                resultado = system_cleaner.limpiar_archivos_temporales(nivel='caches', modo_informe=True, workers=workers, reglas={},
+                                                                       modo_recorrido=modo)
+                self.assertEqual(resultado, (300, 3))
+            candidatos = sorted(os.path.basename(c.ruta) for c in system_cleaner.iterar_candidatos_limpieza('caches', reglas={}))
+
+        self.assertEqual(candidatos, ['a.log', 'b.tmp', 'd.tmp'])
+
+    @patch('src.utils.ProgressReporter')
+    @patch('builtins.print')
+    def test_limpieza_en_procesos(self, mock_print, mock_progress_reporter):
+        """Prueba que el modo informe con procesos agrega los fragmentos igual que el recorrido secuencial."""
+        self._crear_archivo(os.path.join('temp', 'suelto.tmp'), 100)
+        for i in range(4):
+            self._crear_archivo(os.path.join('temp', f'dir{i}', 'sub', f'file{i}.tmp'), 100)
+        self._crear_archivo(os.path.join('temp', 'dir0', 'conservar.lock'), 100)
+        rutas = {'basico': [os.path.join(self.base, 'temp')], 'extendido': []}
+        reglas = {'exclude': ['*.lock']}
+
+        with self._niveles(**rutas):
+            secuencial = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=True, reglas=reglas)
+            procesos = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=True, workers=2, reglas=reglas,
+                                                                  modo_recorrido='procesos')
+
+        self.assertEqual(secuencial, (500, 5))
+        self.assertEqual(procesos, secuencial)
+        self.assertEqual(mock_progress_reporter.call_args.kwargs['total'], 4) # Un fragmento por subdirectorio
+        # dir1..dir3 y sus 'sub', más dir0/sub; dir0 conserva el archivo excluido
+        self.assertEqual([llamada for llamada in mock_print.call_args_list
+                          if llamada == call("Directorios que quedarían vacíos y se eliminarían: 7.")], [call("Directorios que quedarían vacíos y se eliminarían: 7.")] * 2)
+
+    @patch('src.utils.ProgressReporter')
+    @patch('builtins.print')
+    def test_modo_recorrido_procesos_solo_en_informe(self, mock_print, mock_progress_reporter):
+        """Prueba que la eliminación no usa procesos y que 'auto' con un worker recorre en secuencia."""
+        self._crear_archivo(os.path.join('temp', 'dir', 'file.tmp'), 100)
+        rutas = {'basico': [os.path.join(self.base, 'temp')], 'extendido': []}
+
+        with self._niveles(**rutas), \
+             patch('src.system_cleaner._limpiar_en_paralelo') as mock_hilos, \
+             patch('src.system_cleaner._limpiar_en_procesos') as mock_procesos, \
+             patch('src.scan_strategy.muestrear_arbol') as mock_muestra:
+            system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=False, workers=2, modo_recorrido='procesos')
+            system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=True, modo_recorrido='auto')
+
+        mock_hilos.assert_called_once()
+        mock_procesos.assert_not_called()
+        mock_muestra.assert_not_called()
+        with self.assertRaises(ValueError):
+            system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=True, modo_recorrido='gpu')
+
+    @patch('src.utils.ProgressReporter')
+    @patch('builtins.print')
+    def test_limpieza_asincrona(self, mock_print, mock_progress_reporter):
+        """Prueba que la tubería asíncrona elimina lo mismo que el recorrido secuencial y poda al final."""
+        for i in range(3):
+            for j in range(100): # Varios lotes por subdirectorio
+                self._crear_archivo(os.path.join('temp', f'dir{i}', 'sub', f'file{j}.tmp'), 10)
+        conservar = self._crear_archivo(os.path.join('temp', 'dir0', 'conservar.lock'), 10)
+        raiz = os.path.join(self.base, 'temp')
+        rutas = {'basico': [raiz], 'extendido': []}
+
+        with self._niveles(**rutas):
+            informe = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=True, workers=2,
+                                                                 reglas={'exclude': ['*.lock']}, modo_recorrido='asincrono')
+            resultado = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=False, workers=2,
+                                                                   reglas={'exclude': ['*.lock']}, modo_recorrido='asincrono')
+
+        self.assertEqual(informe, (3000, 300))
+        self.assertEqual(resultado, informe)
+        self.assertEqual(sorted(os.listdir(raiz)), ['dir0'])
+        self.assertEqual(os.listdir(os.path.join(raiz, 'dir0')), ['conservar.lock'])
+        self.assertTrue(os.path.exists(conservar))
+        mock_print.assert_any_call("Directorios vacíos eliminados: 5.")
+
+    @patch('src.utils.ProgressReporter')
+    @patch('builtins.print')
+    def test_purga_diferida(self, mock_print, mock_progress_reporter):
+        """Prueba que la purga diferida mueve la raíz al área de purga y elimina a mano lo que no se pudo mover."""
+        self._crear_archivo(os.path.join('temp', 'dir', 'sub', 'a.tmp'), 100)
+        self._crear_archivo(os.path.join('temp', 'b.tmp'), 100)
+        self._crear_archivo(os.path.join('temp', 'abierto', 'c.tmp'), 100)
+        raiz = os.path.join(self.base, 'temp')
+        purga = cleanup_staging.PurgaSegundoPlano()
+        rename_original = os.rename
+
+        def rename_bloqueado(origen, destino):
+            if os.path.basename(origen) == 'abierto':
+                raise PermissionError("En uso")
+            rename_original(origen, destino)
+
+        with self._niveles(basico=[raiz]), \
+             patch('src.cleanup_staging._purga', purga), \
+             patch('os.rename', side_effect=rename_bloqueado):
+            resultado = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=False, purga_diferida=True)
+            self.assertTrue(purga.esperar(timeout=10))
+
+        self.assertEqual(resultado, (100, 1)) # Solo lo que no se pudo mover se elimina en el recorrido
+        self.assertEqual((purga.bytes_purgados, purga.archivos_purgados), (200, 2))
+        self.assertEqual(os.listdir(raiz), [])
+        mock_print.assert_any_call(utils.colored_text("Elementos movidos al área de purga: 2. Se eliminan en segundo plano.", utils.Colors.GREEN))
+
+    @patch('src.utils.ProgressReporter')
+    @patch('builtins.print')
+    def test_purga_interrumpida_se_retoma(self, mock_print, mock_progress_reporter):
+        """Prueba que el recorrido no entra en el área de purga y retoma en segundo plano los lotes que quedaron."""
+        raiz = os.path.join(self.base, 'temp')
+        self._crear_archivo(os.path.join('temp', cleanup_staging.DIRECTORIO_PURGA, 'lote', 'dir', 'a.tmp'), 100)
+        self._crear_archivo(os.path.join('temp', 'b.tmp'), 100)
+        purga = cleanup_staging.PurgaSegundoPlano()
+
+        with self._niveles(basico=[raiz]), patch('src.cleanup_staging._purga', purga):
+            informe = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=True)
+            self.assertFalse(purga.activa())
+            resultado = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=False)
+            self.assertTrue(purga.esperar(timeout=10))
+
+        self.assertEqual(informe, (100, 1))
+        self.assertEqual(resultado, (100, 1))
+        self.assertEqual((purga.bytes_purgados, purga.archivos_purgados), (100, 1))
+        self.assertEqual(os.listdir(raiz), [])
+
+    @patch('src.utils.ProgressReporter')
+    @patch('builtins.print')
+    def test_omitir_archivos_abiertos(self, mock_print, mock_progress_reporter):
+        """Prueba que los archivos abiertos no se intentan eliminar y se informan en un único recuento."""
+        abierto = self._crear_archivo(os.path.join('temp', 'dir', 'sub', 'abierto.tmp'), 100)
+        self._crear_archivo(os.path.join('temp', 'dir', 'sub', 'cerrado.tmp'), 100)
+        self._crear_archivo(os.path.join('temp', 'otro', 'cerrado.tmp'), 100)
+        raiz = os.path.join(self.base, 'temp')
+        abiertos = open_files.ArchivosAbiertos(
+            frozenset([open_files.normalizar(abierto)]),
+            frozenset(open_files.normalizar(os.path.join(raiz, *partes)) for partes in (('dir',), ('dir', 'sub'))))
+
+        with self._niveles(basico=[raiz]), \
+             patch('src.open_files.consultar', return_value=abiertos) as mock_consultar, \
+             patch('os.remove', wraps=os.remove) as mock_remove:
+            resultado = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=False, omitir_abiertos=True)
+
+        mock_consultar.assert_called_once_with([raiz])
+        self.assertEqual(resultado, (200, 2))
+        self.assertTrue(os.path.exists(abierto))
+        self.assertNotIn(abierto, [llamada.args[0] for llamada in mock_remove.call_args_list])
+        self.assertEqual(sorted(os.listdir(raiz)), ['dir'])
+        mock_print.assert_any_call("Archivos omitidos por estar abiertos por otro proceso: 1.")
+        self.assertFalse(any('avisos durante la limpieza' in str(llamada.args[0]) for llamada in mock_print.call_args_list))
+
+    @patch('src.utils.ProgressReporter')
+    @patch('builtins.print')
+    def test_planificar_y_aplicar_manifiesto(self, mock_print, mock_progress_reporter):
+        """Prueba que al aplicar el manifiesto solo se eliminan los archivos que no han cambiado desde el análisis."""
+        sin_cambios = self._crear_archivo(os.path.join('temp', 'sin_cambios.tmp'), 100)
+        modificado = self._crear_archivo(os.path.join('temp', 'sub', 'modificado.tmp'), 100)
+        reemplazado = self._crear_archivo(os.path.join('temp', 'reemplazado.tmp'), 100)
+        desaparecido = self._crear_archivo(os.path.join('temp', 'desaparecido.tmp'), 100)
+        manifiesto = os.path.join(self.base, 'plan.bin')
+
+        with self._niveles(basico=[os.path.join(self.base, 'temp')]):
+            plan = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=True, reglas={}, manifiesto=manifiesto)
+        self.assertEqual(plan, (400, 4))
+
+        # Cambios entre el análisis y la ventana de mantenimiento
+        os.utime(modificado, (1, 1))
+        os.remove(reemplazado)
+        nuevo = self._crear_archivo(os.path.join('temp', 'otro.tmp'), 10) # Puede reutilizar el inodo liberado
+        os.rename(nuevo, reemplazado)
+        os.utime(reemplazado, (2, 2))
+        os.remove(desaparecido)
+        creado_despues = self._crear_archivo(os.path.join('temp', 'nuevo.tmp'), 100)
+
+        resultado = system_cleaner.aplicar_manifiesto(manifiesto)
+
+        self.assertEqual(resultado, (100, 1))
+        self.assertFalse(os.path.exists(sin_cambios))
+        self.assertTrue(all(os.path.exists(ruta) for ruta in (modificado, reemplazado, creado_despues)))
+        mock_print.assert_any_call("Archivos conservados por haber cambiado desde el análisis: 2. Archivos que ya no existían: 1.")
+
+    @patch('src.utils.ProgressReporter')
+    @patch('builtins.print')
+    def test_destino_no_se_puede_crear(self, mock_print, mock_progress_reporter):
+        """Prueba que un destino del manifiesto o de la exportación que no se puede crear se informa sin excepción."""
+        self._crear_archivo(os.path.join('temp', 'a.tmp'), 10)
+        inexistente = os.path.join(self.base, 'no_existe')
+
+        with self._niveles(basico=[os.path.join(self.base, 'temp')]):
+            plan = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=True, reglas={},
+                                                              manifiesto=os.path.join(inexistente, 'plan.bin'))
+            exportado = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=True, reglas={},
+                                                                   exportar_jsonl=os.path.join(inexistente, 'candidatos.jsonl'))
+            directo = system_cleaner.exportar_candidatos_jsonl(os.path.join(inexistente, 'directo.jsonl'), 'basico', reglas={})
+
+        self.assertEqual((plan, exportado, directo), ((0, 0), (0, 0), (0, 0)))
+        self.assertTrue(os.path.exists(os.path.join(self.base, 'temp', 'a.tmp')))
+        errores = [c.args[0] for c in mock_print.call_args_list if c.args and 'Error al crear' in c.args[0]]
+        self.assertEqual(len(errores), 3)
+
+    @patch('src.utils.ProgressReporter')
+    @patch('builtins.print')
+    def test_manifiesto_no_se_guarda_si_se_cancela(self, mock_print, mock_progress_reporter):
+        """Prueba que un análisis cancelado no publica un manifiesto parcial."""
+        for i in range(3):
+            self._crear_archivo(os.path.join('temp', f'file{i}.tmp'), 100)
+        manifiesto = os.path.join(self.base, 'plan.bin')
+        escribir_manifiesto = system_cleaner._escribir_manifiesto
+
+        def cancelar_tras_el_primero(candidatos, escritor):
+            for indice, candidato in enumerate(escribir_manifiesto(candidatos, escritor)):
+                if indice == 0:
+                    system_cleaner.cancelar_limpieza()
+                yield candidato
+
+        with self._niveles(basico=[os.path.join(self.base, 'temp')]), \
+             patch('src.system_cleaner._escribir_manifiesto', side_effect=cancelar_tras_el_primero):
+            system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=True, reglas={}, manifiesto=manifiesto)
+
+        self.assertFalse(os.path.exists(manifiesto))
+        self.assertFalse(os.path.exists(manifiesto + '.tmp'))
+        self.assertEqual(system_cleaner.aplicar_manifiesto(manifiesto), (0, 0))
+
+    @patch('src.utils.ProgressReporter')
+    @patch('builtins.print')
+    def test_modo_informe_con_indice_incremental(self, mock_print, mock_progress_reporter):
+        """Prueba que el modo informe con índice devuelve los mismos totales que el recorrido completo."""
+        self._crear_archivo(os.path.join('temp', 'dir', 'file1.tmp'), 300)
+        self._crear_archivo(os.path.join('temp', 'file2.tmp'), 200)
+        rutas = {'basico': [os.path.join(self.base, 'temp')], 'extendido': []}
+
+        with self._niveles(**rutas), \
+             patch('src.system_cleaner.config_manager.get_app_data_path', return_value=self.base):
+            primero = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=True, usar_indice=True)
+            segundo = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=True, usar_indice=True)
+
+        self.assertEqual(primero, (500, 2))
+        self.assertEqual(segundo, (500, 2))
+        self.assertTrue(os.path.exists(os.path.join(self.base, 'indice_limpieza.sqlite3')))
+
+    @patch('src.utils.ProgressReporter')
+    @patch('builtins.print')
+    def test_modo_informe_desglose_por_directorio(self, mock_print, mock_progress_reporter):
+        """Prueba que el modo informe acumula los tamaños en los directorios padre y guarda el desglose."""
+        self._crear_archivo(os.path.join('temp', 'cache', 'a', 'f1.tmp'), 400)
+        self._crear_archivo(os.path.join('temp', 'cache', 'b', 'f2.tmp'), 300)
+        self._crear_archivo(os.path.join('temp', 'logs', 'f3.log'), 200)
+        self._crear_archivo(os.path.join('temp', 'f4.tmp'), 50)
+        raiz = os.path.join(self.base, 'temp')
+        esperado = [(os.path.join(raiz, 'cache'), 700, 2), (os.path.join(raiz, 'cache', 'a'), 400, 1)]
+
+        for workers, modo in ((1, 'secuencial'), (3, 'hilos'), (2, 'procesos')):
+            with self._niveles(basico=[raiz]):
+                resultado = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=True, workers=workers, desglose_top=2,
+                                                                       modo_recorrido=modo)
+            self.assertEqual(resultado, (950, 4))
+            for ruta, num_bytes, archivos in esperado:
+                mock_print.assert_any_call(f" - {num_bytes / (1024*1024):10.2f} MB  {archivos:>8} archivos  {ruta}")
+            mock_print.reset_mock()
+
+        informes = [nombre for nombre in os.listdir(self.base) if nombre.startswith('Informe_Desglose_Limpieza_')]
+        self.assertTrue(informes)
+        with open(os.path.join(self.base, informes[0]), encoding='utf-8') as f:
+            contenido = f.read()
+        self.assertIn(f"| `{raiz}` | 0.00 | 4 |", contenido)
+        for ruta, num_bytes, archivos in esperado:
+            self.assertIn(f"| `{ruta}` | {num_bytes / (1024*1024):.2f} | {archivos} |", contenido)
+        self.assertNotIn(os.path.join(raiz, 'logs'), contenido)
+
+    @patch('src.utils.ProgressReporter')
+    @patch('builtins.print')
+    def test_poda_de_directorios_vacios(self, mock_print, mock_progress_reporter):
+        """Prueba que se eliminan de abajo arriba los directorios que quedan vacíos, pero no la raíz."""
+        self._crear_archivo(os.path.join('temp', 'a', 'b', 'c', 'f1.tmp'), 10)
+        self._crear_archivo(os.path.join('temp', 'a', 'f2.tmp'), 10)
+        conservado = self._crear_archivo(os.path.join('temp', 'd', 'e', 'conservar.lock'), 10)
+        self._crear_archivo(os.path.join('temp', 'd', 'f3.tmp'), 10)
+        os.makedirs(os.path.join(self.base, 'temp', 'vacio'))
+        raiz = os.path.join(self.base, 'temp')
+        reglas = {'exclude': ['*.lock']}
+
+        for workers in (1, 2):
+            mock_print.reset_mock()
+            with self._niveles(basico=[raiz]), \
+                 patch('os.scandir', wraps=os.scandir) as mock_scandir:
+                system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=True, workers=workers, reglas=reglas,
+                                                           modo_recorrido='hilos' if workers > 1 else 'secuencial')
+            # a, a/b, a/b/c y vacio; d y d/e conservan el archivo excluido
+            mock_print.assert_any_call("Directorios que quedarían vacíos y se eliminarían: 4.")
+            self.assertTrue(os.path.isdir(os.path.join(raiz, 'a', 'b', 'c')))
+            self.assertEqual(mock_scandir.call_count, 7) # Un solo listado por directorio
+
+        with self._niveles(basico=[raiz]):
+            resultado = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=False, reglas=reglas)
+
+        self.assertEqual(resultado, (30, 3))
+        mock_print.assert_any_call("Directorios vacíos eliminados: 4.")
+        self.assertEqual(sorted(os.listdir(raiz)), ['d'])
+        self.assertEqual(os.listdir(os.path.join(raiz, 'd')), ['e'])
+        self.assertTrue(os.path.exists(conservado))
+
+    @patch('src.utils.ProgressReporter')
+    @patch('builtins.print')
+    def test_eliminacion_con_limitador_de_es(self, mock_print, mock_progress_reporter):
+        """Prueba que cada eliminación pasa por el limitador y que el resumen informa de la espera."""
+        for i in range(5):
+            self._crear_archivo(os.path.join('temp', 'sub', f'file{i}.tmp'), 100)
+        limite_es = {'max_ops_per_second': 1000, 'max_mb_per_second': None, 'latency_threshold_ms': None}
+
+        with self._niveles(basico=[os.path.join(self.base, 'temp')]), \
+             patch('src.io_throttle.LimitadorES.adquirir', autospec=True) as mock_adquirir:
+            resultado = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=False, limite_es=limite_es)
+
+        self.assertEqual(resultado, (500, 5))
+        self.assertEqual(mock_adquirir.call_count, 6) # Cinco archivos y el subdirectorio vacío
+        self.assertTrue(any('Tiempo en espera por el limitador de E/S' in str(llamada.args[0]) for llamada in mock_print.call_args_list))
+
+    @patch('src.utils.ProgressReporter')
+    @patch('builtins.print')
+    def test_reglas_de_seleccion(self, mock_print, mock_progress_reporter):
+        """Prueba que solo se eliminan los archivos que cumplen las reglas de selección."""
+        viejo = self._crear_archivo(os.path.join('temp', 'viejo.tmp'), 100)
+        reciente = self._crear_archivo(os.path.join('temp', 'reciente.tmp'), 100)
+        excluido = self._crear_archivo(os.path.join('temp', 'viejo.lock'), 100)
+        hace_una_semana = os.stat(viejo).st_mtime - 7 * 86400
+        os.utime(viejo, (hace_una_semana, hace_una_semana))
+        os.utime(excluido, (hace_una_semana, hace_una_semana))
+        reglas = {'min_age_days': 3, 'exclude': ['*.lock']}
+
+        with self._niveles(basico=[os.path.join(self.base, 'temp')]):
+            resultado = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=False, reglas=reglas)
+
+        self.assertEqual(resultado, (100, 1))
+        self.assertFalse(os.path.exists(viejo))
+        self.assertTrue(os.path.exists(reciente))
+        self.assertTrue(os.path.exists(excluido))
+
+    @patch('builtins.print')
+    def test_iterar_candidatos_es_perezoso(self, mock_print):
+        """Prueba que el generador produce registros sin recorrer el árbol completo por adelantado."""
+        for i in range(3):
+            self._crear_archivo(os.path.join('temp', f'dir{i}', f'file{i}.tmp'), 10 * (i + 1))
+        raiz = os.path.join(self.base, 'temp')
+
+        with self._niveles(basico=[raiz]), \
+             patch('os.scandir', wraps=os.scandir) as mock_scandir:
+            candidatos = system_cleaner.iterar_candidatos_limpieza('basico', reglas={})
+            mock_scandir.assert_not_called()
+            primero = next(candidatos)
+            self.assertEqual(mock_scandir.call_count, 2) # La raíz y el primer subdirectorio
+            resto = list(candidatos)
+
+        self.assertEqual(len(resto) + 1, 3)
+        self.assertEqual(primero.raiz, raiz)
+        self.assertEqual(sum(c.tamaño for c in [primero] + resto), 60)
+
+    @patch('src.utils.ProgressReporter')
+    @patch('builtins.print')
+    def test_modo_informe_exporta_jsonl(self, mock_print, mock_progress_reporter):
+        """Prueba que el modo informe escribe cada candidato como una línea JSON."""
+        self._crear_archivo(os.path.join('temp', 'a.tmp'), 10)
+        self._crear_archivo(os.path.join('temp', 'sub', 'b.tmp'), 20)
+        destino = os.path.join(self.base, 'candidatos.jsonl')
+
+        with self._niveles(basico=[os.path.join(self.base, 'temp')]):
+            resultado = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=True, reglas={}, exportar_jsonl=destino)
+            exportado = system_cleaner.exportar_candidatos_jsonl(os.path.join(self.base, 'directo.jsonl'), 'basico', reglas={})
+
+        self.assertEqual(resultado, (30, 2))
+        self.assertEqual(exportado, (30, 2))
+        with open(destino, encoding='utf-8') as f:
+            registros = [json.loads(linea) for linea in f]
+        self.assertEqual(sorted(r['tamaño'] for r in registros), [10, 20])
+        self.assertEqual({r['raiz'] for r in registros}, {os.path.join(self.base, 'temp')})
+        self.assertTrue(all(os.path.exists(r['ruta']) for r in registros))
+
+    @patch('src.utils.ProgressReporter')
+    @patch('builtins.print')
+    def test_cancelacion_y_reanudacion(self, mock_print, mock_progress_reporter):
+        """Prueba que una limpieza cancelada se reanuda sin volver a listar los directorios completados."""
+        for i in range(3):
+            self._crear_archivo(os.path.join('temp', f'dir{i}', f'file{i}.tmp'), 100)
+        raiz = os.path.join(self.base, 'temp')
+        remove_original = os.remove
+        eliminados = []
+
+        def remove_y_cancelar(ruta):
+            remove_original(ruta)
+            eliminados.append(ruta)
+            if len(eliminados) == 2:
+                system_cleaner.cancelar_limpieza()
+
+        # Con reglas de selección se recorre archivo a archivo, sin eliminar subárboles de una vez
+        reglas = {'exclude': ['*.lock']}
+        with self._niveles(basico=[raiz]):
+            with patch('os.remove', side_effect=remove_y_cancelar):
+                parcial = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=False, reglas=reglas)
+            self.assertTrue(os.path.exists(os.path.join(self.base, 'diario_limpieza_basico.journal')))
+            with patch('os.scandir', wraps=os.scandir) as mock_scandir:
+                final = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=False, reglas=reglas)
+
+        self.assertEqual(parcial, (200, 2))
+        self.assertEqual(final, (300, 3))
+        self.assertEqual(os.listdir(raiz), []) # Archivos eliminados y directorios vacíos podados
+        # La raíz y el único subdirectorio pendiente; el primero ya constaba como completado
+        self.assertEqual(mock_scandir.call_count, 2)
+        self.assertFalse(os.path.exists(os.path.join(self.base, 'diario_limpieza_basico.journal')))
+
+    @patch('src.utils.ProgressReporter')
+    @patch('builtins.print')
+    def test_interrupcion_limpieza_asincrona(self, mock_print, mock_progress_reporter):
+        """Prueba que un Ctrl+C en la tubería asíncrona devuelve los totales de lo que llegó a eliminarse."""
+        for i in range(3):
+            for j in range(100):
+                self._crear_archivo(os.path.join('temp', f'dir{i}', f'file{j}.tmp'), 10)
+        raiz = os.path.join(self.base, 'temp')
+        remove_original = os.remove
+        eliminados = []
+
+        def remove_e_interrumpir(ruta):
+            remove_original(ruta)
+            eliminados.append(ruta)
+            if len(eliminados) == 100:
+                _thread.interrupt_main() # Como un Ctrl+C: la señal llega al hilo principal
+
+        with self._niveles(basico=[raiz]):
+            with patch('os.remove', side_effect=remove_e_interrumpir):
+                parcial = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=False, workers=2,
+                                                                     reglas={'exclude': ['*.lock']}, modo_recorrido='asincrono')
+
+        self.assertGreaterEqual(len(eliminados), 100)
+        self.assertLess(len(eliminados), 300)
+        self.assertEqual(parcial, (10 * len(eliminados), len(eliminados)))
+
+    @patch('src.utils.ProgressReporter')
+    @patch('builtins.print')
+    def test_eliminacion_de_subarboles(self, mock_print, mock_progress_reporter):
+        """Prueba que sin reglas los subdirectorios se eliminan de una vez y los archivos en uso se tratan uno a uno."""
+        self._crear_archivo(os.path.join('temp', 'suelto.tmp'), 100)
+        for i in range(3):
+            self._crear_archivo(os.path.join('temp', 'dir', f'sub{i}', f'file{i}.tmp'), 100)
+        en_uso = self._crear_archivo(os.path.join('temp', 'dir', 'sub0', 'en_uso.tmp'), 100)
+        raiz = os.path.join(self.base, 'temp')
+        unlink_original = os.unlink
+        remove_original = os.remove
+
+        def unlink_bloqueado(ruta, *args, **kwargs):
+            if os.path.basename(ruta) == 'en_uso.tmp':
+                raise PermissionError("En uso")
+            return unlink_original(ruta, *args, **kwargs)
+
+        def remove_bloqueado(ruta, *args, **kwargs):
+            if os.path.basename(ruta) == 'en_uso.tmp':
+                raise PermissionError("En uso")
+            return remove_original(ruta, *args, **kwargs)
+
+        with self._niveles(basico=[raiz]), \
+             patch('os.unlink', side_effect=unlink_bloqueado), \
+             patch('os.remove', side_effect=remove_bloqueado) as mock_remove:
+            resultado = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=False)
+
+        self.assertEqual(resultado, (400, 4))
+        # Por ruta solo se tratan el archivo suelto y, de nuevo, el que estaba en uso
+        eliminados_por_ruta = sorted(os.path.basename(llamada.args[0]) for llamada in mock_remove.call_args_list
+                                     if llamada.args[0].startswith(raiz))
+        self.assertEqual(eliminados_por_ruta, ['en_uso.tmp', 'suelto.tmp'])
+        self.assertTrue(os.path.exists(en_uso))
+        self.assertEqual(sorted(os.listdir(raiz)), ['dir'])
+        self.assertEqual(os.listdir(os.path.join(raiz, 'dir')), ['sub0'])
+        mock_print.assert_any_call("Directorios vacíos eliminados: 2.")
+        mock_print.assert_any_call(utils.colored_text("Se registraron 1 avisos durante la limpieza. Consulte el log para más detalles.", utils.Colors.YELLOW))
+
+    @patch('src.utils.show_header')
+    @patch('builtins.print')
+    def test_buscar_archivos_duplicados(self, mock_print, mock_show_header):
+        """Prueba que se agrupan los duplicados de las rutas de limpieza y de las rutas adicionales."""
+        self._crear_archivo(os.path.join('temp', 'setup.exe'), 1000)
+        self._crear_archivo(os.path.join('descargas', 'setup (1).exe'), 1000)
+        self._crear_archivo(os.path.join('descargas', 'sub', 'setup (2).exe'), 1000)
+        distinto = self._crear_archivo(os.path.join('descargas', 'otro.exe'), 1000)
+        with open(distinto, 'r+b') as f:
+            f.write(b'y')
+        informes = os.path.join(self.base, 'informes')
+        os.makedirs(informes)
+
+        with self._niveles(basico=[os.path.join(self.base, 'temp')]), \
+             patch('src.config_manager.get_report_path', return_value=informes):
+            recuperable, grupos = system_cleaner.buscar_archivos_duplicados(rutas_extra=[os.path.join(self.base, 'descargas')], workers=2)
+
+        self.assertEqual(recuperable, 2000)
+        self.assertEqual(len(grupos), 1)
+        self.assertEqual(len(grupos[0].rutas), 3)
+        self.assertNotIn(distinto, grupos[0].rutas)
+        self.assertEqual(len(os.listdir(informes)), 1)
+
+    @patch('src.utils.ProgressReporter')
+    @patch('os.remove', side_effect=PermissionError)
+    @patch('builtins.print')
+    def test_manejo_permission_error(self, mock_print, mock_remove, mock_progress_reporter):
         """Prueba que la limpieza continúa a pesar de un PermissionError."""
-        mock_walk.return_value = [('/mock/locked_dir', (), ('locked_file.lck',))]
+        self._crear_archivo(os.path.join('locked_dir', 'locked_file.lck'), 1)
 
         # La función debería capturar la excepción y no relanzarla
-        total_eliminado, archivos_eliminados = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=False)
+        with self._niveles(basico=[os.path.join(self.base, 'locked_dir')]):
+            total_eliminado, archivos_eliminados = system_cleaner.limpiar_archivos_temporales(nivel='basico', modo_informe=False)
 
         # No se eliminó nada, pero el programa no se detuvo
         self.assertEqual(archivos_eliminados, 0)
         self.assertEqual(total_eliminado, 0)
-        mock_remove.assert_called_once()
-        mock_show_progress_bar.assert_called() # Verificar que la barra de progreso fue llamada
+        mock_remove.assert_any_call(os.path.join(self.base, 'locked_dir', 'locked_file.lck'))
+        mock_progress_reporter.return_value.update.assert_called() # Verificar que la barra de progreso fue actualizada
         mock_print.assert_any_call(utils.colored_text(f"Limpieza completada. Total de archivos procesados para eliminación: {archivos_eliminados}. Espacio total recuperado: {total_eliminado / (1024*1024):.2f} MB.", utils.Colors.GREEN))
 
     @patch('winshell.recycle_bin')
@@ -155,6 +718,41 @@ class TestSystemCleaner(unittest.TestCase):
         self.assertFalse(resultado)
         mock_print.assert_any_call(utils.colored_text("Error al vaciar la papelera de reciclaje: Error de prueba", utils.Colors.RED))
 
+    @patch('winshell.recycle_bin')
+    @patch('builtins.print')
+    def test_limpiar_papelera_reciclaje_seguro_no_carga_la_papelera(self, mock_print, mock_recycle_bin):
+        """Prueba que comprobar si hay elementos no recorre toda la papelera."""
+        consumidos = []
+
+        def elementos():
+            for i in range(100000):
+                consumidos.append(i)
+                yield MagicMock()
+
+        mock_recycle_bin.return_value.__iter__.side_effect = lambda: elementos()
+
+        self.assertTrue(system_cleaner.limpiar_papelera_reciclaje_seguro())
+        self.assertEqual(len(consumidos), 1)
+        mock_recycle_bin.return_value.empty.assert_called_once_with(confirm=False, show_progress=True, sound=False)
+
+    @patch('builtins.print')
+    def test_limpiar_papelera_reciclaje_seguro_informe(self, mock_print):
+        """Prueba el modo informe sobre una papelera simulada en un directorio."""
+        papelera = os.path.join(self.base, 'papelera')
+        for i in range(60):
+            self._crear_archivo(os.path.join('papelera', f'$R{i:03d}.tmp'), 10)
+        self._crear_archivo(os.path.join('papelera', '$RCARPETA', 'sub', 'a.bin'), 100)
+        backend = system_cleaner.recycle_bin.BackendDirectorio(papelera)
+
+        self.assertTrue(system_cleaner.limpiar_papelera_reciclaje_seguro(modo_informe=True, backend=backend))
+
+        mock_print.assert_any_call("Resumen: 61 elementos en la papelera. Tamaño total aproximado: 700 bytes.")
+        mock_print.assert_any_call(" ... y 11 elementos más.")
+        self.assertEqual(len(os.listdir(papelera)), 61) # El modo informe no elimina nada
+
+        self.assertTrue(system_cleaner.limpiar_papelera_reciclaje_seguro(backend=backend))
+        self.assertEqual(os.listdir(papelera), [])
+
     @patch('subprocess.run')
     @patch('builtins.print')
     def test_limpiar_winsxs_exito(self, mock_print, mock_subprocess_run):
@@ -240,6 +838,7 @@ class TestSystemCleaner(unittest.TestCase):
         self.assertFalse(resultado)
         mock_print.assert_any_call(utils.colored_text("Error inesperado al eliminar copias de sombra: Error inesperado", utils.Colors.RED))
 
+    @patch('src.cleanup_targets.niveles', return_value=NIVELES_MENU)
     @patch('builtins.input', side_effect=['1', 'n', 'y', '0']) # Selecciona limpieza básica, no modo informe, confirma, luego sale
     @patch('builtins.print')
     @patch('src.system_cleaner.limpiar_archivos_temporales', return_value=(1024, 1))
@@ -248,20 +847,26 @@ class TestSystemCleaner(unittest.TestCase):
     @patch('src.system_cleaner.limpiar_copias_sombra')
     @patch('src.utils.show_header')
     @patch('src.utils.confirm_operation', side_effect=[False, True]) # No modo informe, luego confirma la eliminación
-    def test_ejecutar_limpiador_flujo_basico(self, mock_confirm_operation, mock_show_header, mock_limpiar_copias_sombra, mock_limpiar_winsxs, mock_limpiar_papelera_reciclaje_seguro, mock_limpiar_archivos_temporales, mock_print, mock_input):
+    def test_ejecutar_limpiador_flujo_basico(self, mock_confirm_operation, mock_show_header, mock_limpiar_copias_sombra, mock_limpiar_winsxs, mock_limpiar_papelera_reciclaje_seguro, mock_limpiar_archivos_temporales, mock_print, mock_input, mock_niveles):
         """Prueba un flujo básico de interacción con el menú del limpiador."""
         system_cleaner.ejecutar_limpiador()
 
         mock_show_header.assert_called_once_with("Módulo de Limpieza del Sistema")
-        mock_limpiar_archivos_temporales.assert_called_once_with(nivel='basico', modo_informe=False)
+        mock_limpiar_archivos_temporales.assert_called_once_with(nivel='basico', modo_informe=False, workers=1, limite_es=None,
+                                                                  purga_diferida=False, omitir_abiertos=False)
         mock_limpiar_papelera_reciclaje_seguro.assert_not_called()
         mock_limpiar_winsxs.assert_not_called()
         mock_limpiar_copias_sombra.assert_not_called()
         mock_print.assert_any_call("\nSeleccione una opción de limpieza:")
+        mock_print.assert_any_call("  1. Limpieza Básica (Archivos Temporales)")
+        mock_print.assert_any_call("  3. Vaciar Papelera de Reciclaje") # Las opciones de siempre conservan su número
+        mock_print.assert_any_call("  7. Limpieza de Cachés") # Los niveles nuevos se añaden al final
+        self.assertNotIn(call("  8. Limpieza Avanzada"), mock_print.call_args_list) # Fuera del menú
         # Verificar que el mensaje de éxito coloreado está en alguna de las llamadas a print
         expected_success_message = "Limpieza completada. Total de archivos procesados para eliminación: 1. Espacio total recuperado: 0.00 MB."
         self.assertTrue(any(expected_success_message in call_args[0][0] for call_args in mock_print.call_args_list))
 
+    @patch('src.cleanup_targets.niveles', return_value=NIVELES_MENU)
     @patch('builtins.input', side_effect=['3', 'y', '0']) # Selecciona papelera, confirma, luego sale
     @patch('builtins.print')
     @patch('src.system_cleaner.limpiar_archivos_temporales')
@@ -270,14 +875,14 @@ class TestSystemCleaner(unittest.TestCase):
     @patch('src.system_cleaner.limpiar_copias_sombra')
     @patch('src.utils.show_header')
     @patch('src.utils.confirm_operation', return_value=True) # Confirma la operación
-    def test_ejecutar_limpiador_papelera(self, mock_confirm_operation, mock_show_header, mock_limpiar_copias_sombra, mock_limpiar_winsxs, mock_limpiar_papelera_reciclaje_seguro, mock_limpiar_archivos_temporales, mock_print, mock_input):
+    def test_ejecutar_limpiador_papelera(self, mock_confirm_operation, mock_show_header, mock_limpiar_copias_sombra, mock_limpiar_winsxs, mock_limpiar_papelera_reciclaje_seguro, mock_limpiar_archivos_temporales, mock_print, mock_input, mock_niveles):
         """Prueba la opción de vaciar la papelera de reciclaje."""
         system_cleaner.ejecutar_limpiador()
 
         mock_limpiar_papelera_reciclaje_seguro.assert_called_once_with(confirmar=False, mostrar_progreso=True, sonido=False)
         mock_limpiar_archivos_temporales.assert_not_called()
 
-    @patch('builtins.input', side_effect=['6', '0']) # Opción no válida, luego sale
+    @patch('builtins.input', side_effect=['99', '0']) # Opción no válida, luego sale
     @patch('builtins.print')
     @patch('src.utils.show_header')
     def test_ejecutar_limpiador_opcion_invalida(self, mock_show_header, mock_print, mock_input):
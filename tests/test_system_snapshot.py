@@ -0,0 +1,60 @@
+# tests/test_system_snapshot.py
+
+import json
+import unittest
+from src import system_snapshot
+from src.system_snapshot import InfoSO, InfoCPU, InfoMemoria, InfoDisco, EstadoServicios, Tiempo, Instantanea
+
+class TestSystemSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.instantanea = Instantanea(
+            1760000000.25,
+            InfoSO('Windows', '11', '10.0.22631', 'AMD64', 'EQUIPO-ñ'),
+            InfoCPU(4, None, 3400.0, 1200.0, 2800.0, [10.5, 20.0, 0.0, 99.9], 32.6),
+            InfoMemoria(16 * 1024**3, 8 * 1024**3, 8 * 1024**3, 50.0),
+            [InfoDisco('C:\\', 'C:\\', 'NTFS', 500 * 1024**3, 200 * 1024**3, 300 * 1024**3, 40.0),
+             InfoDisco('Z:\\', 'Z:\\', 'CIFS', None, None, None, None)],
+            None,
+            [Tiempo('cpu', 'ok', 0.01), Tiempo('disco Z:\\', 'tiempo_agotado', 10.0), Tiempo('servicios', 'error', 0.5)],
+        )
+
+    def test_formatear(self):
+        """Prueba que el texto es el del informe de siempre."""
+        self.assertEqual(system_snapshot.formatear_memoria(self.instantanea.memoria),
+                         {'total': '16.00 GB', 'available': '8.00 GB', 'used': '8.00 GB', 'percentage': '50.0%'})
+        cpu = system_snapshot.formatear_cpu(self.instantanea.cpu)
+        self.assertEqual((cpu['max_frequency'], cpu['total_usage'], cpu['usage_per_core'][0]), ('3400.00 Mhz', '32.6%', '10.5%'))
+        disco = system_snapshot.formatear_disco(self.instantanea.discos[0])
+        self.assertEqual((disco['total_size'], disco['free'], disco['percentage']), ('500.00 GB', '300.00 GB', '40.0%'))
+        self.assertEqual(system_snapshot.formatear_servicios(EstadoServicios(10, 5, 4, 1, 0)),
+                         {'total': 10, 'running': 5, 'stopped': 4, 'paused': 1, 'other': 0})
+
+    def test_json(self):
+        texto = system_snapshot.a_json(self.instantanea)
+
+        self.assertEqual(json.loads(texto)['memoria']['total'], 16 * 1024**3)
+        self.assertEqual(system_snapshot.desde_json(texto), self.instantanea)
+
+    def test_binario(self):
+        datos = system_snapshot.a_binario(self.instantanea)
+
+        self.assertTrue(datos.startswith(system_snapshot.FIRMA))
+        self.assertLess(len(datos), len(system_snapshot.a_json(self.instantanea).encode('utf-8')))
+        self.assertEqual(system_snapshot.desde_binario(datos), self.instantanea)
+        self.assertEqual(system_snapshot.desde_binario(memoryview(datos)), self.instantanea)
+
+    def test_binario_sin_secciones(self):
+        vacia = Instantanea(0.0, None, None, None, [], None, [])
+        self.assertEqual(system_snapshot.desde_binario(system_snapshot.a_binario(vacia)), vacia)
+
+    def test_binario_invalido(self):
+        datos = system_snapshot.a_binario(self.instantanea)
+        with self.assertRaises(system_snapshot.InstantaneaInvalida):
+            system_snapshot.desde_binario(b'OTRAFIRM' + datos[8:])
+        for longitud in (4, 40, len(datos) - 3):
+            with self.assertRaises(system_snapshot.InstantaneaInvalida):
+                system_snapshot.desde_binario(datos[:longitud])
+
+if __name__ == '__main__':
+    unittest.main()
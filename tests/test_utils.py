@@ -4,6 +4,7 @@ import unittest
 from unittest.mock import patch, call
 import io
 import sys
+from types import SimpleNamespace
 from src import utils
 
 class TestUtils(unittest.TestCase):
@@ -61,6 +62,56 @@ class TestUtils(unittest.TestCase):
         self.assertIn('\rProgress: |██████████| 100.0% Complete', mock_stdout.getvalue())
         self.assertTrue(mock_stdout.getvalue().endswith('\n'))
 
+    def test_progress_reporter_no_dibuja_si_no_es_tty(self):
+        stream = io.StringIO()
+        reporter = utils.ProgressReporter(total=1000, prefix='Progress:', stream=stream)
+        for _ in range(1000):
+            reporter.update(1, 1024)
+        reporter.finish()
+        self.assertEqual(stream.getvalue(), '')
+        self.assertEqual(reporter.count, 1000)
+        self.assertEqual(reporter.bytes, 1000 * 1024)
+
+    @patch('src.utils.time.monotonic')
+    def test_progress_reporter_limita_la_frecuencia(self, mock_monotonic):
+        reloj = [0.0]
+        mock_monotonic.side_effect = lambda: reloj[0]
+        stream = io.StringIO()
+        reporter = utils.ProgressReporter(total=1000, prefix='Progress:', length=10, min_interval=0.1,
+                                          unit='archivos', stream=stream, enabled=True)
+        for _ in range(1000):
+            reloj[0] += 0.001 # 1000 elementos en 1 segundo
+            reporter.update(1, 1024 * 1024)
+        # Un dibujo inicial más uno cada 0.1 s (10 Hz), no uno por elemento
+        self.assertLessEqual(reporter.draws, 11)
+        self.assertIn('archivos/s', stream.getvalue())
+        self.assertIn('MB/s', stream.getvalue())
+        self.assertIn('ETA', stream.getvalue())
+
+        reporter.finish()
+        self.assertTrue(stream.getvalue().endswith('\n'))
+        self.assertIn('|██████████| 100.0%', stream.getvalue())
+
+    @patch('src.utils.time.monotonic', return_value=0.0)
+    def test_progress_reporter_redibuja_por_porcentaje(self, mock_monotonic):
+        stream = io.StringIO()
+        reporter = utils.ProgressReporter(total=100, min_interval=10, min_percent_step=25, stream=stream, enabled=True)
+        for _ in range(100):
+            reporter.update()
+        # Primer dibujo al 1% y luego uno por cada 25 puntos porcentuales
+        self.assertEqual(reporter.draws, 4)
+
+    def test_allocated_size_usa_st_blocks(self):
+        # Un archivo disperso: 1 MB lógico, un solo bloque de 4 KB asignado
+        info = SimpleNamespace(st_size=1024 * 1024, st_blocks=8)
+        self.assertEqual(utils.allocated_size(info, 4096), 4096)
+
+    def test_allocated_size_redondea_al_cluster(self):
+        info = SimpleNamespace(st_size=5000)
+        self.assertEqual(utils.allocated_size(info, 4096), 8192)
+        self.assertEqual(utils.allocated_size(SimpleNamespace(st_size=0), 4096), 0)
+        self.assertEqual(utils.allocated_size(SimpleNamespace(st_size=4096), 4096), 4096)
+
 
 if __name__ == '__main__':
     unittest.main()